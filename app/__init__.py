@@ -3,28 +3,46 @@ from flask_sqlalchemy import SQLAlchemy
 from flask_migrate import Migrate
 from flask_login import LoginManager
 from app.config import Config
-from app.extensions import db, migrate, login_manager, csrf
-from app.utils.helpers import format_currency
+from app.extensions import db, migrate, login_manager, csrf, cache, instrumentation
+from app.utils.customers import customer_choices
+from app.utils.engine import apply_sqlite_pragmas
+from app.utils.helpers import format_currency, pdf_cache
+from app.utils.search import include_object
 
 def create_app(config_class=Config):
     app = Flask(__name__)
     app.config.from_object(config_class)
 
     app.jinja_env.filters['currency'] = format_currency
+    pdf_cache.maxsize = app.config['PDF_CACHE_SIZE']
+    customer_choices.ttl = app.config['CUSTOMER_CHOICES_TTL']
     
     # Initialize extensions
     db.init_app(app)
-    migrate.init_app(app, db)
+    with app.app_context():
+        for engine in db.engines.values():
+            apply_sqlite_pragmas(engine, app.config['SQLITE_PRAGMAS'])
+    migrate.init_app(app, db, include_object=include_object)
     login_manager.init_app(app)
     csrf.init_app(app)
+    cache.init_app(app)
+    instrumentation.init_app(app)
 
     # Login manager configuration
     login_manager.login_view = 'auth.login'
     login_manager.login_message = 'Silakan login untuk mengakses halaman ini'
     login_manager.login_message_category = 'warning'
     
+    # Keep customer_balances and the rollups in sync with ledger writes, and
+    # closed periods read-only
+    from app.utils import balances, periods, rollups  # noqa: F401
+    
+    # CLI commands
+    from app.commands import register_commands
+    register_commands(app)
+    
     # Register blueprints
-    from app.routes import main_bp, api_bp, customer_bp, order_bp, kasbon_bp, payment_bp
+    from app.routes import main_bp, api_bp, customer_bp, order_bp, kasbon_bp, payment_bp, export_bp
     
     app.register_blueprint(main_bp)    
     app.register_blueprint(api_bp)
@@ -32,6 +50,7 @@ def create_app(config_class=Config):
     app.register_blueprint(kasbon_bp, url_prefix="/kasbons")
     app.register_blueprint(order_bp, url_prefix="/orders")
     app.register_blueprint(payment_bp, url_prefix="/payments")
+    app.register_blueprint(export_bp, url_prefix="/exports")
     # app.register_blueprint(auth_bp)
     
     return app
\ No newline at end of file
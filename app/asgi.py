@@ -0,0 +1,149 @@
+"""
+ASGI entry point
+
+    uvicorn --factory app.asgi:create_asgi_app
+
+The read-heavy endpoints (dashboard, customer summary page and PDF, the JSON
+API) are served by native coroutines over SQLAlchemy's async engine, so a
+request waiting on the database doesn't hold a thread and PDFs are rendered
+in a thread pool off the event loop. Every other route runs the regular
+Flask WSGI app in a thread pool.
+
+Native serving needs greenlet and the database's async driver (aiosqlite or
+asyncpg); without them every route falls back to the WSGI app.
+"""
+import asyncio
+import io
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+
+from uvicorn.middleware.wsgi import build_environ
+from werkzeug.exceptions import HTTPException
+
+from app import create_app
+from app.config import Config
+from app.utils.async_db import AsyncDatabase
+
+try:
+    from a2wsgi import WSGIMiddleware
+except ImportError:  # uvicorn's own (deprecated) adapter
+    from uvicorn.middleware.wsgi import WSGIMiddleware
+
+
+class AsgiApp:
+    """Dispatch requests to native coroutine views or the wrapped WSGI app"""
+
+    def __init__(self, flask_app, async_views: dict, database: AsyncDatabase = None):
+        self.flask_app = flask_app
+        self.async_views = async_views if database is not None else {}
+        self.database = database
+        self.urls = flask_app.url_map.bind('localhost')
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', DeprecationWarning)
+            self.wsgi = WSGIMiddleware(flask_app, workers=flask_app.config['ASGI_WSGI_THREADS'])
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self.lifespan(receive, send)
+            return
+
+        view = self.match(scope) if scope['type'] == 'http' else None
+        if view is None:
+            await self.wsgi(scope, receive, send)
+        else:
+            await self.dispatch(*view, scope, receive, send)
+
+    async def lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                # PDF rendering goes through run_in_executor(None, ...)
+                pdf_threads = self.flask_app.config['ASGI_PDF_THREADS']
+                asyncio.get_running_loop().set_default_executor(ThreadPoolExecutor(pdf_threads))
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                if self.database is not None:
+                    await self.database.dispose()
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    def match(self, scope):
+        """(view, url arguments) when the request's endpoint has a native view"""
+        if not self.async_views:
+            return None
+        path = scope['path']
+        root_path = scope.get('root_path', '')
+        if root_path and path.startswith(root_path):
+            path = path[len(root_path):]
+        try:
+            endpoint, args = self.urls.match(path, scope['method'])
+        except HTTPException:
+            return None
+        view = self.async_views.get(endpoint)
+        return (view, args) if view is not None else None
+
+    async def dispatch(self, view, args, scope, receive, send):
+        """Run a native view inside a Flask request context, like Flask.wsgi_app does for sync views"""
+        body = await read_body(receive)
+        environ = build_environ(scope, {'type': 'http.request', 'body': body}, io.BytesIO(body))
+        app = self.flask_app
+
+        async with self.database.session() as session:
+            with app.request_context(environ):
+                try:
+                    try:
+                        rv = app.preprocess_request()
+                        if rv is None:
+                            rv = await view(session, **args)
+                    except Exception as e:
+                        rv = app.handle_user_exception(e)
+                    response = app.finalize_request(rv)
+                except Exception as e:
+                    response = app.handle_exception(e)
+                # Sent before the context is popped so streamed bodies can still use it
+                await send_response(response, environ, send)
+
+
+async def read_body(receive) -> bytes:
+    chunks = []
+    more_body = True
+    while more_body:
+        message = await receive()
+        chunks.append(message.get('body', b''))
+        more_body = message.get('more_body', False)
+    return b''.join(chunks)
+
+
+async def send_response(response, environ: dict, send):
+    headers = [
+        (name.lower().encode('latin-1'), value.encode('latin-1'))
+        for name, value in response.get_wsgi_headers(environ).to_wsgi_list()
+    ]
+    await send({'type': 'http.response.start', 'status': response.status_code, 'headers': headers})
+
+    try:
+        if hasattr(response.response, '__aiter__'):
+            if environ['REQUEST_METHOD'] != 'HEAD':
+                async for chunk in response.response:
+                    if isinstance(chunk, str):
+                        chunk = chunk.encode()
+                    await send({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+        else:
+            for chunk in response.get_app_iter(environ):
+                await send({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+        await send({'type': 'http.response.body', 'body': b''})
+    finally:
+        response.close()
+
+
+def create_asgi_app(config_class=Config) -> AsgiApp:
+    """Build the Flask app and wrap it for an ASGI server"""
+    from app.routes import api, main
+
+    flask_app = create_app(config_class)
+    try:
+        database = AsyncDatabase(flask_app)
+    except RuntimeError as e:
+        flask_app.logger.warning('%s; serving every route through WSGI', e)
+        database = None
+    return AsgiApp(flask_app, {**main.async_views, **api.async_views}, database)
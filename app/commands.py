@@ -0,0 +1,198 @@
+import click
+from flask.cli import AppGroup
+
+balances_cli = AppGroup('balances', help='Maintain the customer_balances table.')
+
+
+@balances_cli.command('rebuild')
+def rebuild_balances_command():
+    """Recompute customer_balances from the raw ledgers."""
+    from app.utils.balances import rebuild_balances
+
+    count = rebuild_balances()
+    click.echo(f'Rebuilt {count} balance rows.')
+
+
+@balances_cli.command('check')
+def check_balances_command():
+    """Compare customer_balances against the raw ledgers."""
+    from app.utils.balances import check_balances
+
+    mismatches = check_balances()
+    for customer_id, period, column, expected, stored in mismatches:
+        click.echo(f'customer {customer_id} [{period}] {column}: expected {expected}, stored {stored}')
+    if mismatches:
+        raise click.ClickException(f'{len(mismatches)} mismatches found, run "flask balances rebuild".')
+    click.echo('customer_balances matches the ledgers.')
+
+
+rollups_cli = AppGroup('rollups', help='Maintain the daily and monthly rollup tables.')
+
+
+@rollups_cli.command('rebuild')
+def rebuild_rollups_command():
+    """Recompute daily_rollups and monthly_rollups from the raw ledgers."""
+    from app.utils.rollups import rebuild_rollups
+
+    count = rebuild_rollups()
+    click.echo(f'Rebuilt rollups for {count} days.')
+
+
+@rollups_cli.command('check')
+def check_rollups_command():
+    """Compare the rollup tables against the raw ledgers."""
+    from app.utils.rollups import check_rollups
+
+    mismatches = check_rollups()
+    for table, key, column, expected, stored in mismatches:
+        click.echo(f'{table} [{key}] {column}: expected {expected}, stored {stored}')
+    if mismatches:
+        raise click.ClickException(f'{len(mismatches)} mismatches found, run "flask rollups rebuild".')
+    click.echo('Rollups match the ledgers.')
+
+
+periods_cli = AppGroup('periods', help='Close accounting periods and archive their ledgers.')
+
+
+@periods_cli.command('close')
+@click.argument('through', type=click.DateTime(formats=['%Y-%m-%d']))
+@click.confirmation_option(prompt='Archive every ledger row up to that day and make the period read-only?')
+def close_period_command(through):
+    """Close every ledger up to THROUGH, the last day of a month."""
+    from app.utils.dashboard import invalidate_dashboard
+    from app.utils.periods import close_period
+
+    try:
+        result = close_period(through.date())
+    except ValueError as e:
+        raise click.ClickException(str(e))
+    # Only reaches the web workers with the shared (redis) cache backend
+    invalidate_dashboard()
+    archived = ', '.join(f'{count} {table}' for table, count in result.items() if table != 'customers')
+    click.echo(f'Closed through {through:%Y-%m-%d} for {result["customers"]} customers, archived {archived}.')
+
+
+@periods_cli.command('list')
+def list_periods_command():
+    """Show every period close, newest first."""
+    from app.utils.helpers import format_currency
+    from app.utils.periods import period_close_history
+
+    history = period_close_history()
+    for closed_through, customers, balance in history:
+        click.echo(f'{closed_through:%Y-%m-%d}  {customers} customers  balance {format_currency(balance)}')
+    if not history:
+        click.echo('No period has been closed yet.')
+
+
+search_cli = AppGroup('search', help='Maintain the text search indexes.')
+
+
+@search_cli.command('rebuild')
+def rebuild_search_command():
+    """Refill the search indexes from their tables."""
+    from app.utils.search import rebuild_search_index
+
+    count = rebuild_search_index()
+    click.echo(f'Rebuilt {count} search indexes.' if count else 'This database searches without an index to rebuild.')
+
+
+@search_cli.command('check')
+def check_search_command():
+    """Check the search indexes against their tables."""
+    from app.utils.search import check_search_index
+
+    broken = check_search_index()
+    for index in broken:
+        click.echo(f'{index} is out of sync')
+    if broken:
+        raise click.ClickException(f'{len(broken)} indexes out of sync, run "flask search rebuild".')
+    click.echo('Search indexes match their tables.')
+
+
+statements_cli = AppGroup('statements', help='Generate PDF customer statements.')
+
+
+@statements_cli.command('generate')
+@click.option('--start-date', type=click.DateTime(formats=['%Y-%m-%d']), help='First day of the period.')
+@click.option('--end-date', type=click.DateTime(formats=['%Y-%m-%d']), help='Last day of the period.')
+@click.option('--customer', 'customer_ids', type=int, multiple=True,
+              help='Customer id, repeatable. Defaults to every customer.')
+@click.option('--output', type=click.Path(dir_okay=False, writable=True), default='statements.zip',
+              show_default=True, help='ZIP file to write.')
+@click.option('--workers', type=int, help='Worker processes. Defaults to the number of CPUs.')
+def generate_statements_command(start_date, end_date, customer_ids, output, workers):
+    """Render statements for many customers into one ZIP."""
+    from app.models import Customer
+    from app.utils.statements import generate_statements
+    from app.utils.streaming import stream_zip
+    import zipfile
+
+    start_date = start_date.date() if start_date else None
+    end_date = end_date.date() if end_date else None
+    total = len(customer_ids) if customer_ids else Customer.query.count()
+
+    with click.progressbar(length=total, label='Rendering statements') as bar:
+        statements = generate_statements(customer_ids or None, start_date, end_date, workers=workers,
+                                         progress=lambda done, _: bar.update(1))
+        with open(output, 'wb') as f:
+            for chunk in stream_zip(statements, compression=zipfile.ZIP_STORED):
+                f.write(chunk)
+    click.echo(f'Wrote {output}.')
+
+
+@click.command('export')
+@click.argument('kind', type=click.Choice(['orders', 'kasbons', 'payments', 'summaries']))
+@click.option('--format', 'fmt', type=click.Choice(['csv', 'xlsx']), default='csv', show_default=True)
+@click.option('--customer-id', type=int, help='Only export this customer.')
+@click.option('--start-date', type=click.DateTime(formats=['%Y-%m-%d']), help='First day of the period.')
+@click.option('--end-date', type=click.DateTime(formats=['%Y-%m-%d']), help='Last day of the period.')
+@click.option('--output', type=click.Path(dir_okay=False, writable=True),
+              help='File to write. Defaults to KIND.FORMAT.')
+def export_command(kind, fmt, customer_id, start_date, end_date, output):
+    """Export ledger rows or customer summaries as CSV or XLSX."""
+    from app.utils.exports import EXPORT_FORMATS, export_rows
+
+    output = output or f'{kind}.{fmt}'
+    header, rows = export_rows(kind, customer_id,
+                               start_date.date() if start_date else None,
+                               end_date.date() if end_date else None)
+    with open(output, 'wb') as f:
+        for chunk in EXPORT_FORMATS[fmt][1](header, rows):
+            f.write(chunk)
+    click.echo(f'Wrote {output}.')
+
+
+@click.command('import-orders')
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--dry-run', is_flag=True, help='Validate the file without writing anything.')
+@click.option('--batch-size', type=int, default=5000, show_default=True, help='Rows per insert transaction.')
+def import_orders_command(path, dry_run, batch_size):
+    """Import daily orders from a CSV file."""
+    from app.models import DailyOrder
+    from app.utils.dashboard import invalidate_dashboard
+    from app.utils.imports import import_orders
+
+    with open(path, encoding='utf-8-sig', newline='') as f:
+        result = import_orders(f, dry_run=dry_run, batch_size=batch_size)
+    if result.imported:
+        # Only reaches the web workers with the shared (redis) cache backend
+        invalidate_dashboard(DailyOrder)
+    for line, message in result.errors:
+        click.echo(f'line {line}: {message}', err=True)
+    if dry_run:
+        click.echo(f'{result.valid} of {result.total} rows are valid, nothing written.')
+    else:
+        click.echo(f'Imported {result.imported} of {result.total} rows.')
+    if result.errors:
+        raise click.ClickException(f'{len(result.errors)} rows rejected.')
+
+
+def register_commands(app):
+    app.cli.add_command(balances_cli)
+    app.cli.add_command(rollups_cli)
+    app.cli.add_command(periods_cli)
+    app.cli.add_command(search_cli)
+    app.cli.add_command(statements_cli)
+    app.cli.add_command(export_command)
+    app.cli.add_command(import_orders_command)
@@ -3,18 +3,88 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
+DATABASE_URL = os.environ.get('DATABASE_URL') or 'sqlite:///app.db'
+
+def engine_options(database_url: str, pool_size: int, max_overflow: int, pool_recycle: int = 1800) -> dict:
+    """
+    SQLALCHEMY_ENGINE_OPTIONS for ``database_url``
+
+    Server databases get a sized pool with pre-ping and recycling so
+    connections dropped by the server or a proxy are replaced transparently.
+    SQLite keeps SQLAlchemy's defaults and is tuned with SQLITE_PRAGMAS.
+    """
+    if database_url.startswith('sqlite'):
+        return {}
+    return {
+        'pool_size': pool_size,
+        'max_overflow': max_overflow,
+        'pool_recycle': pool_recycle,
+        'pool_pre_ping': True,
+        'pool_timeout': 30,
+    }
+
 class Config:
     SECRET_KEY = os.environ.get('SECRET_KEY') or 'dev-key'
-    SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL') or \
-        'sqlite:///app.db'
+    SQLALCHEMY_DATABASE_URI = DATABASE_URL
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    SQLALCHEMY_ENGINE_OPTIONS = engine_options(DATABASE_URL, pool_size=5, max_overflow=10)
+    # Applied to every new SQLite connection: WAL lets readers and one writer
+    # work concurrently, and writers wait up to busy_timeout ms for the lock
+    # instead of failing with "database is locked"
+    SQLITE_PRAGMAS = {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'busy_timeout': 10000,
+        'mmap_size': 256 * 1024 * 1024,
+        'cache_size': -32000,  # KiB
+    }
+    # Number of rendered PDF statements kept in memory
+    PDF_CACHE_SIZE = int(os.environ.get('PDF_CACHE_SIZE', 64))
+    # Worker processes for batch statement rendering (None = all cores)
+    STATEMENT_WORKERS = int(os.environ.get('STATEMENT_WORKERS', 0)) or None
+    # Seconds a worker may serve its cached customer choices before reloading
+    CUSTOMER_CHOICES_TTL = int(os.environ.get('CUSTOMER_CHOICES_TTL', 60))
+    # Above this many customers, selects switch to a type-ahead search
+    CUSTOMER_SELECT_LIMIT = int(os.environ.get('CUSTOMER_SELECT_LIMIT', 200))
+    # Application cache: 'memory' (per process LRU) or 'redis' (shared, needs the redis package)
+    CACHE_BACKEND = os.environ.get('CACHE_BACKEND', 'memory')
+    CACHE_REDIS_URL = os.environ.get('CACHE_REDIS_URL', 'redis://localhost:6379/0')
+    CACHE_MAXSIZE = int(os.environ.get('CACHE_MAXSIZE', 512))
+    CACHE_DEFAULT_TTL = int(os.environ.get('CACHE_DEFAULT_TTL', 30))
+    # Seconds the dashboard blocks may be served from cache between writes
+    DASHBOARD_CACHE_TTL = int(os.environ.get('DASHBOARD_CACHE_TTL', 15))
+    # ASGI entry point (app.asgi): async engine URL, by default the database
+    # above through aiosqlite/asyncpg, and the thread pools for WSGI-only
+    # routes and PDF rendering
+    ASYNC_DATABASE_URL = os.environ.get('ASYNC_DATABASE_URL')
+    ASGI_WSGI_THREADS = int(os.environ.get('ASGI_WSGI_THREADS', 10))
+    ASGI_PDF_THREADS = int(os.environ.get('ASGI_PDF_THREADS', 4))
+    # Server-Timing headers, /metrics and the slow query log (app/instrumentation.py)
+    INSTRUMENTATION_ENABLED = os.environ.get('INSTRUMENTATION_ENABLED', '1') == '1'
+    # Statements slower than this are logged with the route that ran them
+    SLOW_QUERY_MS = int(os.environ.get('SLOW_QUERY_MS', 200))
     
 class DevelopmentConfig(Config):
     DEBUG = True
+    SQLALCHEMY_ENGINE_OPTIONS = engine_options(DATABASE_URL, pool_size=2, max_overflow=5)
 
 class ProductionConfig(Config):
     DEBUG = False
+    SQLALCHEMY_ENGINE_OPTIONS = engine_options(
+        DATABASE_URL,
+        pool_size=int(os.environ.get('DB_POOL_SIZE', 10)),
+        max_overflow=int(os.environ.get('DB_MAX_OVERFLOW', 20)),
+        pool_recycle=int(os.environ.get('DB_POOL_RECYCLE', 1800)),
+    )
+    SQLITE_PRAGMAS = {
+        **Config.SQLITE_PRAGMAS,
+        'mmap_size': 1024 * 1024 * 1024,
+        'cache_size': -128000,
+    }
 
 class TestingConfig(Config):
     TESTING = True
-    SQLALCHEMY_DATABASE_URI = 'sqlite:///test.db'
\ No newline at end of file
+    SQLALCHEMY_DATABASE_URI = 'sqlite:///test.db'
+    SQLALCHEMY_ENGINE_OPTIONS = engine_options(SQLALCHEMY_DATABASE_URI, pool_size=1, max_overflow=0)
+    # Throwaway database: durability doesn't matter
+    SQLITE_PRAGMAS = {**Config.SQLITE_PRAGMAS, 'synchronous': 'OFF'}
\ No newline at end of file
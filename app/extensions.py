@@ -3,7 +3,12 @@ from flask_sqlalchemy import SQLAlchemy
 from flask_migrate import Migrate
 from flask_wtf import CSRFProtect
 
+from app.instrumentation import Instrumentation
+from app.utils.cache import Cache
+
 db = SQLAlchemy()
 migrate = Migrate()
 login_manager = LoginManager()
-csrf = CSRFProtect()
\ No newline at end of file
+csrf = CSRFProtect()
+cache = Cache()
+instrumentation = Instrumentation()
@@ -1,4 +1,4 @@
 from app.forms.customer import CustomerForm
-from app.forms.order import DailyOrderForm
+from app.forms.order import DailyOrderForm, OrderImportForm
 from app.forms.payment import PaymentForm
 from app.forms.kasbon import KasbonForm
\ No newline at end of file
@@ -3,12 +3,13 @@ from wtforms import StringField, IntegerField, DateField, TextAreaField, SubmitF
 from wtforms.validators import DataRequired, NumberRange, Optional
 from wtforms.widgets import TextInput
 
-from app.models import Customer
+from app.forms.validators import OpenPeriod
+from app.utils.customers import customer_choices
 
 
 # ---- Kasbon ----
 class KasbonForm(FlaskForm):
-    date = DateField("Tanggal", validators=[DataRequired()])
+    date = DateField("Tanggal", validators=[DataRequired(), OpenPeriod()])
     customer_id = SelectField("Pelanggan", coerce=int, validators=[DataRequired()])
     item_name = StringField("Nama Item", validators=[DataRequired()])
     quantity = IntegerField("Jumlah", default=1, validators=[NumberRange(min=1)])
@@ -17,7 +18,7 @@ class KasbonForm(FlaskForm):
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        self.customer_id.choices = [(c.id, c.name) for c in Customer.query.all()]
+        self.customer_id.choices = customer_choices.get()
 
     def calculate_total(self):
         if self.quantity.data and self.unit_price.data:
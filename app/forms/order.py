@@ -1,13 +1,15 @@
 from flask_wtf import FlaskForm
-from wtforms import StringField, IntegerField, DateField, TextAreaField, SubmitField, SelectField
+from flask_wtf.file import FileAllowed, FileField, FileRequired
+from wtforms import StringField, IntegerField, DateField, TextAreaField, SubmitField, SelectField, BooleanField
 from wtforms.validators import DataRequired, NumberRange, Optional
 
-from app.models import Customer
+from app.forms.validators import OpenPeriod
+from app.utils.customers import customer_choices
 
 
 # ---- Daily Order ----
 class DailyOrderForm(FlaskForm):
-    date = DateField("Tanggal", validators=[DataRequired()])
+    date = DateField("Tanggal", validators=[DataRequired(), OpenPeriod()])
     customer_id = SelectField("Pelanggan", coerce=int, validators=[DataRequired()])
     morning_portions = IntegerField("Pagi", default=0, validators=[NumberRange(min=0)])
     afternoon_portions = IntegerField("Siang", default=0, validators=[NumberRange(min=0)])
@@ -16,7 +18,7 @@ class DailyOrderForm(FlaskForm):
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        self.customer_id.choices = [(c.id, c.name) for c in Customer.query.all()]
+        self.customer_id.choices = customer_choices.get()
 
     def calculate_total(self):
         return (
@@ -24,3 +26,9 @@ class DailyOrderForm(FlaskForm):
             (self.afternoon_portions.data or 0) +
             (self.evening_portions.data or 0)
         )
+
+
+class OrderImportForm(FlaskForm):
+    file = FileField("File CSV", validators=[FileRequired(), FileAllowed(["csv"], "Hanya file CSV")])
+    dry_run = BooleanField("Cek saja (tanpa menyimpan)", default=True)
+    submit = SubmitField("Import")
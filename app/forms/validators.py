@@ -0,0 +1,13 @@
+from wtforms.validators import ValidationError
+
+from app.utils.periods import ClosedPeriodError, check_open
+
+
+class OpenPeriod:
+    """Reject dates that fall in a closed period"""
+
+    def __call__(self, form, field):
+        try:
+            check_open(field.data)
+        except ClosedPeriodError as error:
+            raise ValidationError(str(error).capitalize())
@@ -0,0 +1,205 @@
+import bisect
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+from flask import Response, before_render_template, current_app, g, has_app_context, request, template_rendered
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Upper bounds (seconds) of the request duration histogram buckets
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Per-request timing phases, in Server-Timing order
+PHASES = ('sql', 'template', 'pdf')
+
+
+class RequestTimings:
+    """Time spent by one request, collected in ``g`` while it runs"""
+
+    __slots__ = ('started', 'sql_count', 'seconds')
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.sql_count = 0
+        self.seconds = dict.fromkeys(PHASES, 0.0)
+
+
+class Instrumentation:
+    """
+    Per-request performance counters
+
+    For every request it records wall time, SQL statement count and time,
+    template render time and PDF build time. They are sent back as a
+    ``Server-Timing`` header and aggregated per endpoint for ``/metrics``
+    (Prometheus text format). Statements slower than SLOW_QUERY_MS are
+    logged with the route that ran them. Counters are kept per process.
+
+    Enabled by INSTRUMENTATION_ENABLED.
+    """
+
+    def __init__(self, app=None):
+        self.slow_query_seconds = None
+        self._lock = threading.Lock()
+        self._requests = defaultdict(int)
+        self._durations = defaultdict(lambda: [0] * (len(DURATION_BUCKETS) + 1))
+        self._duration_sums = defaultdict(float)
+        self._sql_counts = defaultdict(int)
+        self._phase_seconds = defaultdict(float)
+        self._pdf_builds = 0
+        self._slow_queries = 0
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        if not app.config['INSTRUMENTATION_ENABLED']:
+            return
+        self.slow_query_seconds = app.config['SLOW_QUERY_MS'] / 1000
+        app.extensions['instrumentation'] = self
+
+        app.before_request(self._start_request)
+        app.after_request(self._finish_request)
+        app.add_url_rule('/metrics', 'metrics', self.metrics_view)
+
+        # Class-level listeners see every engine, including the ASGI async engine
+        if not event.contains(Engine, 'before_cursor_execute', self._before_cursor_execute):
+            event.listen(Engine, 'before_cursor_execute', self._before_cursor_execute)
+            event.listen(Engine, 'after_cursor_execute', self._after_cursor_execute)
+        before_render_template.connect(self._before_render, app)
+        template_rendered.connect(self._after_render, app)
+
+    # Collection
+
+    def _timings(self):
+        if has_app_context():
+            return g.get('_timings')
+        return None
+
+    def _start_request(self):
+        g._timings = RequestTimings()
+
+    def record(self, phase: str, seconds: float):
+        """Add ``seconds`` to ``phase`` of the current request"""
+        timings = self._timings()
+        if timings is not None:
+            timings.seconds[phase] += seconds
+        if phase == 'pdf':
+            with self._lock:
+                self._pdf_builds += 1
+
+    @contextmanager
+    def timer(self, phase: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(phase, time.perf_counter() - started)
+
+    # The start time lives on the statement's execution context, so a
+    # statement that raises (and never reaches after_cursor_execute) leaves
+    # nothing behind on the connection
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        if context is not None:
+            context._query_started = time.perf_counter()
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        started = getattr(context, '_query_started', None)
+        if started is None:
+            return
+        elapsed = time.perf_counter() - started
+        timings = self._timings()
+        if timings is None:
+            return
+        timings.sql_count += 1
+        timings.seconds['sql'] += elapsed
+        if elapsed >= self.slow_query_seconds:
+            with self._lock:
+                self._slow_queries += 1
+            current_app.logger.warning('Slow query (%.1f ms) in %s: %s', elapsed * 1000,
+                                       request.endpoint or request.path, statement)
+
+    def _before_render(self, app, template, context):
+        timings = self._timings()
+        if timings is not None:
+            g.setdefault('_render_started', []).append(time.perf_counter())
+
+    def _after_render(self, app, template, context):
+        started = g.get('_render_started')
+        if started:
+            self.record('template', time.perf_counter() - started.pop())
+
+    def _finish_request(self, response):
+        timings = g.pop('_timings', None)
+        if timings is None:
+            return response
+        total = time.perf_counter() - timings.started
+
+        response.headers['Server-Timing'] = ', '.join([
+            f'app;dur={total * 1000:.1f}',
+            f'sql;dur={timings.seconds["sql"] * 1000:.1f};desc="{timings.sql_count} queries"',
+            *(f'{phase};dur={timings.seconds[phase] * 1000:.1f}' for phase in PHASES[1:] if timings.seconds[phase]),
+        ])
+
+        endpoint = request.endpoint or 'unmatched'
+        with self._lock:
+            self._requests[endpoint, request.method, response.status_code] += 1
+            self._durations[endpoint][bisect.bisect_left(DURATION_BUCKETS, total)] += 1
+            self._duration_sums[endpoint] += total
+            self._sql_counts[endpoint] += timings.sql_count
+            for phase, seconds in timings.seconds.items():
+                self._phase_seconds[endpoint, phase] += seconds
+        return response
+
+    # Exposition
+
+    def metrics(self) -> str:
+        """Counters in Prometheus text exposition format"""
+        lines = []
+
+        def metric(name: str, kind: str, help_text: str, samples):
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} {kind}')
+            for labels, value in samples:
+                label_text = ','.join(f'{key}="{value}"' for key, value in labels.items())
+                lines.append(f'{name}{{{label_text}}} {value}' if label_text else f'{name} {value}')
+
+        with self._lock:
+            metric('warung_http_requests_total', 'counter', 'Requests handled.', [
+                ({'endpoint': endpoint, 'method': method, 'status': status}, count)
+                for (endpoint, method, status), count in sorted(self._requests.items())
+            ])
+
+            metric('warung_http_request_duration_seconds', 'histogram', 'Request wall time.', [])
+            for endpoint, buckets in sorted(self._durations.items()):
+                cumulative = 0
+                for bound, count in zip((*DURATION_BUCKETS, '+Inf'), buckets):
+                    cumulative += count
+                    lines.append(f'warung_http_request_duration_seconds_bucket{{endpoint="{endpoint}",le="{bound}"}} '
+                                 f'{cumulative}')
+                lines.append(f'warung_http_request_duration_seconds_sum{{endpoint="{endpoint}"}} '
+                             f'{self._duration_sums[endpoint]:.6f}')
+                lines.append(f'warung_http_request_duration_seconds_count{{endpoint="{endpoint}"}} {cumulative}')
+
+            metric('warung_sql_statements_total', 'counter', 'SQL statements executed by requests.', [
+                ({'endpoint': endpoint}, count) for endpoint, count in sorted(self._sql_counts.items())
+            ])
+            for phase in PHASES:
+                metric(f'warung_{phase}_seconds_total', 'counter', f'Time requests spent in {phase}.', [
+                    ({'endpoint': endpoint}, f'{seconds:.6f}')
+                    for (endpoint, name), seconds in sorted(self._phase_seconds.items()) if name == phase
+                ])
+            metric('warung_pdf_builds_total', 'counter', 'PDF statements rendered.', [({}, self._pdf_builds)])
+            metric('warung_slow_queries_total', 'counter', 'Statements slower than SLOW_QUERY_MS.',
+                   [({}, self._slow_queries)])
+
+        cache = current_app.extensions.get('cache')
+        if cache is not None:
+            stats = cache.stats()
+            labels = {'backend': stats['backend']}
+            metric('warung_cache_hits_total', 'counter', 'Application cache hits.', [(labels, stats['hits'])])
+            metric('warung_cache_misses_total', 'counter', 'Application cache misses.', [(labels, stats['misses'])])
+        return '\n'.join(lines) + '\n'
+
+    def metrics_view(self):
+        return Response(self.metrics(), mimetype='text/plain; version=0.0.4')
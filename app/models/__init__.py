@@ -5,5 +5,9 @@ from app.models.customer import Customer
 from app.models.order import DailyOrder
 from app.models.kasbon import Kasbon
 from app.models.payment import Payment
+from app.models.balance import CustomerBalance
+from app.models.rollup import DailyRollup, MonthlyRollup
+from app.models.archive import PeriodClose, DailyOrderArchive, KasbonArchive, PaymentArchive, ARCHIVES
 
-__all__ = ['User', 'Customer', 'DailyOrder', 'Kasbon', 'Payment']
\ No newline at end of file
+__all__ = ['User', 'Customer', 'DailyOrder', 'Kasbon', 'Payment', 'CustomerBalance', 'DailyRollup', 'MonthlyRollup',
+           'PeriodClose', 'DailyOrderArchive', 'KasbonArchive', 'PaymentArchive', 'ARCHIVES']
\ No newline at end of file
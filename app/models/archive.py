@@ -0,0 +1,96 @@
+from app.extensions import db
+from datetime import datetime
+
+from app.models.order import DailyOrder
+from app.models.kasbon import Kasbon
+from app.models.payment import Payment
+
+
+class PeriodClose(db.Model):
+    """
+    A customer's closing figures at the end of a closed period
+
+    Totals are cumulative from the first ledger row through
+    ``closed_through``, so a summary can start from the latest close and
+    only add the rows after it.
+    """
+    __tablename__ = 'period_closes'
+    __table_args__ = (
+        db.UniqueConstraint('customer_id', 'closed_through', name='uq_period_closes_customer_id_closed_through'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    customer_id = db.Column(db.Integer, db.ForeignKey('customers.id'), nullable=False)
+    # Last day of the closed period; everything up to it is archived and read-only
+    closed_through = db.Column(db.Date, index=True, nullable=False)
+    total_portions = db.Column(db.Integer, nullable=False, default=0)
+    catering_cost = db.Column(db.Integer, nullable=False, default=0)
+    total_kasbon = db.Column(db.Integer, nullable=False, default=0)
+    total_payments = db.Column(db.Integer, nullable=False, default=0)
+    balance = db.Column(db.Integer, nullable=False, default=0)
+    created_at = db.Column(db.DateTime, default=datetime.now)
+
+    def __repr__(self):
+        return f'<PeriodClose {self.customer_id} {self.closed_through}>'
+
+
+# Ledger rows of closed periods, moved out of the hot tables by close_period().
+# Same columns as the live tables, with their own ids.
+
+class DailyOrderArchive(db.Model):
+    __tablename__ = 'daily_orders_archive'
+    __table_args__ = (
+        db.Index('ix_daily_orders_archive_customer_id_date', 'customer_id', 'date'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    date = db.Column(db.Date, index=True, nullable=False)
+    customer_id = db.Column(db.Integer, db.ForeignKey('customers.id'), nullable=False)
+    morning_portions = db.Column(db.Integer, default=0)
+    afternoon_portions = db.Column(db.Integer, default=0)
+    evening_portions = db.Column(db.Integer, default=0)
+    total_portions = db.Column(db.Integer, default=0)
+    created_at = db.Column(db.DateTime, default=datetime.now)
+
+    def __repr__(self):
+        return f'<DailyOrderArchive {self.date} - Customer {self.customer_id}>'
+
+
+class KasbonArchive(db.Model):
+    __tablename__ = 'kasbons_archive'
+    __table_args__ = (
+        db.Index('ix_kasbons_archive_customer_id_date', 'customer_id', 'date'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    date = db.Column(db.Date, index=True, nullable=False)
+    customer_id = db.Column(db.Integer, db.ForeignKey('customers.id'), nullable=False)
+    item_name = db.Column(db.String(200), nullable=False)
+    quantity = db.Column(db.Integer, default=1)
+    unit_price = db.Column(db.Integer, nullable=False)
+    total_amount = db.Column(db.Integer, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.now)
+
+    def __repr__(self):
+        return f'<KasbonArchive {self.item_name} - {self.total_amount}>'
+
+
+class PaymentArchive(db.Model):
+    __tablename__ = 'payments_archive'
+    __table_args__ = (
+        db.Index('ix_payments_archive_customer_id_date', 'customer_id', 'date'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    date = db.Column(db.Date, index=True, nullable=False)
+    customer_id = db.Column(db.Integer, db.ForeignKey('customers.id'), nullable=False)
+    amount = db.Column(db.Integer, nullable=False)
+    description = db.Column(db.Text, default="")
+    created_at = db.Column(db.DateTime, default=datetime.now)
+
+    def __repr__(self):
+        return f'<PaymentArchive {self.amount} - {self.date}>'
+
+
+# Live ledger model -> archive table its closed rows are moved to
+ARCHIVES = {DailyOrder: DailyOrderArchive, Kasbon: KasbonArchive, Payment: PaymentArchive}
@@ -0,0 +1,24 @@
+from app.extensions import db
+
+class CustomerBalance(db.Model):
+    """Running ledger totals per customer, all-time and per month"""
+    __tablename__ = 'customer_balances'
+    __table_args__ = (
+        db.UniqueConstraint('customer_id', 'period', name='uq_customer_balances_customer_id_period'),
+    )
+
+    # Period key for the all-time row; monthly rows use 'YYYY-MM'
+    ALL_TIME = 'all'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    customer_id = db.Column(db.Integer, db.ForeignKey('customers.id'), nullable=False)
+    period = db.Column(db.String(7), nullable=False, default=ALL_TIME)
+    total_portions = db.Column(db.Integer, nullable=False, default=0)
+    total_kasbon = db.Column(db.Integer, nullable=False, default=0)
+    total_payments = db.Column(db.Integer, nullable=False, default=0)
+    last_activity_date = db.Column(db.Date)
+    # Bumped on every ledger write for the customer
+    version = db.Column(db.Integer, nullable=False, default=0)
+    
+    def __repr__(self):
+        return f'<CustomerBalance {self.customer_id} {self.period}>'
@@ -14,6 +14,13 @@ class Customer(db.Model):
     daily_orders = db.relationship('DailyOrder', backref='customer', lazy=True, cascade='all, delete-orphan')
     kasbons = db.relationship('Kasbon', backref='customer', lazy=True, cascade='all, delete-orphan')
     payments = db.relationship('Payment', backref='customer', lazy=True, cascade='all, delete-orphan')
+    balances = db.relationship('CustomerBalance', lazy=True, cascade='all, delete-orphan')
+    # Closed periods are read-only: deleting a customer never touches them
+    # (the closed period guard refuses it while they exist)
+    period_closes = db.relationship('PeriodClose', lazy=True, viewonly=True)
+    archived_orders = db.relationship('DailyOrderArchive', lazy=True, viewonly=True)
+    archived_kasbons = db.relationship('KasbonArchive', lazy=True, viewonly=True)
+    archived_payments = db.relationship('PaymentArchive', lazy=True, viewonly=True)
     
     def __repr__(self):
         return f'<Customer {self.name}>'
\ No newline at end of file
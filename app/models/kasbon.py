@@ -3,9 +3,12 @@ from datetime import datetime, date
 
 class Kasbon(db.Model):
     __tablename__ = 'kasbons'
+    __table_args__ = (
+        db.Index('ix_kasbons_customer_id_date', 'customer_id', 'date'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
-    date = db.Column(db.Date, nullable=False)
+    date = db.Column(db.Date, index=True, nullable=False)
     customer_id = db.Column(db.Integer, db.ForeignKey('customers.id'), nullable=False)
     item_name = db.Column(db.String(200), nullable=False)
     quantity = db.Column(db.Integer, default=1)
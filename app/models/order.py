@@ -3,9 +3,12 @@ from datetime import datetime, date
 
 class DailyOrder(db.Model):
     __tablename__ = 'daily_orders'
+    __table_args__ = (
+        db.Index('ix_daily_orders_customer_id_date', 'customer_id', 'date'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
-    date = db.Column(db.Date, nullable=False)
+    date = db.Column(db.Date, index=True, nullable=False)
     customer_id = db.Column(db.Integer, db.ForeignKey('customers.id'), nullable=False)
     morning_portions = db.Column(db.Integer, default=0)
     afternoon_portions = db.Column(db.Integer, default=0)
@@ -3,9 +3,12 @@ from datetime import datetime, date
 
 class Payment(db.Model):
     __tablename__ = 'payments'
+    __table_args__ = (
+        db.Index('ix_payments_customer_id_date', 'customer_id', 'date'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
-    date = db.Column(db.Date, nullable=False)
+    date = db.Column(db.Date, index=True, nullable=False)
     customer_id = db.Column(db.Integer, db.ForeignKey('customers.id'), nullable=False)
     amount = db.Column(db.Integer, nullable=False)
     description = db.Column(db.Text, default="")
@@ -0,0 +1,34 @@
+from app.extensions import db
+
+
+class RollupColumns:
+    """Totals shared by the daily and monthly rollups"""
+    order_count = db.Column(db.Integer, nullable=False, default=0)
+    morning_portions = db.Column(db.Integer, nullable=False, default=0)
+    afternoon_portions = db.Column(db.Integer, nullable=False, default=0)
+    evening_portions = db.Column(db.Integer, nullable=False, default=0)
+    total_portions = db.Column(db.Integer, nullable=False, default=0)
+    # Portions valued at each customer's per-portion price, before bundle rounding
+    catering_revenue = db.Column(db.Integer, nullable=False, default=0)
+    kasbon_total = db.Column(db.Integer, nullable=False, default=0)
+    payment_total = db.Column(db.Integer, nullable=False, default=0)
+
+
+class DailyRollup(RollupColumns, db.Model):
+    """Ledger totals across all customers for one day"""
+    __tablename__ = 'daily_rollups'
+
+    date = db.Column(db.Date, primary_key=True)
+
+    def __repr__(self):
+        return f'<DailyRollup {self.date}>'
+
+
+class MonthlyRollup(RollupColumns, db.Model):
+    """Ledger totals across all customers for one month, keyed by its first day"""
+    __tablename__ = 'monthly_rollups'
+
+    month = db.Column(db.Date, primary_key=True)
+
+    def __repr__(self):
+        return f'<MonthlyRollup {self.month:%Y-%m}>'
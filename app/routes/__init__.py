@@ -4,4 +4,5 @@ from app.routes.auth import auth_bp
 from app.routes.customer import customer_bp
 from app.routes.order import order_bp
 from app.routes.kasbon import kasbon_bp
-from app.routes.payment import payment_bp
\ No newline at end of file
+from app.routes.payment import payment_bp
+from app.routes.export import export_bp
\ No newline at end of file
@@ -1,23 +1,37 @@
-from datetime import datetime
-from flask import Blueprint, jsonify, request
+import json
+from datetime import date, datetime
+from flask import Blueprint, Response, abort, jsonify, make_response, request, stream_with_context
+from app.extensions import cache, csrf
 from app.models import Customer, db
-from app.utils.helpers import get_customer_summary, calculate_cost_breakdown, get_customer_pricing_info
+from app.utils.aging import AGING_BUCKETS, aging_report, aging_totals
+from app.utils.conditional import customer_conditional, customer_conditional_async
+from app.utils.customers import customer_choices
+from app.utils.helpers import (
+    build_summaries, customer_totals_query, get_customer_summary, get_customer_summary_async, calculate_cost_breakdown,
+    get_customer_pricing_info,
+)
+from app.utils.search import global_search
 
 api_bp = Blueprint('api', __name__, url_prefix='/api')
 
-@api_bp.route('/customer_summary/<int:customer_id>')
-def api_customer_summary(customer_id):
-    start_date_str = request.args.get('start_date')
-    end_date_str = request.args.get('end_date')
-    
-    start_date = datetime.strptime(start_date_str, '%Y-%m-%d').date() if start_date_str else None
-    end_date = datetime.strptime(end_date_str, '%Y-%m-%d').date() if end_date_str else None
-    
-    summary = get_customer_summary(customer_id, start_date, end_date)
-    if not summary:
-        return jsonify({'error': 'Customer not found'}), 404
-    
-    return jsonify({
+# Cache-Control per endpoint: summaries change with every ledger write, so
+# clients revalidate each time (cheap with the ETag); pricing only changes
+# when the customer is edited
+SUMMARY_CACHE_CONTROL = 'private, no-cache'
+PRICING_CACHE_CONTROL = 'private, max-age=300'
+
+# Customer rows fetched per round trip by the batch summary endpoint
+SUMMARY_BATCH_SIZE = 500
+
+def _opening_payload(opening):
+    """The period close a summary starts from, if any"""
+    if opening is None:
+        return None
+    return {'closed_through': opening.closed_through.isoformat(), 'balance': opening.balance}
+
+def summary_payload(summary: dict) -> dict:
+    """JSON body of a customer summary, shared by the single and batch endpoints"""
+    return {
         'customer_name': summary['customer'].name,
         'total_portions': summary['total_portions'],
         'total_bundles': summary['total_bundles'],
@@ -29,29 +43,243 @@ def api_customer_summary(customer_id):
         'total_bill': summary['total_bill'],
         'remaining_balance': summary['remaining_balance'],
         'effective_price_per_portion': summary['price_per_portion'],
-        'bundle_info': summary['bundle_info']
+        'bundle_info': summary['bundle_info'],
+        'opening': _opening_payload(summary['opening']),
+    }
+
+def _date_args() -> tuple:
+    start_date_str = request.args.get('start_date')
+    end_date_str = request.args.get('end_date')
+    
+    start_date = datetime.strptime(start_date_str, '%Y-%m-%d').date() if start_date_str else None
+    end_date = datetime.strptime(end_date_str, '%Y-%m-%d').date() if end_date_str else None
+    return start_date, end_date
+
+@api_bp.route('/customer_summary/<int:customer_id>')
+@customer_conditional(SUMMARY_CACHE_CONTROL)
+def api_customer_summary(customer_id):
+    summary = get_customer_summary(customer_id, *_date_args(), include_details=False)
+    if not summary:
+        return jsonify({'error': 'Customer not found'}), 404
+    
+    return jsonify(summary_payload(summary))
+
+def _summaries_request() -> tuple:
+    """(customer_ids, start_date, end_date) from a batch summary request body; aborts with 400 when invalid"""
+    body = request.get_json(silent=True)
+    if not isinstance(body, dict):
+        abort(make_response(jsonify({'error': 'JSON object body required'}), 400))
+    
+    customer_ids = body.get('customer_ids')
+    if customer_ids == 'all':
+        customer_ids = None
+    elif not isinstance(customer_ids, list) or not all(isinstance(i, int) for i in customer_ids):
+        abort(make_response(jsonify({'error': 'customer_ids must be a list of ids or "all"'}), 400))
+    
+    try:
+        start_date = datetime.strptime(body['start_date'], '%Y-%m-%d').date() if body.get('start_date') else None
+        end_date = datetime.strptime(body['end_date'], '%Y-%m-%d').date() if body.get('end_date') else None
+    except (TypeError, ValueError):
+        abort(make_response(jsonify({'error': 'Dates must be YYYY-MM-DD'}), 400))
+    return customer_ids, start_date, end_date
+
+def _summary_item(summary: dict) -> dict:
+    return {'customer_id': summary['customer'].id, **summary_payload(summary)}
+
+def _wants_ndjson() -> bool:
+    return (request.args.get('format') == 'ndjson'
+            or request.accept_mimetypes.best == 'application/x-ndjson')
+
+def _ndjson_line(item: dict) -> str:
+    return json.dumps(item, separators=(',', ':')) + '\n'
+
+def _missing_ids(customer_ids: list, found: set) -> list:
+    """Requested ids without a customer, in request order"""
+    return [i for i in dict.fromkeys(customer_ids or []) if i not in found]
+
+def _missing_line(customer_id: int) -> str:
+    return _ndjson_line({'customer_id': customer_id, 'missing': True})
+
+def _summaries_json(results: list, customer_ids: list):
+    return jsonify({
+        'summaries': results,
+        'missing': _missing_ids(customer_ids, {item['customer_id'] for item in results}),
     })
 
+@api_bp.route('/customer_summaries', methods=['POST'])
+@csrf.exempt
+def api_customer_summaries():
+    """
+    Summaries for many customers at once
+    
+    Body: {"customer_ids": [1, 2, ...] or "all", "start_date": "YYYY-MM-DD",
+    "end_date": "YYYY-MM-DD"}. All totals come from one grouped query no
+    matter how many customers are asked for. With ``?format=ndjson`` (or
+    an ``Accept: application/x-ndjson`` header) summaries are streamed one
+    JSON object per line as the rows are read, followed by a
+    ``{"customer_id": ..., "missing": true}`` line for each unknown id.
+    """
+    customer_ids, start_date, end_date = _summaries_request()
+    stmt = customer_totals_query(customer_ids, start_date, end_date).execution_options(yield_per=SUMMARY_BATCH_SIZE)
+    
+    def summaries():
+        for rows in db.session.execute(stmt).partitions():
+            for summary in build_summaries(rows):
+                yield _summary_item(summary)
+    
+    if _wants_ndjson():
+        def lines():
+            found = set()
+            for item in summaries():
+                found.add(item['customer_id'])
+                yield _ndjson_line(item)
+            for customer_id in _missing_ids(customer_ids, found):
+                yield _missing_line(customer_id)
+        return Response(stream_with_context(lines()), mimetype='application/x-ndjson')
+    
+    return _summaries_json(list(summaries()), customer_ids)
+
+def _pricing_info(customer):
+    if not customer:
+        return jsonify({'error': 'Customer not found'}), 404
+    
+    pricing_info = get_customer_pricing_info(customer)
+    return jsonify(pricing_info)
+
 @api_bp.route('/pricing_info/<int:customer_id>')
+@customer_conditional(PRICING_CACHE_CONTROL, ledgers=False)
 def api_pricing_info(customer_id):
     """Get customer pricing information"""
-    customer = Customer.query.get(customer_id)
+    return _pricing_info(Customer.query.get(customer_id))
+
+def _cost_breakdown(customer, portions):
     if not customer:
         return jsonify({'error': 'Customer not found'}), 404
     
-    pricing_info = get_customer_pricing_info(customer)
-    return jsonify(pricing_info)
+    breakdown = calculate_cost_breakdown(customer, portions)
+    return jsonify(breakdown)
 
 @api_bp.route('/cost_breakdown/<int:customer_id>')
+@customer_conditional(PRICING_CACHE_CONTROL, ledgers=False)
 def api_cost_breakdown(customer_id):
     """Calculate cost breakdown for given portions"""
     portions = request.args.get('portions', type=int)
     if portions is None or portions < 0:
         return jsonify({'error': 'Valid portions parameter required'}), 400
     
-    customer = Customer.query.get(customer_id)
-    if not customer:
+    return _cost_breakdown(Customer.query.get(customer_id), portions)
+
+@api_bp.route('/aging')
+def api_aging():
+    """
+    Receivables aging of every customer as JSON
+    
+    ``?as_of=YYYY-MM-DD`` ages the ledgers up to that day (default today);
+    ``?all=1`` includes customers without an outstanding balance.
+    """
+    try:
+        as_of = datetime.strptime(request.args['as_of'], '%Y-%m-%d').date() if request.args.get('as_of') else None
+    except ValueError:
+        return jsonify({'error': 'as_of must be YYYY-MM-DD'}), 400
+    
+    rows = aging_report(as_of)
+    totals = aging_totals(rows)
+    if request.args.get('all') != '1':
+        rows = [row for row in rows if row.outstanding > 0]
+    return jsonify({
+        'as_of': (as_of or date.today()).isoformat(),
+        'buckets': [{'key': key, 'label': label, 'max_days': oldest} for key, label, oldest in AGING_BUCKETS],
+        'totals': totals,
+        'customers': [row._asdict() for row in rows],
+    })
+
+@api_bp.route('/customers/search')
+def api_customer_search():
+    """Type-ahead lookup of customers by name"""
+    limit = min(request.args.get('limit', 20, type=int), 100)
+    matches = customer_choices.search(request.args.get('q', ''), limit=limit)
+    return jsonify([{'id': choice.id, 'name': choice.name} for choice in matches])
+
+# Rows returned per kind by the global search, at most
+SEARCH_LIMIT = 50
+
+@api_bp.route('/search')
+def api_search():
+    """
+    Customers, kasbon and payments containing ``?q=`` (case-insensitive)
+
+    Customers are matched by name, kasbon by item name and payments by
+    description; ``?limit=`` caps each list (default 10). Ledger rows are
+    listed latest entry first.
+    """
+    limit = min(max(request.args.get('limit', 10, type=int), 1), SEARCH_LIMIT)
+    results = global_search(request.args.get('q', ''), limit=limit)
+    return jsonify({
+        'customers': [{'id': c.id, 'name': c.name} for c in results.customers],
+        'kasbons': [
+            {'id': k.id, 'date': k.date.isoformat(), 'customer_id': k.customer_id, 'customer_name': k.customer.name,
+             'item_name': k.item_name, 'quantity': k.quantity, 'total_amount': k.total_amount}
+            for k in results.kasbons
+        ],
+        'payments': [
+            {'id': p.id, 'date': p.date.isoformat(), 'customer_id': p.customer_id, 'customer_name': p.customer.name,
+             'amount': p.amount, 'description': p.description}
+            for p in results.payments
+        ],
+    })
+
+@api_bp.route('/cache_stats')
+def api_cache_stats():
+    """Hit/miss counters of this worker's application cache"""
+    return jsonify(cache.stats())
+
+
+# Native coroutine versions of the read endpoints, served by app.asgi over
+# the async engine. They take the request's AsyncSession first and share
+# the helpers above with the WSGI views.
+
+@customer_conditional_async(SUMMARY_CACHE_CONTROL)
+async def api_customer_summary_async(session, customer_id):
+    summary = await get_customer_summary_async(session, customer_id, *_date_args(), include_details=False)
+    if not summary:
         return jsonify({'error': 'Customer not found'}), 404
     
-    breakdown = calculate_cost_breakdown(customer, portions)
-    return jsonify(breakdown)
\ No newline at end of file
+    return jsonify(summary_payload(summary))
+
+async def api_customer_summaries_async(session):
+    customer_ids, start_date, end_date = _summaries_request()
+    stmt = customer_totals_query(customer_ids, start_date, end_date)
+    
+    if _wants_ndjson():
+        async def lines():
+            found = set()
+            result = await session.stream(stmt.execution_options(yield_per=SUMMARY_BATCH_SIZE))
+            async for rows in result.partitions():
+                for summary in build_summaries(rows):
+                    found.add(summary['customer'].id)
+                    yield _ndjson_line(_summary_item(summary))
+            for customer_id in _missing_ids(customer_ids, found):
+                yield _missing_line(customer_id)
+        return Response(lines(), mimetype='application/x-ndjson')
+    
+    results = [_summary_item(summary) for summary in build_summaries(await session.execute(stmt))]
+    return _summaries_json(results, customer_ids)
+
+@customer_conditional_async(PRICING_CACHE_CONTROL, ledgers=False)
+async def api_pricing_info_async(session, customer_id):
+    return _pricing_info(await session.get(Customer, customer_id))
+
+@customer_conditional_async(PRICING_CACHE_CONTROL, ledgers=False)
+async def api_cost_breakdown_async(session, customer_id):
+    portions = request.args.get('portions', type=int)
+    if portions is None or portions < 0:
+        return jsonify({'error': 'Valid portions parameter required'}), 400
+    
+    return _cost_breakdown(await session.get(Customer, customer_id), portions)
+
+async_views = {
+    'api.api_customer_summary': api_customer_summary_async,
+    'api.api_customer_summaries': api_customer_summaries_async,
+    'api.api_pricing_info': api_pricing_info_async,
+    'api.api_cost_breakdown': api_cost_breakdown_async,
+}
@@ -2,12 +2,16 @@ from flask import Blueprint, render_template, redirect, url_for, flash, request
 from app.extensions import db
 from app.models import Customer
 from app.forms import CustomerForm
+from app.utils.customers import customer_choices
+from app.utils.dashboard import invalidate_dashboard
+from app.utils.helpers import customers_with_ledger_counts
+from app.utils.periods import ClosedPeriodError
 
 customer_bp = Blueprint("customers", __name__, template_folder="../templates/customer")
 
 @customer_bp.route("/")
 def list_customers():
-    customers = Customer.query.all()
+    customers = customers_with_ledger_counts()
     return render_template("customer_list.html", customers=customers)
 
 @customer_bp.route("/new", methods=["GET", "POST"])
@@ -21,6 +25,8 @@ def new_customer():
         )
         db.session.add(customer)
         db.session.commit()
+        invalidate_dashboard()
+        customer_choices.invalidate()
         flash("Customer berhasil ditambahkan!", "success")
         return redirect(url_for("customers.list_customers"))
     return render_template("customer_form.html", form=form)
@@ -32,6 +38,8 @@ def edit_customer(id):
     if form.validate_on_submit():
         form.populate_obj(customer)
         db.session.commit()
+        invalidate_dashboard()
+        customer_choices.invalidate()
         flash("Customer berhasil diperbarui!", "success")
         return redirect(url_for("customers.list_customers"))
     return render_template("customer_form.html", form=form)
@@ -40,6 +48,13 @@ def edit_customer(id):
 def delete_customer(id):
     customer = Customer.query.get_or_404(id)
     db.session.delete(customer)
-    db.session.commit()
+    try:
+        db.session.commit()
+    except ClosedPeriodError as error:
+        db.session.rollback()
+        flash(f"Customer tidak dihapus, {error}.", "danger")
+        return redirect(url_for("customers.list_customers"))
+    invalidate_dashboard()
+    customer_choices.invalidate()
     flash("Customer berhasil dihapus!", "danger")
     return redirect(url_for("customers.list_customers"))
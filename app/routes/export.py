@@ -0,0 +1,28 @@
+from datetime import datetime
+from flask import Blueprint, Response, abort, request, stream_with_context
+
+from app.utils.exports import EXPORT_FORMATS, EXPORT_KINDS, export_rows
+from app.utils.pagination import ledger_filter_args
+
+
+export_bp = Blueprint('export', __name__)
+
+
+@export_bp.route('/<kind>.<fmt>')
+def export_data(kind, fmt):
+    """
+    Stream orders, kasbons, payments or customer summaries as CSV or XLSX
+
+    Takes the same customer_id/start_date/end_date filters as the list pages
+    and customer summaries. Rows are pulled from the database in batches and
+    written out as they arrive, so the response never holds the full result.
+    """
+    if kind not in EXPORT_KINDS or fmt not in EXPORT_FORMATS:
+        abort(404)
+
+    mimetype, encoder = EXPORT_FORMATS[fmt]
+    header, rows = export_rows(kind, **ledger_filter_args(request.args))
+
+    response = Response(stream_with_context(encoder(header, rows)), mimetype=mimetype)
+    response.headers['Content-Disposition'] = f'attachment; filename={kind}_{datetime.now().strftime("%Y%m%d")}.{fmt}'
+    return response
@@ -1,14 +1,41 @@
 from flask import Blueprint, render_template, redirect, url_for, flash, request
+from sqlalchemy import func
+from sqlalchemy.orm import joinedload
 from app.extensions import db
 from app.models import Kasbon
 from app.forms import KasbonForm
+from app.utils.helpers import ledger_filters
+from app.utils.customers import customer_choices
+from app.utils.dashboard import invalidate_dashboard
+from app.utils.pagination import keyset_paginate, ledger_filter_args
+from app.utils.search import search_condition
 
 kasbon_bp = Blueprint("kasbons", __name__, template_folder="../templates/kasbon")
 
 @kasbon_bp.route("/")
 def list_kasbons():
-    kasbons = Kasbon.query.all()
-    return render_template("kasbon_list.html", kasbons=kasbons)
+    filters = ledger_filter_args(request.args)
+    query = Kasbon.query.filter(*ledger_filters(Kasbon, **filters))
+
+    q = request.args.get("q", "").strip()
+    if q:
+        query = query.filter(search_condition(Kasbon, q))
+
+    totals = query.with_entities(
+        func.count(Kasbon.id).label("count"),
+        func.coalesce(func.sum(Kasbon.total_amount), 0).label("amount"),
+        func.count(func.distinct(Kasbon.customer_id)).label("customers"),
+    ).one()
+    page = keyset_paginate(
+        query.options(joinedload(Kasbon.customer)), Kasbon,
+        cursor=request.args.get("cursor"),
+        per_page=request.args.get("per_page", type=int),
+    )
+    customers = customer_choices.get()
+    return render_template(
+        "kasbon_list.html", kasbons=page.items, page=page, totals=totals, customers=customers,
+        filters=filters, q=q, filtered=any(filters.values()) or bool(q),
+    )
 
 @kasbon_bp.route("/new", methods=["GET", "POST"])
 def new_kasbon():
@@ -25,6 +52,7 @@ def new_kasbon():
         )
         db.session.add(kasbon)
         db.session.commit()
+        invalidate_dashboard(Kasbon)
         flash("Kasbon berhasil ditambahkan!", "success")
         return redirect(url_for("kasbons.list_kasbons"))    
     return render_template("kasbon_form.html", form=form)
@@ -36,6 +64,7 @@ def edit_kasbon(id):
     if form.validate_on_submit():
         form.populate_obj(kasbon)
         db.session.commit()
+        invalidate_dashboard(Kasbon)
         flash("Kasbon berhasil diperbarui!", "success")
         return redirect(url_for("kasbons.list_kasbons"))
     return render_template("kasbon_form.html", form=form)
@@ -45,5 +74,6 @@ def delete_kasbon(id):
     kasbon = Kasbon.query.get_or_404(id)
     db.session.delete(kasbon)
     db.session.commit()
+    invalidate_dashboard(Kasbon)
     flash("Kasbon berhasil dihapus!", "danger")
     return redirect(url_for("kasbons.list_kasbons"))
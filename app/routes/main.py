@@ -1,10 +1,16 @@
-from datetime import date, datetime, timedelta
-from flask import Blueprint, jsonify, render_template, request, redirect, url_for, flash, make_response
+import zipfile
+from datetime import date, datetime
+from flask import Blueprint, Response, current_app, jsonify, render_template, request, redirect, url_for, flash, make_response, stream_with_context
 from flask_login import login_required
-from sqlalchemy import extract, func
 
-from app.utils.helpers import create_pdf_summary, get_customer_summary
-from app.models import db, Customer, DailyOrder, Kasbon, Payment
+from app.utils.aging import AGING_BUCKETS, aging_totals, aging_report as aging_report_rows
+from app.utils.dashboard import dashboard_context, dashboard_context_async
+from app.utils.helpers import (
+    get_customer_summary, get_customer_summary_async, render_customer_pdf, render_customer_pdf_async,
+)
+from app.utils.search import global_search
+from app.utils.statements import generate_statements
+from app.utils.streaming import stream_zip
 
 
 main_bp = Blueprint('main', __name__)
@@ -13,67 +19,7 @@ main_bp = Blueprint('main', __name__)
 @login_required
 @main_bp.route('/')
 def index():
-    # Data dasar
-    customers = Customer.query.all()
-    
-    # Hitung statistik untuk dashboard
-    total_customers = len(customers)
-    
-    # Pesanan hari ini
-    today_orders = DailyOrder.query.filter(DailyOrder.date == date.today()).all()
-    today_orders_count = len(today_orders)
-    today_total_portions = sum(order.total_portions for order in today_orders)
-    
-    # Total kasbon yang belum dibayar
-    total_kasbon = db.session.query(func.coalesce(func.sum(Kasbon.total_amount), 0)).scalar()
-    
-    # Pendapatan bulan ini
-    current_month = datetime.now().month
-    current_year = datetime.now().year
-    monthly_revenue = db.session.query(func.coalesce(func.sum(Payment.amount), 0)).filter(
-        extract('month', Payment.date) == current_month,
-        extract('year', Payment.date) == current_year
-    ).scalar()
-    
-    # Pesanan terbaru (7 hari terakhir)
-    seven_days_ago = date.today() - timedelta(days=7)
-    recent_orders = DailyOrder.query.filter(
-        DailyOrder.date >= seven_days_ago
-    ).order_by(DailyOrder.date.desc()).limit(10).all()
-    
-    # Tambahkan nama customer ke pesanan terbaru
-    recent_orders_with_names = []
-    for order in recent_orders:
-        customer = Customer.query.get(order.customer_id)
-        recent_orders_with_names.append({
-            'id': order.id,
-            'date': order.date,
-            'customer_id': order.customer_id,
-            'customer_name': customer.name if customer else "Unknown",
-            'morning_portions': order.morning_portions,
-            'afternoon_portions': order.afternoon_portions,
-            'evening_portions': order.evening_portions,
-            'total_portions': order.total_portions,
-            'paid': True  # Asumsi sederhana, bisa disesuaikan dengan logika bisnis
-        })
-    
-    # 5 Kasbon terbaru
-    recent_kasbons = Kasbon.query.order_by(Kasbon.date.desc()).limit(5).all()
-    
-    # 5 Pembayaran terbaru
-    recent_payments = Payment.query.order_by(Payment.date.desc()).limit(5).all()
-    
-    return render_template('dashboard.html',
-        customers=customers,
-        total_customers=total_customers,
-        today_orders_count=today_orders_count,
-        today_total_portions=today_total_portions,
-        total_kasbon=total_kasbon,
-        monthly_revenue=monthly_revenue,
-        recent_orders=recent_orders_with_names,
-        recent_kasbons=recent_kasbons,
-        recent_payments=recent_payments
-    )
+    return render_template('dashboard.html', **dashboard_context())
 
 @login_required
 @main_bp.route('/summary/<int:customer_id>')
@@ -102,18 +48,102 @@ def customer_summary_pdf(customer_id):
     start_date = datetime.strptime(start_date_str, '%Y-%m-%d').date() if start_date_str else None
     end_date = datetime.strptime(end_date_str, '%Y-%m-%d').date() if end_date_str else None
     
-    summary = get_customer_summary(customer_id, start_date, end_date)
-    if not summary:
+    # Generate PDF (served from cache when the data hasn't changed)
+    return _pdf_response(render_customer_pdf(customer_id, start_date, end_date))
+
+def _pdf_response(rendered):
+    if not rendered:
         flash('Customer tidak ditemukan!', 'error')
         return redirect(url_for('customers.list_customers'))
     
-    # Generate PDF
-    pdf_buffer = create_pdf_summary(summary, start_date, end_date)
+    customer, pdf = rendered
     
     # Create response
-    response = make_response(pdf_buffer.read())
+    response = make_response(pdf)
     response.headers['Content-Type'] = 'application/pdf'
-    response.headers['Content-Disposition'] = f'inline; filename=ringkasan_{summary["customer"].name.replace(" ", "_")}_{datetime.now().strftime("%Y%m%d")}.pdf'
+    response.headers['Content-Disposition'] = f'inline; filename=ringkasan_{customer.name.replace(" ", "_")}_{datetime.now().strftime("%Y%m%d")}.pdf'
+    
+    return response
+
+
+@login_required
+@main_bp.route('/aging')
+def aging_report():
+    """Receivables aging of every customer, computed in one query"""
+    as_of_str = request.args.get('as_of')
+    as_of = datetime.strptime(as_of_str, '%Y-%m-%d').date() if as_of_str else date.today()
+    show_all = request.args.get('all') == '1'
+    
+    rows = aging_report_rows(as_of)
+    totals = aging_totals(rows)
+    if not show_all:
+        rows = [row for row in rows if row.outstanding > 0]
+    
+    return render_template('aging.html', rows=rows, totals=totals, buckets=AGING_BUCKETS,
+                           as_of=as_of, show_all=show_all)
+
+@login_required
+@main_bp.route('/search')
+def search():
+    """Customers, kasbon and payments matching the navigation search box"""
+    q = request.args.get('q', '').strip()
+    return render_template('search.html', q=q, results=global_search(q, limit=25))
+
+@login_required
+@main_bp.route('/summary/statements.zip')
+def customer_statements_zip():
+    """Download PDF statements for all (or the selected) customers as one ZIP"""
+    start_date_str = request.args.get('start_date')
+    end_date_str = request.args.get('end_date')
+    
+    start_date = datetime.strptime(start_date_str, '%Y-%m-%d').date() if start_date_str else None
+    end_date = datetime.strptime(end_date_str, '%Y-%m-%d').date() if end_date_str else None
+    customer_ids = request.args.getlist('customer_id', type=int) or None
+    
+    logger = current_app.logger
     
+    def log_progress(done, total):
+        logger.info('Statements: %d/%d rendered', done, total)
+    
+    statements = generate_statements(customer_ids, start_date, end_date,
+                                     workers=current_app.config['STATEMENT_WORKERS'],
+                                     progress=log_progress)
+    # PDFs are already compressed, so store them as-is
+    response = Response(stream_with_context(stream_zip(statements, compression=zipfile.ZIP_STORED)),
+                        mimetype='application/zip')
+    response.headers['Content-Disposition'] = f'attachment; filename=ringkasan_{datetime.now().strftime("%Y%m%d")}.zip'
     return response
 
+
+# Native coroutine versions of the read-heavy pages, served by app.asgi over
+# the async engine; PDF rendering runs in the event loop's executor
+
+def _date_args() -> tuple:
+    start_date_str = request.args.get('start_date')
+    end_date_str = request.args.get('end_date')
+    
+    start_date = datetime.strptime(start_date_str, '%Y-%m-%d').date() if start_date_str else None
+    end_date = datetime.strptime(end_date_str, '%Y-%m-%d').date() if end_date_str else None
+    return start_date, end_date
+
+async def index_async(session):
+    return render_template('dashboard.html', **await dashboard_context_async(session))
+
+async def customer_summary_async(session, customer_id):
+    start_date, end_date = _date_args()
+    summary = await get_customer_summary_async(session, customer_id, start_date, end_date)
+    if not summary:
+        flash('Customer tidak ditemukan!', 'error')
+        return redirect(url_for('customers.list_customers'))
+    
+    return render_template('customer_summary.html', summary=summary, 
+                         start_date=start_date, end_date=end_date)
+
+async def customer_summary_pdf_async(session, customer_id):
+    return _pdf_response(await render_customer_pdf_async(session, customer_id, *_date_args()))
+
+async_views = {
+    'main.index': index_async,
+    'main.customer_summary': customer_summary_async,
+    'main.customer_summary_pdf': customer_summary_pdf_async,
+}
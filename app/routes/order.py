@@ -1,14 +1,55 @@
+import io
+from datetime import date
 from flask import Blueprint, render_template, redirect, url_for, flash, request
+from sqlalchemy import func
+from sqlalchemy.orm import joinedload
+from sqlalchemy.orm.attributes import flag_modified
 from app.extensions import db
-from app.models import DailyOrder, Customer
-from app.forms import DailyOrderForm
+from app.models import DailyOrder
+from app.forms import DailyOrderForm, OrderImportForm
+from app.utils.helpers import ledger_filters
+from app.utils.customers import customer_choices
+from app.utils.dashboard import invalidate_dashboard
+from app.utils.pagination import keyset_paginate, ledger_filter_args, parse_date_arg
+from app.utils.periods import ClosedPeriodError, closed_through
 
 order_bp = Blueprint("orders", __name__, template_folder="../templates/order")
 
+PORTION_RANGES = {
+    "0": (0, 0),
+    "1-5": (1, 5),
+    "6-10": (6, 10),
+    "11+": (11, None),
+}
+
 @order_bp.route("/")
 def list_orders():
-    orders = DailyOrder.query.all()
-    return render_template("order_list.html", orders=orders)
+    filters = ledger_filter_args(request.args)
+    query = DailyOrder.query.filter(*ledger_filters(DailyOrder, **filters))
+
+    portions = request.args.get("portions", "")
+    if portions in PORTION_RANGES:
+        low, high = PORTION_RANGES[portions]
+        query = query.filter(DailyOrder.total_portions >= low)
+        if high is not None:
+            query = query.filter(DailyOrder.total_portions <= high)
+
+    totals = query.with_entities(
+        func.coalesce(func.sum(DailyOrder.morning_portions), 0).label("morning"),
+        func.coalesce(func.sum(DailyOrder.afternoon_portions), 0).label("afternoon"),
+        func.coalesce(func.sum(DailyOrder.evening_portions), 0).label("evening"),
+        func.coalesce(func.sum(DailyOrder.total_portions), 0).label("total"),
+    ).one()
+    page = keyset_paginate(
+        query.options(joinedload(DailyOrder.customer)), DailyOrder,
+        cursor=request.args.get("cursor"),
+        per_page=request.args.get("per_page", type=int),
+    )
+    customers = customer_choices.get()
+    return render_template(
+        "order_list.html", orders=page.items, page=page, totals=totals, customers=customers,
+        filters=filters, portions=portions, filtered=any(filters.values()) or portions in PORTION_RANGES,
+    )
 
 @order_bp.route("/new", methods=["GET", "POST"])
 def new_order():
@@ -25,12 +66,102 @@ def new_order():
         )
         db.session.add(order)
         db.session.commit()
+        invalidate_dashboard(DailyOrder)
         flash("DailyOrder berhasil ditambahkan!", "success")
         return redirect(url_for("orders.list_orders"))
-    customers = Customer.query.all()
-    form.customer_id.choices = [(c.id, c.name) for c in customers]    
     return render_template("order_form.html", form=form)
 
+GRID_FIELDS = ("morning_portions", "afternoon_portions", "evening_portions")
+
+@order_bp.route("/grid", methods=["GET", "POST"])
+def order_grid():
+    """Enter the portions of every customer for one date on a single page"""
+    day = parse_date_arg(request.values.get("date")) or date.today()
+    customers = customer_choices.get()
+    closed = closed_through()
+
+    # Satu pelanggan bisa punya beberapa pesanan di tanggal yang sama
+    existing = {}
+    for order in DailyOrder.query.filter(DailyOrder.date == day).order_by(DailyOrder.id):
+        existing.setdefault(order.customer_id, []).append(order)
+    values = {
+        customer_id: {field: sum(getattr(order, field) or 0 for order in orders) for field in GRID_FIELDS}
+        for customer_id, orders in existing.items()
+    }
+
+    errors = {}
+    if request.method == "POST":
+        submitted = {}
+        for customer in customers:
+            row = {}
+            for field in GRID_FIELDS:
+                raw = request.form.get(f"{field}-{customer.id}", "").strip()
+                if not raw:
+                    row[field] = 0
+                elif raw.isdigit():
+                    row[field] = int(raw)
+                else:
+                    row[field] = raw
+                    errors[customer.id] = "Porsi harus berupa angka 0 atau lebih"
+            submitted[customer.id] = row
+
+        if errors:
+            flash("Periksa kembali isian porsi yang ditandai.", "danger")
+            values = submitted
+        elif closed is not None and day <= closed:
+            flash(f"Pesanan tidak disimpan, {ClosedPeriodError(closed)}.", "danger")
+            values = submitted
+        else:
+            changed = 0
+            for customer_id, row in submitted.items():
+                orders = existing.get(customer_id)
+                if not any(row.values()):
+                    # Porsi dikosongkan: hapus pesanan tanggal ini, termasuk yang 0 porsi
+                    for order in orders or []:
+                        db.session.delete(order)
+                    changed += bool(orders)
+                    continue
+                if row == values.get(customer_id):
+                    continue
+                if orders:
+                    # Gabungkan pesanan ganda ke pesanan pertama
+                    order = orders[0]
+                    for duplicate in orders[1:]:
+                        db.session.delete(duplicate)
+                else:
+                    order = DailyOrder(date=day, customer_id=customer_id)
+                    db.session.add(order)
+                # Kolom yang nilainya sama tetap ditulis, supaya semua UPDATE punya
+                # SET yang sama dan dikirim sebagai satu executemany
+                for field, portions in dict(row, total_portions=sum(row.values())).items():
+                    if getattr(order, field) == portions:
+                        flag_modified(order, field)
+                    else:
+                        setattr(order, field, portions)
+                changed += 1
+            db.session.commit()
+            invalidate_dashboard(DailyOrder)
+            flash(f"{changed} pesanan tanggal {day.strftime('%d/%m/%Y')} berhasil disimpan!", "success")
+            return redirect(url_for("orders.order_grid", date=day.isoformat()))
+
+    return render_template("order_grid.html", day=day, customers=customers, values=values, errors=errors,
+                           fields=GRID_FIELDS)
+
+@order_bp.route("/import", methods=["GET", "POST"])
+def import_orders_csv():
+    form = OrderImportForm()
+    result = None
+    if form.validate_on_submit():
+        # pydantic is only needed here, keep it out of app startup
+        from app.utils.imports import import_orders
+        
+        lines = io.TextIOWrapper(form.file.data.stream, encoding="utf-8-sig", newline="")
+        result = import_orders(lines, dry_run=form.dry_run.data)
+        if not result.dry_run:
+            invalidate_dashboard(DailyOrder)
+            flash(f"{result.imported} pesanan berhasil diimport!", "success")
+    return render_template("order_import.html", form=form, result=result)
+
 @order_bp.route("/<int:id>/edit", methods=["GET", "POST"])
 def edit_order(id):
     order = DailyOrder.query.get_or_404(id)
@@ -38,6 +169,7 @@ def edit_order(id):
     if form.validate_on_submit():
         form.populate_obj(order)
         db.session.commit()
+        invalidate_dashboard(DailyOrder)
         flash("DailyOrder berhasil diperbarui!", "success")
         return redirect(url_for("orders.list_orders"))
     return render_template("order_form.html", form=form)
@@ -47,5 +179,6 @@ def delete_order(id):
     order = DailyOrder.query.get_or_404(id)
     db.session.delete(order)
     db.session.commit()
+    invalidate_dashboard(DailyOrder)
     flash("DailyOrder berhasil dihapus!", "danger")
     return redirect(url_for("orders.list_orders"))
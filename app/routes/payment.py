@@ -1,14 +1,35 @@
 from flask import Blueprint, render_template, redirect, url_for, flash, request
+from sqlalchemy import func
+from sqlalchemy.orm import joinedload
 from app.extensions import db
-from app.models import Payment, Customer
+from app.models import Payment
 from app.forms import PaymentForm
+from app.utils.helpers import ledger_filters
+from app.utils.customers import customer_choices
+from app.utils.dashboard import invalidate_dashboard
+from app.utils.pagination import keyset_paginate, ledger_filter_args
 
 payment_bp = Blueprint("payments", __name__, template_folder="../templates/payment")
 
 @payment_bp.route("/")
 def list_payments():
-    payments = Payment.query.all()
-    return render_template("payment_list.html", payments=payments)
+    filters = ledger_filter_args(request.args)
+    query = Payment.query.filter(*ledger_filters(Payment, **filters))
+
+    totals = query.with_entities(
+        func.count(Payment.id).label("count"),
+        func.coalesce(func.sum(Payment.amount), 0).label("amount"),
+    ).one()
+    page = keyset_paginate(
+        query.options(joinedload(Payment.customer)), Payment,
+        cursor=request.args.get("cursor"),
+        per_page=request.args.get("per_page", type=int),
+    )
+    customers = customer_choices.get()
+    return render_template(
+        "payment_list.html", payments=page.items, page=page, totals=totals, customers=customers,
+        filters=filters, filtered=any(filters.values()),
+    )
 
 @payment_bp.route("/new", methods=["GET", "POST"])
 def new_payment():
@@ -22,10 +43,9 @@ def new_payment():
         )
         db.session.add(payment)
         db.session.commit()
+        invalidate_dashboard(Payment)
         flash("Payment berhasil ditambahkan!", "success")
         return redirect(url_for("payments.list_payments"))
-    customers = Customer.query.all()
-    form.customer_id.choices = [(c.id, c.name) for c in customers]    
     return render_template("payment_form.html", form=form)
 
 @payment_bp.route("/<int:id>/edit", methods=["GET", "POST"])
@@ -35,6 +55,7 @@ def edit_payment(id):
     if form.validate_on_submit():
         form.populate_obj(payment)
         db.session.commit()
+        invalidate_dashboard(Payment)
         flash("Payment berhasil diperbarui!", "success")
         return redirect(url_for("payments.list_payments"))
     return render_template("payment_form.html", form=form)
@@ -44,5 +65,6 @@ def delete_payment(id):
     payment = Payment.query.get_or_404(id)
     db.session.delete(payment)
     db.session.commit()
+    invalidate_dashboard(Payment)
     flash("Payment berhasil dihapus!", "danger")
     return redirect(url_for("payments.list_payments"))
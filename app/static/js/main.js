@@ -9,4 +9,45 @@ document.addEventListener('DOMContentLoaded', function() {
             setTimeout(() => message.remove(), 500);
         }, 5000);
     });
-});
\ No newline at end of file
+});
+// Type-ahead customer picker, used instead of a <select> for large customer lists
+document.addEventListener('DOMContentLoaded', function() {
+    document.querySelectorAll('[data-customer-search]').forEach(container => {
+        const url = container.dataset.customerSearch;
+        const textInput = container.querySelector('input[type="text"]');
+        const hiddenInput = container.querySelector('input[type="hidden"]');
+        const list = container.querySelector('ul');
+        let timer = null;
+
+        function choose(customer) {
+            textInput.value = customer.name;
+            hiddenInput.value = customer.id;
+            list.classList.add('hidden');
+            hiddenInput.dispatchEvent(new Event('change', { bubbles: true }));
+        }
+
+        textInput.addEventListener('input', () => {
+            hiddenInput.value = '';
+            clearTimeout(timer);
+            timer = setTimeout(() => {
+                fetch(`${url}?q=${encodeURIComponent(textInput.value)}`)
+                    .then(response => response.json())
+                    .then(customers => {
+                        list.innerHTML = '';
+                        customers.forEach(customer => {
+                            const item = document.createElement('li');
+                            item.textContent = customer.name;
+                            item.className = 'px-4 py-2 hover:bg-gray-100';
+                            // cursor-pointer isn't in the compiled stylesheet
+                            item.style.cursor = 'pointer';
+                            item.addEventListener('mousedown', () => choose(customer));
+                            list.appendChild(item);
+                        });
+                        list.classList.toggle('hidden', customers.length === 0);
+                    });
+            }, 200);
+        });
+
+        textInput.addEventListener('blur', () => list.classList.add('hidden'));
+    });
+});
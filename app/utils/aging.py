@@ -0,0 +1,150 @@
+from collections import namedtuple
+from datetime import date, timedelta
+
+from sqlalchemy import and_, case, func, select, union_all
+
+from app.models import db, Customer, DailyOrder, Kasbon, Payment, PeriodClose, ARCHIVES
+from app.utils.helpers import calculate_catering_cost
+
+# (key, label, oldest age in days or None for open-ended); ages are counted
+# from the charge date to the report date
+AGING_BUCKETS = (
+    ('days_0_7', '0–7 hari', 7),
+    ('days_8_30', '8–30 hari', 30),
+    ('days_31_60', '31–60 hari', 60),
+    ('days_over_60', '> 60 hari', None),
+)
+
+AgingRow = namedtuple('AgingRow', [
+    'customer_id', 'customer_name', 'catering_cost', 'total_kasbon', 'total_payments', 'outstanding',
+    *(key for key, _, _ in AGING_BUCKETS),
+])
+
+# Just the pricing columns calculate_catering_cost reads
+_Pricing = namedtuple('_Pricing', ['price_per_bundle', 'portions_per_bundle'])
+
+
+def _cutoffs(as_of: date) -> list:
+    """First day of each closed-ended bucket, newest bucket first"""
+    return [as_of - timedelta(days=oldest) for _, _, oldest in AGING_BUCKETS if oldest is not None]
+
+
+def aging_query(as_of: date):
+    """
+    Select per-customer ledger sums at every bucket cutoff, up to ``as_of``
+
+    Rows are (customer_id, name, price_per_bundle, portions_per_bundle,
+    opening closed_through, opening total_portions, opening catering_cost,
+    portions, *portions before each cutoff, kasbon, *kasbon before each
+    cutoff, payments). Every sum is a conditional SUM of one grouped pass
+    over the live and archived ledger, so the whole report is one
+    statement.
+    """
+    cutoffs = _cutoffs(as_of)
+
+    def ledger(model, amount_attr):
+        return union_all(*(
+            select(source.customer_id, source.date, getattr(source, amount_attr).label('amount'))
+            .where(source.date <= as_of)
+            for source in (model, ARCHIVES[model])
+        )).subquery()
+
+    def sums(model, amount_attr):
+        rows = ledger(model, amount_attr)
+        return (
+            select(
+                rows.c.customer_id,
+                func.sum(rows.c.amount).label('total'),
+                *(func.sum(case((rows.c.date < cutoff, rows.c.amount), else_=0)).label(f'before_{i}')
+                  for i, cutoff in enumerate(cutoffs)),
+            )
+            .group_by(rows.c.customer_id)
+            .subquery()
+        )
+
+    orders = sums(DailyOrder, 'total_portions')
+    kasbons = sums(Kasbon, 'total_amount')
+    paid = ledger(Payment, 'amount')
+    payments = select(paid.c.customer_id, func.sum(paid.c.amount).label('total')).group_by(paid.c.customer_id).subquery()
+    latest = (
+        select(func.max(PeriodClose.closed_through))
+        .where(PeriodClose.customer_id == Customer.id, PeriodClose.closed_through <= as_of)
+        .correlate(Customer)
+        .scalar_subquery()
+    )
+
+    def columns(ledger):
+        return [func.coalesce(ledger.c.total, 0),
+                *(func.coalesce(ledger.c[f'before_{i}'], 0) for i in range(len(cutoffs)))]
+
+    return (
+        select(
+            Customer.id, Customer.name, Customer.price_per_bundle, Customer.portions_per_bundle,
+            PeriodClose.closed_through, PeriodClose.total_portions, PeriodClose.catering_cost,
+            *columns(orders), *columns(kasbons), func.coalesce(payments.c.total, 0),
+        )
+        .outerjoin(PeriodClose, and_(PeriodClose.customer_id == Customer.id, PeriodClose.closed_through == latest))
+        .outerjoin(orders, orders.c.customer_id == Customer.id)
+        .outerjoin(kasbons, kasbons.c.customer_id == Customer.id)
+        .outerjoin(payments, payments.c.customer_id == Customer.id)
+    )
+
+
+def _aging_row(row, as_of: date, cutoffs: list) -> AgingRow:
+    """
+    Spread a customer's outstanding balance over the age buckets
+
+    Catering is charged as the bundled cost grows, so what was charged
+    before a cutoff is calculate_catering_cost of the portions ordered
+    before it, and a partial bundle counts from the day it was opened.
+    Closed periods keep their closing catering cost, as in build_summary.
+    Payments settle the oldest charges first (FIFO), which leaves the newest
+    charges unpaid: the outstanding balance is taken from the newest bucket
+    backwards, each bucket giving at most what was charged in it. A closing
+    price different from today's can make the cumulative charge drop
+    between two points; that bucket then counts as charged nothing, never
+    as a negative amount.
+    """
+    (customer_id, name, price_per_bundle, portions_per_bundle,
+     closed_through, closed_portions, closed_catering, *sums, total_payments) = row
+    sums = [int(amount) for amount in sums]
+    total_payments = int(total_payments)
+    portions, kasbon = sums[:len(cutoffs) + 1], sums[len(cutoffs) + 1:]
+    pricing = _Pricing(price_per_bundle, portions_per_bundle)
+    catering = [calculate_catering_cost(pricing, total)[2] for total in portions]
+    if closed_through is not None:
+        adjustment = closed_catering - calculate_catering_cost(pricing, closed_portions)[2]
+        # as_of, then each cutoff: only points after the close include the closed cost
+        for i, point in enumerate([as_of + timedelta(days=1), *cutoffs]):
+            if point > closed_through:
+                catering[i] += adjustment
+
+    # Cumulative charges at as_of and before each cutoff, then per bucket
+    charged = [cost + amount for cost, amount in zip(catering, kasbon)] + [0]
+    remaining = max(charged[0] - total_payments, 0)
+    buckets = []
+    for newer, older in zip(charged, charged[1:]):
+        unpaid = min(remaining, max(newer - older, 0))
+        buckets.append(unpaid)
+        remaining -= unpaid
+    return AgingRow(customer_id, name, catering[0], kasbon[0], total_payments,
+                    charged[0] - total_payments, *buckets)
+
+
+def aging_report(as_of: date = None) -> list:
+    """Receivables aging for every customer as AgingRow tuples, largest balance first"""
+    as_of = as_of or date.today()
+    cutoffs = _cutoffs(as_of)
+    rows = [_aging_row(row, as_of, cutoffs) for row in db.session.execute(aging_query(as_of))]
+    rows.sort(key=lambda row: (-row.outstanding, row.customer_id))
+    return rows
+
+
+def aging_totals(rows: list) -> dict:
+    """Column totals of an aging report, over the customers that owe money"""
+    owing = [row for row in rows if row.outstanding > 0]
+    return {
+        'customers': len(owing),
+        'outstanding': sum(row.outstanding for row in owing),
+        **{key: sum(getattr(row, key) for row in owing) for key, _, _ in AGING_BUCKETS},
+    }
@@ -0,0 +1,64 @@
+from importlib.util import find_spec
+
+from sqlalchemy.engine import make_url
+
+from app.extensions import db
+from app.utils.engine import apply_sqlite_pragmas
+
+# Async DBAPI driver used for each SQLALCHEMY_DATABASE_URI backend
+ASYNC_DRIVERS = {
+    'sqlite': 'aiosqlite',
+    'postgresql': 'asyncpg',
+}
+
+
+def async_database_url(url):
+    """Same database as ``url``, addressed through its async driver"""
+    url = make_url(url)
+    backend = url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise RuntimeError(f'No async driver configured for {backend} databases')
+    return url.set(drivername=f'{backend}+{ASYNC_DRIVERS[backend]}')
+
+
+class AsyncDatabase:
+    """
+    SQLAlchemy async engine over the application's database
+
+    Only the ASGI entry point uses it, so the async drivers stay optional:
+    init_app raises RuntimeError when greenlet or the backend's driver
+    (aiosqlite, asyncpg) isn't installed.
+    """
+
+    def __init__(self, app=None):
+        self.engine = None
+        self.session = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        url = app.config.get('ASYNC_DATABASE_URL')
+        options = {}
+        if not url:
+            # Same database and pool profile as the sync engine; Flask-SQLAlchemy
+            # has already resolved relative SQLite paths
+            with app.app_context():
+                url = db.engine.url
+            options = app.config['SQLALCHEMY_ENGINE_OPTIONS']
+        url = async_database_url(url)
+
+        missing = [name for name in ('greenlet', ASYNC_DRIVERS[url.get_backend_name()]) if find_spec(name) is None]
+        if missing:
+            raise RuntimeError(f"Async database access needs {', '.join(missing)} installed")
+
+        try:
+            from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+        except ImportError as e:  # greenlet present but unusable
+            raise RuntimeError(str(e)) from e
+        self.engine = create_async_engine(url, **options)
+        apply_sqlite_pragmas(self.engine.sync_engine, app.config['SQLITE_PRAGMAS'])
+        self.session = async_sessionmaker(self.engine, expire_on_commit=False)
+
+    async def dispose(self):
+        if self.engine is not None:
+            await self.engine.dispose()
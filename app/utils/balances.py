@@ -0,0 +1,273 @@
+from calendar import monthrange
+from collections import defaultdict
+from datetime import date
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy import and_, case, event, func, inspect, or_, select
+
+from app.models import db, Customer, DailyOrder, Kasbon, Payment, CustomerBalance, ARCHIVES
+from app.utils.engine import upsert_insert
+
+# Ledger model -> (amount attribute on the ledger row, column on customer_balances)
+LEDGERS = {
+    DailyOrder: ('total_portions', 'total_portions'),
+    Kasbon: ('total_amount', 'total_kasbon'),
+    Payment: ('amount', 'total_payments'),
+}
+BALANCE_COLUMNS = ('total_portions', 'total_kasbon', 'total_payments')
+
+
+def month_key(day: date) -> str:
+    return day.strftime('%Y-%m')
+
+
+def month_expr(dialect, column):
+    """SQL expression turning a date column into a 'YYYY-MM' period key"""
+    if dialect.name == 'sqlite':
+        return func.strftime('%Y-%m', column)
+    return func.to_char(column, 'YYYY-MM')
+
+
+def balance_periods(start_date: date = None, end_date: date = None) -> Optional[list]:
+    """
+    Translate a summary date range into customer_balances period conditions
+
+    Returns None when the range doesn't line up with whole months, in which
+    case the caller has to aggregate the raw ledgers instead.
+    """
+    period = CustomerBalance.period
+    if start_date is None and end_date is None:
+        return [period == CustomerBalance.ALL_TIME]
+    if start_date is not None and start_date.day != 1:
+        return None
+    if end_date is not None and end_date.day != monthrange(end_date.year, end_date.month)[1]:
+        return None
+
+    conditions = [period != CustomerBalance.ALL_TIME]
+    if start_date is not None:
+        conditions.append(period >= month_key(start_date))
+    if end_date is not None:
+        conditions.append(period <= month_key(end_date))
+    return conditions
+
+
+class BalanceDelta:
+    """Pending change to one customer_balances row"""
+
+    def __init__(self):
+        self.amounts = defaultdict(int)
+        self.last_date = None
+        self.removed = False
+
+    def add(self, column: str, amount: int, day: date):
+        self.amounts[column] += amount
+        if self.last_date is None or day > self.last_date:
+            self.last_date = day
+
+
+def record_ledger_change(deltas: Dict[Tuple[int, str], BalanceDelta], model, customer_id: int,
+                         day: date, amount: int, sign: int = 1, moved: bool = True):
+    """Add one ledger row (sign=1) or take it away (sign=-1) in ``deltas``"""
+    column = LEDGERS[model][1]
+    for period in (CustomerBalance.ALL_TIME, month_key(day)):
+        delta = deltas.setdefault((customer_id, period), BalanceDelta())
+        if sign > 0:
+            delta.add(column, amount or 0, day)
+        else:
+            delta.amounts[column] -= amount or 0
+            delta.removed = delta.removed or moved
+
+
+def track_previous(*attributes):
+    """
+    Load the stored value of each mapped attribute before it is overwritten
+
+    A row expired by a commit doesn't hold its old values, so setting one
+    of these would otherwise leave no history and _previous() would return
+    the new value, cancelling the change out.
+    """
+    for attribute in attributes:
+        event.listen(attribute, 'set', lambda target, value, oldvalue, initiator: None, active_history=True)
+
+
+track_previous(*(getattr(model, attr) for model, (amount_attr, _) in LEDGERS.items()
+                 for attr in ('customer_id', 'date', amount_attr)))
+
+
+def _previous(obj, attr: str):
+    """Value of ``attr`` before the pending changes were flushed"""
+    history = inspect(obj).attrs[attr].history
+    if history.deleted:
+        return history.deleted[0]
+    return getattr(obj, attr)
+
+
+def collect_balance_deltas(session) -> Dict[Tuple[int, str], BalanceDelta]:
+    """Work out balance changes for the ledger rows in a flush"""
+    deltas = {}
+    deleted_customers = {obj.id for obj in session.deleted if isinstance(obj, Customer)}
+
+    for obj in session.new:
+        if type(obj) in LEDGERS:
+            amount_attr = LEDGERS[type(obj)][0]
+            record_ledger_change(deltas, type(obj), obj.customer_id, obj.date, getattr(obj, amount_attr))
+
+    for obj in session.dirty:
+        if type(obj) not in LEDGERS or not session.is_modified(obj, include_collections=False):
+            continue
+        amount_attr = LEDGERS[type(obj)][0]
+        old_key = (_previous(obj, 'customer_id'), _previous(obj, 'date'))
+        new_key = (obj.customer_id, obj.date)
+        record_ledger_change(deltas, type(obj), *old_key, _previous(obj, amount_attr),
+                             sign=-1, moved=old_key != new_key)
+        record_ledger_change(deltas, type(obj), *new_key, getattr(obj, amount_attr))
+
+    for obj in session.deleted:
+        if type(obj) in LEDGERS:
+            amount_attr = LEDGERS[type(obj)][0]
+            record_ledger_change(deltas, type(obj), _previous(obj, 'customer_id'), _previous(obj, 'date'),
+                                 _previous(obj, amount_attr), sign=-1)
+
+    return {key: delta for key, delta in deltas.items() if key[0] not in deleted_customers}
+
+
+def _last_activity(connection, customer_id: int, period: str) -> Optional[date]:
+    """Latest ledger date for a customer, optionally within one month"""
+    latest = []
+    for model in (*LEDGERS, *ARCHIVES.values()):
+        stmt = select(func.max(model.date)).where(model.customer_id == customer_id)
+        if period != CustomerBalance.ALL_TIME:
+            year, month = map(int, period.split('-'))
+            stmt = stmt.where(model.date.between(date(year, month, 1),
+                                                 date(year, month, monthrange(year, month)[1])))
+        value = connection.execute(stmt).scalar()
+        if value is not None:
+            latest.append(value)
+    return max(latest, default=None)
+
+
+def apply_balance_deltas(connection, deltas: Dict[Tuple[int, str], BalanceDelta]):
+    """
+    Apply pending deltas to customer_balances with in-place increments
+
+    One executemany upsert (INSERT ... ON CONFLICT DO UPDATE SET col = col
+    + excluded.col) covers rows that exist and rows that don't yet, so two
+    transactions writing a customer's first row of a month both land
+    instead of one failing on the unique constraint, and large batches
+    (imports) cost a handful of statements.
+    """
+    if not deltas:
+        return
+    table = CustomerBalance.__table__
+    rows = [
+        {
+            'customer_id': customer_id,
+            'period': period,
+            'last_activity_date': delta.last_date,
+            'version': 1,
+            **{column: delta.amounts.get(column, 0) for column in BALANCE_COLUMNS},
+        }
+        for (customer_id, period), delta in deltas.items()
+    ]
+
+    stmt = upsert_insert(connection.dialect, table)
+    last_date = stmt.excluded.last_activity_date
+    current = table.c.last_activity_date
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.customer_id, table.c.period],
+        set_={
+            'version': table.c.version + 1,
+            'last_activity_date': case(
+                (and_(last_date.is_not(None), or_(current.is_(None), current < last_date)), last_date),
+                else_=current,
+            ),
+            **{column: table.c[column] + stmt.excluded[column] for column in BALANCE_COLUMNS},
+        },
+    )
+    connection.execute(stmt, rows)
+
+    for (customer_id, period), delta in deltas.items():
+        if delta.removed:
+            key = (table.c.customer_id == customer_id) & (table.c.period == period)
+            connection.execute(table.update().where(key).values(
+                last_activity_date=_last_activity(connection, customer_id, period)
+            ))
+
+
+@event.listens_for(db.session, 'after_flush')
+def _update_balances(session, flush_context):
+    deltas = collect_balance_deltas(session)
+    if deltas:
+        apply_balance_deltas(session.connection(), deltas)
+
+
+def compute_balances(connection) -> Dict[Tuple[int, str], dict]:
+    """Recompute every customer_balances row from the raw ledgers, archived rows included"""
+    balances = {}
+    sources = [(source, amounts) for model, amounts in LEDGERS.items() for source in (model, ARCHIVES[model])]
+    for model, (amount_attr, column) in sources:
+        month = month_expr(connection.dialect, model.date)
+        stmt = select(
+            model.customer_id,
+            month,
+            func.coalesce(func.sum(getattr(model, amount_attr)), 0),
+            func.max(model.date),
+        ).group_by(model.customer_id, month)
+
+        for customer_id, period, amount, last_date in connection.execute(stmt):
+            for key in ((customer_id, CustomerBalance.ALL_TIME), (customer_id, period)):
+                row = balances.setdefault(key, dict.fromkeys(BALANCE_COLUMNS, 0))
+                row[column] += amount
+                if row.get('last_activity_date') is None or last_date > row['last_activity_date']:
+                    row['last_activity_date'] = last_date
+    return balances
+
+
+def rebuild_balances() -> int:
+    """Replace customer_balances with freshly computed totals, returning the row count"""
+    connection = db.session.connection()
+    table = CustomerBalance.__table__
+    versions = {
+        (customer_id, period): version
+        for customer_id, period, version in connection.execute(
+            select(table.c.customer_id, table.c.period, table.c.version)
+        )
+    }
+    rows = [
+        {'customer_id': customer_id, 'period': period, 'version': versions.get((customer_id, period), 0) + 1, **values}
+        for (customer_id, period), values in compute_balances(connection).items()
+    ]
+
+    connection.execute(table.delete())
+    if rows:
+        connection.execute(table.insert(), rows)
+    db.session.commit()
+    return len(rows)
+
+
+def check_balances() -> list:
+    """
+    Compare customer_balances against the raw ledgers
+
+    Returns:
+        list: (customer_id, period, column, expected, stored) for every mismatch
+    """
+    connection = db.session.connection()
+    expected = compute_balances(connection)
+    table = CustomerBalance.__table__
+    columns = BALANCE_COLUMNS + ('last_activity_date',)
+
+    stored = {
+        (row.customer_id, row.period): {column: getattr(row, column) for column in columns}
+        for row in connection.execute(select(table))
+    }
+
+    mismatches = []
+    empty = dict.fromkeys(BALANCE_COLUMNS, 0)
+    for key in sorted(expected.keys() | stored.keys()):
+        want = expected.get(key, empty)
+        have = stored.get(key, empty)
+        for column in columns:
+            if want.get(column) != have.get(column):
+                mismatches.append((*key, column, want.get(column), have.get(column)))
+    return mismatches
@@ -0,0 +1,87 @@
+import importlib.util
+from typing import NamedTuple, Sequence, Union
+
+# NumPy is optional (the pure-Python path gives the same results) and only
+# imported on first use, so app startup doesn't pay for it
+HAS_NUMPY = importlib.util.find_spec('numpy') is not None
+
+IntArray = Union[int, Sequence[int]]
+
+
+class BillingResult(NamedTuple):
+    """
+    Per-row billing figures, in input order
+
+    Fields are NumPy int64 arrays on the NumPy path and lists of ints on the
+    pure-Python path.
+    """
+    total_bundles: Sequence[int]
+    charged_portions: Sequence[int]
+    remaining_portions: Sequence[int]
+    catering_cost: Sequence[int]
+
+
+def _bill_python(portions, portions_per_bundle, price_per_bundle) -> BillingResult:
+    size = max((len(v) for v in (portions, portions_per_bundle, price_per_bundle) if isinstance(v, list)),
+               default=1)
+    columns = [v if isinstance(v, list) else [v] * size for v in (portions, portions_per_bundle, price_per_bundle)]
+    if any(len(column) != size for column in columns):
+        raise ValueError('portions, portions_per_bundle and price_per_bundle must have the same length')
+
+    bundles, charged, remaining, cost = [], [], [], []
+    for total_portions, per_bundle, price in zip(*columns):
+        if per_bundle <= 0:
+            row_bundles = row_charged = row_cost = 0
+            row_remaining = 0
+        else:
+            row_bundles = -(-total_portions // per_bundle)
+            row_charged = row_bundles * per_bundle
+            row_cost = row_bundles * price
+            row_remaining = row_charged - total_portions
+        bundles.append(row_bundles)
+        charged.append(row_charged)
+        remaining.append(row_remaining)
+        cost.append(row_cost)
+    return BillingResult(bundles, charged, remaining, cost)
+
+
+def _bill_numpy(portions, portions_per_bundle, price_per_bundle) -> BillingResult:
+    import numpy as np
+
+    portions, per_bundle, price = np.broadcast_arrays(
+        np.asarray(portions, dtype=np.int64),
+        np.asarray(portions_per_bundle, dtype=np.int64),
+        np.asarray(price_per_bundle, dtype=np.int64),
+    )
+    billable = per_bundle > 0
+    safe_per_bundle = np.where(billable, per_bundle, 1)
+
+    # Ceiling division, same as bundles + 1 for a partial bundle
+    bundles = np.where(billable, -np.floor_divide(-portions, safe_per_bundle), 0)
+    charged = bundles * per_bundle
+    remaining = np.where(billable, charged - portions, 0)
+    return BillingResult(bundles, charged, remaining, bundles * price)
+
+
+def bill_many(portions: IntArray, portions_per_bundle: IntArray, price_per_bundle: IntArray,
+              use_numpy: bool = None) -> BillingResult:
+    """
+    Vectorized calculate_catering_cost over many customers or days at once
+
+    Each argument is a sequence (one entry per row) or a single int applied
+    to every row, e.g. one price_per_bundle for a what-if over all
+    customers. Results match calculate_catering_cost row for row.
+
+    ``use_numpy`` defaults to using NumPy when it is installed.
+    """
+    if use_numpy is None:
+        use_numpy = HAS_NUMPY
+    if use_numpy:
+        if not HAS_NUMPY:
+            raise RuntimeError('NumPy is not installed')
+        return _bill_numpy(portions, portions_per_bundle, price_per_bundle)
+
+    def as_list(value):
+        return value if isinstance(value, int) else list(value)
+
+    return _bill_python(as_list(portions), as_list(portions_per_bundle), as_list(price_per_bundle))
@@ -0,0 +1,161 @@
+import pickle
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Optional
+
+# Returned by backends for a missing key, so None can be cached
+MISSING = object()
+
+
+class MemoryBackend:
+    """Thread-safe in-process LRU with per-entry expiry"""
+
+    def __init__(self, maxsize: int = 512):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return MISSING
+            expires_at, value = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._entries[key]
+                return MISSING
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value, ttl: Optional[int] = None):
+        expires_at = time.monotonic() + ttl if ttl else None
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def delete(self, *keys: str):
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class RedisBackend:
+    """
+    Backend for a Redis server, shared by all worker processes
+
+    ``client`` only needs redis-py's get/set/delete/scan_iter, so a local
+    fake (e.g. fakeredis) can stand in for a server. Values are pickled.
+    """
+
+    def __init__(self, client, prefix: str = 'cache:'):
+        self.client = client
+        self.prefix = prefix
+
+    @classmethod
+    def from_url(cls, url: str, prefix: str = 'cache:') -> 'RedisBackend':
+        try:
+            import redis
+        except ImportError as e:
+            raise RuntimeError('CACHE_BACKEND="redis" requires the redis package') from e
+        return cls(redis.Redis.from_url(url), prefix)
+
+    def get(self, key: str):
+        data = self.client.get(self.prefix + key)
+        return MISSING if data is None else pickle.loads(data)
+
+    def set(self, key: str, value, ttl: Optional[int] = None):
+        self.client.set(self.prefix + key, pickle.dumps(value), ex=ttl or None)
+
+    def delete(self, *keys: str):
+        if keys:
+            self.client.delete(*(self.prefix + key for key in keys))
+
+    def clear(self):
+        keys = list(self.client.scan_iter(match=self.prefix + '*'))
+        if keys:
+            self.client.delete(*keys)
+
+
+class Cache:
+    """
+    Application cache in front of a pluggable backend
+
+    The backend is picked by CACHE_BACKEND ('memory' or 'redis'). Hit and
+    miss counters are kept per process.
+    """
+
+    def __init__(self, app=None):
+        self.backend = MemoryBackend()
+        self.default_ttl = 30
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.default_ttl = app.config['CACHE_DEFAULT_TTL']
+        backend = app.config['CACHE_BACKEND']
+        if backend == 'memory':
+            self.backend = MemoryBackend(app.config['CACHE_MAXSIZE'])
+        elif backend == 'redis':
+            self.backend = RedisBackend.from_url(app.config['CACHE_REDIS_URL'])
+        else:
+            raise ValueError(f'Unknown CACHE_BACKEND {backend!r}')
+        app.extensions['cache'] = self
+
+    def _count(self, hit: bool):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def get(self, key: str, default=None):
+        value = self.backend.get(key)
+        self._count(value is not MISSING)
+        return default if value is MISSING else value
+
+    def set(self, key: str, value, ttl: Optional[int] = None):
+        self.backend.set(key, value, ttl if ttl is not None else self.default_ttl)
+
+    def get_or_set(self, key: str, factory: Callable[[], Any], ttl: Optional[int] = None):
+        """Cached value for ``key``, computing and storing it with ``factory`` on a miss"""
+        value = self.backend.get(key)
+        self._count(value is not MISSING)
+        if value is MISSING:
+            value = factory()
+            self.set(key, value, ttl)
+        return value
+
+    async def get_or_set_async(self, key: str, factory: Callable[[], Awaitable[Any]], ttl: Optional[int] = None):
+        """get_or_set for a coroutine ``factory``, used by the async read paths"""
+        value = self.backend.get(key)
+        self._count(value is not MISSING)
+        if value is MISSING:
+            value = await factory()
+            self.set(key, value, ttl)
+        return value
+
+    def delete(self, *keys: str):
+        self.backend.delete(*keys)
+
+    def clear(self):
+        self.backend.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'backend': type(self.backend).__name__,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': round(self.hits / total, 4) if total else None,
+            }
@@ -0,0 +1,60 @@
+import threading
+import time
+from collections import namedtuple
+from typing import List, Optional
+
+from app.models import db, Customer
+
+CustomerChoice = namedtuple('CustomerChoice', ['id', 'name'])
+
+
+class CustomerChoices:
+    """
+    Process-level cache of the (id, name) pairs behind every customer select
+
+    customer_bp invalidates it whenever a customer is created, edited or
+    deleted. ``ttl`` (seconds) bounds how long other worker processes, which
+    don't see that invalidation, can keep serving an outdated list.
+    """
+
+    def __init__(self, ttl: int = 60):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._choices: Optional[List[CustomerChoice]] = None
+        self._loaded_at = 0.0
+
+    def get(self) -> List[CustomerChoice]:
+        """Customers ordered by name, loaded at most once per ``ttl``"""
+        with self._lock:
+            if self._choices is None or time.monotonic() - self._loaded_at > self.ttl:
+                rows = db.session.execute(db.select(Customer.id, Customer.name).order_by(Customer.name))
+                self._choices = [CustomerChoice(*row) for row in rows]
+                self._loaded_at = time.monotonic()
+            return self._choices
+
+    def invalidate(self):
+        with self._lock:
+            self._choices = None
+
+    def search(self, term: str, limit: int = 20) -> List[CustomerChoice]:
+        """
+        Customers whose name contains ``term``, case-insensitively
+
+        Names starting with the term are listed first.
+        """
+        term = term.strip().casefold()
+        if not term:
+            return self.get()[:limit]
+        prefix, contains = [], []
+        for choice in self.get():
+            position = choice.name.casefold().find(term)
+            if position == 0:
+                prefix.append(choice)
+            elif position > 0:
+                contains.append(choice)
+            if len(prefix) >= limit:
+                break
+        return (prefix + contains)[:limit]
+
+
+customer_choices = CustomerChoices()
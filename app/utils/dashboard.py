@@ -0,0 +1,175 @@
+from datetime import date, timedelta
+
+from flask import current_app
+from sqlalchemy import func, select
+from sqlalchemy.orm import joinedload
+
+from app.extensions import cache
+from app.models import db, Customer, DailyOrder, Kasbon, Payment, DailyRollup, MonthlyRollup
+from app.utils.helpers import ledger_counts_query
+
+TREND_MONTHS = 12
+BULAN_SINGKAT = ['Jan', 'Feb', 'Mar', 'Apr', 'Mei', 'Jun', 'Jul', 'Agu', 'Sep', 'Okt', 'Nov', 'Des']
+
+# Cache keys of the dashboard blocks; the stats block depends on every ledger
+STATS_KEY = 'dashboard:stats'
+RECENT_KEYS = {
+    DailyOrder: 'dashboard:recent_orders',
+    Kasbon: 'dashboard:recent_kasbons',
+    Payment: 'dashboard:recent_payments',
+}
+
+
+def invalidate_dashboard(*models):
+    """
+    Drop the cached dashboard blocks affected by writes to ``models``
+
+    Called by the ledger and customer handlers after they commit. With no
+    arguments every block is dropped.
+    """
+    models = models or tuple(RECENT_KEYS)
+    cache.delete(STATS_KEY, *(RECENT_KEYS[model] for model in models if model in RECENT_KEYS))
+
+
+def _ttl() -> int:
+    return current_app.config['DASHBOARD_CACHE_TTL']
+
+
+def monthly_trend(session, today: date, months: int) -> list:
+    """Monthly rollups for the last ``months`` months up to ``today``, oldest first, gaps filled with zeros"""
+    first = today.replace(day=1)
+    for _ in range(months - 1):
+        first = (first - timedelta(days=1)).replace(day=1)
+
+    rollups = {
+        rollup.month: rollup
+        for rollup in session.scalars(
+            select(MonthlyRollup).where(MonthlyRollup.month >= first, MonthlyRollup.month <= today)
+        )
+    }
+    trend = []
+    month = first
+    while month <= today:
+        rollup = rollups.get(month)
+        trend.append({
+            'month': month,
+            'label': f"{BULAN_SINGKAT[month.month - 1]} {month:%y}",
+            'catering_revenue': rollup.catering_revenue if rollup else 0,
+            'payment_total': rollup.payment_total if rollup else 0,
+        })
+        month = (month + timedelta(days=32)).replace(day=1)
+    return trend
+
+
+def _customer_dict(customer: Customer) -> dict:
+    return {
+        'id': customer.id,
+        'name': customer.name,
+        'price_per_bundle': customer.price_per_bundle,
+        'portions_per_bundle': customer.portions_per_bundle,
+    }
+
+
+# The loaders take a plain Session so the async variant can run them
+# unchanged through AsyncSession.run_sync
+
+def _load_stats(session) -> dict:
+    today = date.today()
+    today_rollup = session.get(DailyRollup, today)
+    revenue_trend = monthly_trend(session, today, TREND_MONTHS)
+    return {
+        'total_customers': session.scalar(select(func.count(Customer.id))),
+        'customers': [
+            (_customer_dict(customer), *counts) for customer, *counts in session.execute(ledger_counts_query(limit=5))
+        ],
+        # Pesanan hari ini
+        'today_orders_count': today_rollup.order_count if today_rollup else 0,
+        'today_total_portions': today_rollup.total_portions if today_rollup else 0,
+        # Total kasbon yang belum dibayar
+        'total_kasbon': session.scalar(select(func.coalesce(func.sum(MonthlyRollup.kasbon_total), 0))),
+        # Pendapatan bulan ini dan tren 12 bulan terakhir
+        'monthly_revenue': revenue_trend[-1]['payment_total'],
+        'revenue_trend': revenue_trend,
+        'trend_max': max((max(m['catering_revenue'], m['payment_total']) for m in revenue_trend), default=0),
+    }
+
+
+def _load_recent_orders(session) -> list:
+    # Pesanan terbaru (7 hari terakhir)
+    seven_days_ago = date.today() - timedelta(days=7)
+    recent_orders = session.scalars(
+        select(DailyOrder).options(joinedload(DailyOrder.customer)).where(
+            DailyOrder.date >= seven_days_ago
+        ).order_by(DailyOrder.date.desc()).limit(10)
+    ).all()
+    return [{
+        'id': order.id,
+        'date': order.date,
+        'customer_id': order.customer_id,
+        'customer_name': order.customer.name if order.customer else "Unknown",
+        'morning_portions': order.morning_portions,
+        'afternoon_portions': order.afternoon_portions,
+        'evening_portions': order.evening_portions,
+        'total_portions': order.total_portions,
+        'paid': True  # Asumsi sederhana, bisa disesuaikan dengan logika bisnis
+    } for order in recent_orders]
+
+
+def _load_recent_kasbons(session) -> list:
+    recent_kasbons = session.scalars(
+        select(Kasbon).options(joinedload(Kasbon.customer)).order_by(Kasbon.date.desc()).limit(5)
+    ).all()
+    return [{
+        'id': kasbon.id,
+        'date': kasbon.date,
+        'item_name': kasbon.item_name,
+        'total_amount': kasbon.total_amount,
+        'customer': _customer_dict(kasbon.customer),
+    } for kasbon in recent_kasbons]
+
+
+def _load_recent_payments(session) -> list:
+    recent_payments = session.scalars(
+        select(Payment).options(joinedload(Payment.customer)).order_by(Payment.date.desc()).limit(5)
+    ).all()
+    return [{
+        'id': payment.id,
+        'date': payment.date,
+        'amount': payment.amount,
+        'description': payment.description,
+        'customer': _customer_dict(payment.customer),
+    } for payment in recent_payments]
+
+
+BLOCKS = (
+    (STATS_KEY, None, _load_stats),
+    (RECENT_KEYS[DailyOrder], 'recent_orders', _load_recent_orders),
+    (RECENT_KEYS[Kasbon], 'recent_kasbons', _load_recent_kasbons),
+    (RECENT_KEYS[Payment], 'recent_payments', _load_recent_payments),
+)
+
+
+def _context(blocks: list) -> dict:
+    context = {}
+    for (_, name, _), value in zip(BLOCKS, blocks):
+        if name is None:
+            context.update(value)
+        else:
+            context[name] = value
+    return context
+
+
+def dashboard_context() -> dict:
+    """Template context for the dashboard, each block served from cache when fresh"""
+    return _context([
+        cache.get_or_set(key, lambda loader=loader: loader(db.session), ttl=_ttl())
+        for key, _, loader in BLOCKS
+    ])
+
+
+async def dashboard_context_async(session) -> dict:
+    """dashboard_context over an AsyncSession, loading stale blocks with the same loaders"""
+    blocks = []
+    for key, _, loader in BLOCKS:
+        blocks.append(await cache.get_or_set_async(key, lambda loader=loader: session.run_sync(loader), ttl=_ttl()))
+    return _context(blocks)
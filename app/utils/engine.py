@@ -0,0 +1,36 @@
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+def apply_sqlite_pragmas(engine: Engine, pragmas: dict):
+    """
+    Run ``PRAGMA name=value`` for each entry on every new connection of ``engine``
+
+    Does nothing for non-SQLite engines, so it can be called unconditionally.
+    Works for the async engine too through its ``sync_engine``.
+    """
+    if engine.dialect.name != 'sqlite' or not pragmas:
+        return
+
+    @event.listens_for(engine, 'connect')
+    def set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f'PRAGMA {name}={value}')
+        cursor.close()
+
+
+def upsert_insert(dialect, table):
+    """
+    INSERT for ``table`` that supports ``on_conflict_do_update()`` on ``dialect``
+
+    SQLite and PostgreSQL share the ON CONFLICT syntax; their dialect
+    modules are only imported when first needed.
+    """
+    if dialect.name == 'sqlite':
+        from sqlalchemy.dialects.sqlite import insert
+    elif dialect.name == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        raise NotImplementedError(f'ON CONFLICT upserts are not supported on {dialect.name}')
+    return insert(table)
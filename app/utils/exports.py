@@ -0,0 +1,200 @@
+import csv
+import io
+import re
+from datetime import date
+from typing import Iterable, Iterator, Sequence
+from xml.sax.saxutils import escape
+
+from sqlalchemy import select
+
+from app.models import db, Customer, DailyOrder, Kasbon, Payment, ARCHIVES
+from app.utils.helpers import build_summaries, customer_totals_query, ledger_filters
+from app.utils.streaming import stream_zip
+
+# Rows fetched per round trip; results are streamed, never loaded whole
+EXPORT_BATCH_SIZE = 1000
+
+LEDGER_EXPORTS = {
+    'orders': (DailyOrder, [
+        ('Tanggal', DailyOrder.date),
+        ('ID Pelanggan', DailyOrder.customer_id),
+        ('Pelanggan', Customer.name),
+        ('Pagi', DailyOrder.morning_portions),
+        ('Siang', DailyOrder.afternoon_portions),
+        ('Sore', DailyOrder.evening_portions),
+        ('Total Porsi', DailyOrder.total_portions),
+    ]),
+    'kasbons': (Kasbon, [
+        ('Tanggal', Kasbon.date),
+        ('ID Pelanggan', Kasbon.customer_id),
+        ('Pelanggan', Customer.name),
+        ('Item', Kasbon.item_name),
+        ('Jumlah', Kasbon.quantity),
+        ('Harga Satuan', Kasbon.unit_price),
+        ('Total', Kasbon.total_amount),
+    ]),
+    'payments': (Payment, [
+        ('Tanggal', Payment.date),
+        ('ID Pelanggan', Payment.customer_id),
+        ('Pelanggan', Customer.name),
+        ('Jumlah', Payment.amount),
+        ('Keterangan', Payment.description),
+    ]),
+}
+
+SUMMARY_HEADER = [
+    'ID Pelanggan', 'Pelanggan', 'Total Porsi', 'Total Bundle', 'Porsi Ditagih', 'Biaya Catering',
+    'Total Kasbon', 'Total Tagihan', 'Total Pembayaran', 'Sisa Saldo',
+]
+
+EXPORT_KINDS = tuple(LEDGER_EXPORTS) + ('summaries',)
+
+
+def _ledger_rows(kind: str, customer_id: int = None, start_date: date = None,
+                 end_date: date = None) -> Iterator[tuple]:
+    model, columns = LEDGER_EXPORTS[kind]
+    # Archived rows are all older than the live ones, so reading the archive
+    # first keeps the export in date order
+    for source in (ARCHIVES[model], model):
+        stmt = (
+            select(*(getattr(source, column.key) if column.class_ is model else column for _, column in columns))
+            .join(Customer, Customer.id == source.customer_id)
+            .where(*ledger_filters(source, customer_id, start_date, end_date))
+            .order_by(source.date, source.id)
+            .execution_options(yield_per=EXPORT_BATCH_SIZE)
+        )
+        for row in db.session.execute(stmt):
+            yield tuple(row)
+
+
+def _summary_rows(customer_id: int = None, start_date: date = None, end_date: date = None) -> Iterator[tuple]:
+    customer_ids = [customer_id] if customer_id is not None else None
+    stmt = customer_totals_query(customer_ids, start_date, end_date).execution_options(yield_per=EXPORT_BATCH_SIZE)
+    for rows in db.session.execute(stmt).partitions():
+        for summary in build_summaries(rows):
+            customer = summary['customer']
+            yield (
+                customer.id, customer.name, summary['total_portions'], summary['total_bundles'],
+                summary['charged_portions'], summary['catering_cost'], summary['total_kasbon'],
+                summary['total_bill'], summary['total_payments'], summary['remaining_balance'],
+            )
+
+
+def export_rows(kind: str, customer_id: int = None, start_date: date = None, end_date: date = None):
+    """
+    Header and lazily fetched rows for one export
+
+    Accepts the same customer/date filters as get_customer_summary.
+
+    Returns:
+        tuple: (header, row iterator)
+    """
+    if kind == 'summaries':
+        return SUMMARY_HEADER, _summary_rows(customer_id, start_date, end_date)
+    return [label for label, _ in LEDGER_EXPORTS[kind][1]], _ledger_rows(kind, customer_id, start_date, end_date)
+
+
+def iter_csv(header: Sequence[str], rows: Iterable[tuple], chunk_rows: int = 500) -> Iterator[bytes]:
+    """Encode rows as UTF-8 CSV, yielding a chunk every ``chunk_rows`` rows"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    # BOM so spreadsheet apps pick UTF-8 for customer names
+    buffer.write('﻿')
+    writer.writerow(header)
+
+    for count, row in enumerate(rows, 1):
+        writer.writerow(row)
+        if count % chunk_rows == 0:
+            yield buffer.getvalue().encode('utf-8')
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue().encode('utf-8')
+
+
+_XML_ILLEGAL = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f]')
+
+_XLSX_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '<Override PartName="/xl/worksheets/sheet1.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+    '</Types>'
+).encode()
+_XLSX_ROOT_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+    'Target="xl/workbook.xml"/>'
+    '</Relationships>'
+).encode()
+_XLSX_WORKBOOK_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+    'Target="worksheets/sheet1.xml"/>'
+    '</Relationships>'
+).encode()
+
+
+def _xlsx_workbook(sheet_name: str) -> bytes:
+    return (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+        'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+        f'<sheets><sheet name="{escape(sheet_name[:31])}" sheetId="1" r:id="rId1"/></sheets>'
+        '</workbook>'
+    ).encode()
+
+
+def _xlsx_cell(value) -> str:
+    if value is None:
+        return '<c/>'
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        text = value.isoformat() if isinstance(value, date) else str(value)
+        return f'<c t="inlineStr"><is><t>{escape(_XML_ILLEGAL.sub("", text))}</t></is></c>'
+    return f'<c><v>{value}</v></c>'
+
+
+def _xlsx_sheet(header: Sequence[str], rows: Iterable[tuple], chunk_rows: int) -> Iterator[bytes]:
+    parts = [
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>',
+        '<row>' + ''.join(_xlsx_cell(label) for label in header) + '</row>',
+    ]
+    for count, row in enumerate(rows, 1):
+        parts.append('<row>' + ''.join(_xlsx_cell(value) for value in row) + '</row>')
+        if count % chunk_rows == 0:
+            yield ''.join(parts).encode('utf-8')
+            parts.clear()
+    parts.append('</sheetData></worksheet>')
+    yield ''.join(parts).encode('utf-8')
+
+
+def iter_xlsx(header: Sequence[str], rows: Iterable[tuple], sheet_name: str = 'Data',
+              chunk_rows: int = 500) -> Iterator[bytes]:
+    """
+    Stream a single-sheet XLSX workbook
+
+    The sheet XML is generated and deflated row chunk by row chunk inside a
+    streamed ZIP, so no spreadsheet library is needed and memory stays flat
+    regardless of the row count.
+    """
+    return stream_zip([
+        ('[Content_Types].xml', _XLSX_CONTENT_TYPES),
+        ('_rels/.rels', _XLSX_ROOT_RELS),
+        ('xl/workbook.xml', _xlsx_workbook(sheet_name)),
+        ('xl/_rels/workbook.xml.rels', _XLSX_WORKBOOK_RELS),
+        ('xl/worksheets/sheet1.xml', _xlsx_sheet(header, rows, chunk_rows)),
+    ])
+
+
+EXPORT_FORMATS = {
+    'csv': ('text/csv; charset=utf-8', iter_csv),
+    'xlsx': ('application/vnd.openxmlformats-officedocument.spreadsheetml.sheet', iter_xlsx),
+}
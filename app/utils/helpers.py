@@ -1,15 +1,15 @@
-from datetime import date, datetime
-import io
+import asyncio
+from collections import OrderedDict
+from datetime import date, datetime, timedelta
+import threading
 from typing import Any, Dict, Optional
-from reportlab.lib.pagesizes import letter, A4
-from reportlab.lib import colors
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.units import inch
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
-from reportlab.pdfgen import canvas
-from reportlab.lib.enums import TA_CENTER, TA_RIGHT
+from sqlalchemy import and_, func, null, select, union_all
 
-from app.models import db, Customer, DailyOrder, Kasbon, Payment
+from app.extensions import instrumentation
+from app.models import db, Customer, DailyOrder, Kasbon, Payment, CustomerBalance, PeriodClose, ARCHIVES
+from app.utils.balances import LEDGERS, balance_periods
+from app.utils.billing import bill_many
+from app.utils.readmodels import CustomerRow, OpeningRow, LEDGER_ROWS, read_columns
 
 
 def calculate_catering_cost(customer: Customer, total_portions: int) -> tuple:
@@ -33,45 +33,179 @@ def calculate_catering_cost(customer: Customer, total_portions: int) -> tuple:
     return total_bundles, charged_portions, catering_cost
 
 
-def get_customer_summary(customer_id: int, start_date: date = None, end_date: date = None) -> Optional[Dict[str, Any]]:
-    """Get customer summary including orders, kasbon, and payments"""
-    
-    customer = Customer.query.get(customer_id)
-    if not customer:
-        return None
-    
-    # Build queries dengan filter tanggal
-    order_query = DailyOrder.query.filter_by(customer_id=customer_id)
-    kasbon_query = Kasbon.query.filter_by(customer_id=customer_id)
-    payment_query = Payment.query.filter_by(customer_id=customer_id)
-    
+def ledger_filters(model, customer_id: int = None, start_date: date = None, end_date: date = None) -> list:
+    """Build customer/date filter conditions for a DailyOrder, Kasbon or Payment query"""
+    conditions = []
+    if customer_id is not None:
+        conditions.append(model.customer_id == customer_id)
     if start_date:
-        order_query = order_query.filter(DailyOrder.date >= start_date)
-        kasbon_query = kasbon_query.filter(Kasbon.date >= start_date)
-        payment_query = payment_query.filter(Payment.date >= start_date)
-    
+        conditions.append(model.date >= start_date)
     if end_date:
-        order_query = order_query.filter(DailyOrder.date <= end_date)
-        kasbon_query = kasbon_query.filter(Kasbon.date <= end_date)
-        payment_query = payment_query.filter(Payment.date <= end_date)
-    
-    # Eksekusi queries
-    orders = order_query.all()
-    kasbons = kasbon_query.all()
-    payments = payment_query.all()
-    
-    # Hitung totals
-    total_portions = sum(order.total_portions for order in orders)
-    
+        conditions.append(model.date <= end_date)
+    return conditions
+
+
+def _ledger_sum(model, customer_id: int, start_date: date = None, end_date: date = None):
+    """Expression summing a ledger's amount for a customer and date range, archived rows included"""
+    amount_attr = LEDGERS[model][0]
+    live, archived = (
+        select(func.coalesce(func.sum(getattr(source, amount_attr)), 0))
+        .where(*ledger_filters(source, customer_id, start_date, end_date))
+        .scalar_subquery()
+        for source in (model, ARCHIVES[model])
+    )
+    return live + archived
+
+
+def _balance_sum(column, customer_id: int, periods: list):
+    """Scalar subquery summing one customer_balances column over the given periods"""
+    return (
+        select(func.coalesce(func.sum(column), 0))
+        .where(CustomerBalance.customer_id == customer_id, *periods)
+        .scalar_subquery()
+    )
+
+
+def _opening(start_date: date = None, end_date: date = None):
+    """
+    (OpeningRow columns or NULLs, join condition) for the close a summary starts from
+
+    Only summaries running from the beginning start from a close: the
+    customer's latest one on or before ``end_date``.
+    """
+    if start_date is not None:
+        return [null()] * len(OpeningRow._fields), None
+    latest = select(func.max(PeriodClose.closed_through)).where(PeriodClose.customer_id == Customer.id)
+    if end_date is not None:
+        latest = latest.where(PeriodClose.closed_through <= end_date)
+    return read_columns(OpeningRow, PeriodClose), and_(
+        PeriodClose.customer_id == Customer.id,
+        PeriodClose.closed_through == latest.correlate(Customer).scalar_subquery(),
+    )
+
+
+def customer_totals(row) -> tuple:
+    """
+    Split a customer totals row into build_summary's arguments
+
+    Returns:
+        tuple: (CustomerRow, total_portions, total_kasbon, total_payments, OpeningRow or None)
+    """
+    split = len(CustomerRow._fields)
+    customer = CustomerRow._make(row[:split])
+    opening = row[split + 3:]
+    return (customer, *row[split:split + 3], OpeningRow._make(opening) if opening[0] is not None else None)
+
+
+def customer_totals_statement(customer_id: int, start_date: date = None, end_date: date = None):
+    """
+    Select a customer together with its ledger totals in a single statement
+
+    Unfiltered and whole-month ranges are read from the maintained
+    customer_balances table; any other range is aggregated from the live and
+    archived ledgers. The row holds the CustomerRow columns, the three
+    totals and the OpeningRow columns of the close the summary starts from
+    (NULLs without one); customer_totals() splits it.
+    """
+    periods = balance_periods(start_date, end_date)
+    if periods is not None:
+        totals = [
+            _balance_sum(column, customer_id, periods)
+            for column in (CustomerBalance.total_portions, CustomerBalance.total_kasbon, CustomerBalance.total_payments)
+        ]
+    else:
+        totals = [_ledger_sum(model, customer_id, start_date, end_date) for model in LEDGERS]
+    opening, onclause = _opening(start_date, end_date)
+    stmt = select(*read_columns(CustomerRow, Customer), *totals, *opening).where(Customer.id == customer_id)
+    if onclause is not None:
+        stmt = stmt.outerjoin(PeriodClose, onclause)
+    return stmt
+
+
+def get_customer_totals(customer_id: int, start_date: date = None, end_date: date = None) -> Optional[tuple]:
+    """
+    Fetch a customer together with its ledger totals in a single statement
+
+    Returns:
+        tuple: (CustomerRow, total_portions, total_kasbon, total_payments, OpeningRow or None) or None
+    """
+    row = db.session.execute(customer_totals_statement(customer_id, start_date, end_date)).first()
+    if row is None:
+        return None
+    return customer_totals(row)
+
+
+def customer_totals_query(customer_ids: list = None, start_date: date = None, end_date: date = None):
+    """
+    Select customers with their ledger totals for many customers at once
+
+    Each total comes from one grouped SUM subquery (over customer_balances
+    when the range allows it, the live and archived ledgers otherwise), so
+    the statement count doesn't grow with the number of customers.
+
+    Rows are shaped like customer_totals_statement's, for customer_totals().
+    """
+    def ids(column):
+        return [] if customer_ids is None else [column.in_(customer_ids)]
+
+    periods = balance_periods(start_date, end_date)
+    if periods is not None:
+        sources = [
+            select(CustomerBalance.customer_id, column.label('amount'))
+            .where(*periods, *ids(CustomerBalance.customer_id))
+            .subquery()
+            for column in (CustomerBalance.total_portions, CustomerBalance.total_kasbon, CustomerBalance.total_payments)
+        ]
+    else:
+        sources = [
+            union_all(*(
+                select(source.customer_id, getattr(source, amount_attr).label('amount'))
+                .where(*ledger_filters(source, None, start_date, end_date), *ids(source.customer_id))
+                for source in (model, ARCHIVES[model])
+            )).subquery()
+            for model, (amount_attr, _) in LEDGERS.items()
+        ]
+
+    sums = [
+        select(source.c.customer_id, func.sum(source.c.amount).label('total')).group_by(source.c.customer_id).subquery()
+        for source in sources
+    ]
+    opening, onclause = _opening(start_date, end_date)
+    stmt = select(*read_columns(CustomerRow, Customer), *(func.coalesce(total.c.total, 0) for total in sums), *opening)
+    for total in sums:
+        stmt = stmt.outerjoin(total, total.c.customer_id == Customer.id)
+    if onclause is not None:
+        stmt = stmt.outerjoin(PeriodClose, onclause)
+    if customer_ids is not None:
+        stmt = stmt.where(Customer.id.in_(customer_ids))
+    return stmt.order_by(Customer.id)
+
+
+def build_summary(customer: CustomerRow, total_portions: int, total_kasbon: int, total_payments: int,
+                  opening: OpeningRow = None, billed: tuple = None) -> Dict[str, Any]:
+    """
+    Derive billing figures for a customer from its ledger totals
+
+    With an ``opening`` period close the totals still run from the
+    beginning, but the closed part keeps the catering cost it was closed
+    with, even if the customer's pricing changed since.
+
+    ``billed`` is (total_bundles, charged_portions, catering_cost, catering
+    cost of the opening's portions) when already computed by
+    build_summaries().
+    """
     # Calculate catering cost
-    total_bundles, charged_portions, catering_cost = calculate_catering_cost(customer, total_portions)
+    if billed is None:
+        total_bundles, charged_portions, catering_cost = calculate_catering_cost(customer, total_portions)
+        closed_cost = calculate_catering_cost(customer, opening.total_portions)[2] if opening is not None else 0
+    else:
+        total_bundles, charged_portions, catering_cost, closed_cost = billed
+    if opening is not None:
+        catering_cost += opening.catering_cost - closed_cost
     
     # Calculate actual remaining/extra portions
     remaining_portions = charged_portions - total_portions if charged_portions > total_portions else 0
     
-    total_kasbon = sum(kasbon.total_amount for kasbon in kasbons)
-    total_payments = sum(payment.amount for payment in payments)
-    
     total_bill = catering_cost + total_kasbon
     remaining_balance = total_bill - total_payments
     
@@ -80,19 +214,17 @@ def get_customer_summary(customer_id: int, start_date: date = None, end_date: da
     
     return {
         'customer': customer,
-        'orders': orders,
         'total_portions': total_portions,
         'total_bundles': total_bundles,
         'charged_portions': charged_portions,
         'remaining_portions': remaining_portions,
         'catering_cost': catering_cost,
-        'kasbons': kasbons,
         'total_kasbon': total_kasbon,
-        'payments': payments,
         'total_payments': total_payments,
         'total_bill': total_bill,
         'remaining_balance': remaining_balance,
         'price_per_portion': round(price_per_portion, 2),
+        'opening': opening,
         'bundle_info': {
             'portions_per_bundle': customer.portions_per_bundle,
             'price_per_bundle': customer.price_per_bundle
@@ -100,6 +232,144 @@ def get_customer_summary(customer_id: int, start_date: date = None, end_date: da
     }
 
 
+def build_summaries(rows) -> list:
+    """
+    build_summary for a batch of customer totals rows (customer_totals_query)
+
+    The catering cost of every customer, and of each opening close's
+    portions, is billed in one bill_many call instead of one
+    calculate_catering_cost per customer.
+    """
+    totals = [customer_totals(row) for row in rows]
+    if not totals:
+        return []
+    customers = [customer for customer, *_ in totals]
+    portions = [total_portions for _, total_portions, *_ in totals]
+    closed = [opening.total_portions if opening is not None else 0 for *_, opening in totals]
+    bill = bill_many(portions + closed,
+                     [customer.portions_per_bundle for customer in customers] * 2,
+                     [customer.price_per_bundle for customer in customers] * 2)
+    count = len(totals)
+    return [
+        build_summary(*customer_row, billed=(int(bill.total_bundles[i]), int(bill.charged_portions[i]),
+                                             int(bill.catering_cost[i]), int(bill.catering_cost[count + i])))
+        for i, customer_row in enumerate(totals)
+    ]
+
+
+LEDGER_DETAILS = (('orders', DailyOrder), ('kasbons', Kasbon), ('payments', Payment))
+
+
+def ledger_details_queries(model, customer_id: int, start_date: date = None, end_date: date = None,
+                           opening: OpeningRow = None) -> list:
+    """
+    Select a customer's ledger rows for the summary page and PDF, oldest first
+
+    Only the columns of the model's read model are selected (see
+    LEDGER_ROWS).
+
+    A summary starting from a period close only lists the rows after it. The
+    latest close leaves those all in the live table; any other range may
+    reach into closed periods, so their archive is read first.
+    """
+    sources = (model,) if start_date is None and end_date is None else (ARCHIVES[model], model)
+    if opening is not None:
+        start_date = opening.closed_through + timedelta(days=1)
+    return [
+        select(*read_columns(LEDGER_ROWS[model], source))
+        .where(*ledger_filters(source, customer_id, start_date, end_date))
+        .order_by(source.date, source.id)
+        for source in sources
+    ]
+
+
+def get_customer_summary(customer_id: int, start_date: date = None, end_date: date = None,
+                         include_details: bool = True) -> Optional[Dict[str, Any]]:
+    """
+    Get customer summary including orders, kasbon, and payments
+
+    Totals are always computed with SQL aggregates. The order, kasbon and
+    payment rows are only loaded when ``include_details`` is set, which the
+    HTML and PDF views need but the JSON API does not. The customer, opening
+    and rows are read models (app.utils.readmodels), not ORM instances.
+    """
+    totals = get_customer_totals(customer_id, start_date, end_date)
+    if totals is None:
+        return None
+    
+    summary = build_summary(*totals)
+    
+    if include_details:
+        load_ledger_details(summary, start_date, end_date)
+    
+    return summary
+
+
+def load_ledger_details(summary: dict, start_date: date = None, end_date: date = None):
+    """Add the customer's order, kasbon and payment rows to ``summary`` as read models"""
+    customer_id = summary['customer'].id
+    for key, model in LEDGER_DETAILS:
+        read_model = LEDGER_ROWS[model]
+        summary[key] = [
+            read_model._make(row)
+            for stmt in ledger_details_queries(model, customer_id, start_date, end_date, summary['opening'])
+            for row in db.session.execute(stmt)
+        ]
+
+
+async def get_customer_summary_async(session, customer_id: int, start_date: date = None, end_date: date = None,
+                                     include_details: bool = True) -> Optional[Dict[str, Any]]:
+    """get_customer_summary over an AsyncSession, running the same statements"""
+    row = (await session.execute(customer_totals_statement(customer_id, start_date, end_date))).first()
+    if row is None:
+        return None
+    
+    summary = build_summary(*customer_totals(row))
+    
+    if include_details:
+        for key, model in LEDGER_DETAILS:
+            summary[key] = []
+            for stmt in ledger_details_queries(model, customer_id, start_date, end_date, summary['opening']):
+                summary[key].extend(map(LEDGER_ROWS[model]._make, await session.execute(stmt)))
+    
+    return summary
+
+
+def ledger_counts_query(limit: int = None):
+    """
+    Select customers together with their order, kasbon and payment counts
+
+    Counts come from grouped COUNT subqueries so templates don't have to
+    lazy-load every child row just to take its length. Rows archived by
+    period closes are counted with the live ones.
+    """
+    counts = []
+    for model in (DailyOrder, Kasbon, Payment):
+        rows = union_all(select(model.customer_id), select(ARCHIVES[model].customer_id)).subquery()
+        counts.append(
+            select(rows.c.customer_id, func.count().label('n'))
+            .group_by(rows.c.customer_id)
+            .subquery()
+        )
+    stmt = select(Customer, *(func.coalesce(c.c.n, 0) for c in counts))
+    for c in counts:
+        stmt = stmt.outerjoin(c, c.c.customer_id == Customer.id)
+    stmt = stmt.order_by(Customer.id)
+    if limit is not None:
+        stmt = stmt.limit(limit)
+    return stmt
+
+
+def customers_with_ledger_counts(limit: int = None) -> list:
+    """
+    List customers together with their order, kasbon and payment counts
+
+    Returns:
+        list: (customer, order_count, kasbon_count, payment_count) rows
+    """
+    return [tuple(row) for row in db.session.execute(ledger_counts_query(limit))]
+
+
 def get_customer_pricing_info(customer: Customer) -> dict:
     """Get customer pricing information in a readable format"""
     price_per_portion = customer.price_per_bundle / customer.portions_per_bundle
@@ -152,260 +422,107 @@ def format_currency(amount):
         amount = 0
     return f"Rp {amount:,}".replace(",", ".")
 
-def create_pdf_summary(summary, start_date=None, end_date=None):
-    """Create professional PDF summary report"""
-    buffer = io.BytesIO()
-    doc = SimpleDocTemplate(buffer, pagesize=A4,
-                          rightMargin=72, leftMargin=72,
-                          topMargin=72, bottomMargin=18)
-    
-    # Container for the 'Flowable' objects
-    elements = []
-    
-    # Define styles
-    styles = getSampleStyleSheet()
-    title_style = ParagraphStyle(
-        'CustomTitle',
-        parent=styles['Heading1'],
-        fontSize=18,
-        spaceAfter=30,
-        alignment=TA_CENTER,
-        textColor=colors.HexColor('#2E3440')
-    )
-    
-    heading_style = ParagraphStyle(
-        'CustomHeading',
-        parent=styles['Heading2'],
-        fontSize=14,
-        spaceAfter=12,
-        textColor=colors.HexColor('#3B4252')
-    )
-    
-    normal_style = ParagraphStyle(
-        'CustomNormal',
-        parent=styles['Normal'],
-        fontSize=10,
-        spaceAfter=6
+class PDFCache:
+    """Thread-safe LRU of rendered PDF statements"""
+
+    def __init__(self, maxsize: int = 64):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key) -> Optional[bytes]:
+        with self._lock:
+            pdf = self._entries.get(key)
+            if pdf is not None:
+                self._entries.move_to_end(key)
+            return pdf
+
+    def set(self, key, pdf: bytes):
+        with self._lock:
+            self._entries[key] = pdf
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+pdf_cache = PDFCache()
+
+
+def _pdf_version_statement(customer_id: int):
+    """Select a customer's CustomerRow columns with the balance version its cached PDFs are keyed by"""
+    version = (
+        select(CustomerBalance.version)
+        .where(CustomerBalance.customer_id == customer_id, CustomerBalance.period == CustomerBalance.ALL_TIME)
+        .scalar_subquery()
     )
+    return select(*read_columns(CustomerRow, Customer), version).where(Customer.id == customer_id)
+
+
+def _pdf_cache_key(customer: CustomerRow, data_version: Optional[int], start_date: date, end_date: date) -> tuple:
+    return (customer.id, start_date, end_date, data_version or 0,
+            customer.name, customer.price_per_bundle, customer.portions_per_bundle)
+
+
+def render_customer_pdf(customer_id: int, start_date: date = None, end_date: date = None) -> Optional[tuple]:
+    """
+    Render the PDF statement for a customer, reusing a cached copy when possible
+
+    Cached PDFs are keyed by the customer's balance version, which every
+    ledger write bumps, plus the customer fields printed on the statement,
+    so an unchanged month is served without querying or rendering again.
+    The footer gives the time the data was read rather than a print time,
+    which stays true for as long as the copy is cached.
+
+    Returns:
+        tuple: (customer, pdf_bytes) or None when the customer doesn't exist
+    """
+    row = db.session.execute(_pdf_version_statement(customer_id)).first()
+    if row is None:
+        return None
     
-    # Title
-    title = Paragraph("RINGKASAN TAGIHAN CATERING", title_style)
-    elements.append(title)
-    
-    # Date range
-    if start_date and end_date:
-        date_range = f"Periode: {start_date.strftime('%d/%m/%Y')} - {end_date.strftime('%d/%m/%Y')}"
-    else:
-        date_range = "Periode: Keseluruhan Data"
-    
-    date_para = Paragraph(date_range, normal_style)
-    elements.append(date_para)
-    elements.append(Spacer(1, 20))
-    
-    # Customer Information
-    customer = summary['customer']
-    pricing_info = get_customer_pricing_info(customer)
-    
-    customer_info = [
-        ['Informasi Customer', ''],
-        ['Nama Customer:', customer.name],
-        ['Harga per Bundle:', format_currency(customer.price_per_bundle)],
-        ['Porsi per Bundle:', f"{customer.portions_per_bundle} porsi"],
-        ['Harga Efektif per Porsi:', format_currency(int(pricing_info['effective_price_per_portion']))],
-        ['', '']
-    ]
-    
-    customer_table = Table(customer_info, colWidths=[3*inch, 3*inch])
-    customer_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#5E81AC')),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, 0), 12),
-        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-        ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-        ('FONTNAME', (0, 1), (0, -1), 'Helvetica-Bold'),
-        ('GRID', (0, 0), (-1, -1), 1, colors.black)
-    ]))
-    
-    elements.append(customer_table)
-    elements.append(Spacer(1, 20))
-    
-    # Order Summary
-    order_summary = [
-        ['Ringkasan Pesanan', ''],
-        ['Total Porsi Dipesan:', f"{summary['total_portions']} porsi"],
-        ['Total Bundle Ditagih:', f"{summary['total_bundles']} bundle"],
-        ['Total Porsi Ditagih:', f"{summary['charged_portions']} porsi"],
-        ['Porsi Bonus/Sisa:', f"{summary['remaining_portions']} porsi"],
-        ['Biaya Catering:', format_currency(summary['catering_cost'])],
-        ['', '']
-    ]
-    
-    order_table = Table(order_summary, colWidths=[3*inch, 3*inch])
-    order_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#81A1C1')),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, 0), 12),
-        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-        ('BACKGROUND', (0, 1), (-1, -1), colors.HexColor('#ECEFF4')),
-        ('FONTNAME', (0, 1), (0, -1), 'Helvetica-Bold'),
-        ('GRID', (0, 0), (-1, -1), 1, colors.black)
-    ]))
-    
-    elements.append(order_table)
-    elements.append(Spacer(1, 20))
-    
-    # Financial Summary
-    financial_data = [
-        ['Ringkasan Keuangan', ''],
-        ['Biaya Catering:', format_currency(summary['catering_cost'])],
-        ['Total Kasbon:', format_currency(summary['total_kasbon'])],
-        ['Total Tagihan:', format_currency(summary['total_bill'])],
-        ['Total Pembayaran:', format_currency(summary['total_payments'])],
-        ['Sisa Saldo:', format_currency(summary['remaining_balance'])],
-    ]
-    
-    financial_table = Table(financial_data, colWidths=[3*inch, 3*inch])
-    financial_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#BF616A')),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, 0), 12),
-        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-        ('BACKGROUND', (0, 1), (-1, -2), colors.HexColor('#ECEFF4')),
-        ('FONTNAME', (0, 1), (0, -1), 'Helvetica-Bold'),
-        ('GRID', (0, 0), (-1, -1), 1, colors.black)
-    ]))
-    
-    # Highlight remaining balance
-    if summary['remaining_balance'] > 0:
-        financial_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, -1), (-1, -1), colors.HexColor('#EBCB8B')),
-            ('FONTNAME', (0, -1), (-1, -1), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, -1), (-1, -1), 11),
-        ]))
-    elif summary['remaining_balance'] < 0:
-        financial_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, -1), (-1, -1), colors.HexColor('#A3BE8C')),
-            ('FONTNAME', (0, -1), (-1, -1), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, -1), (-1, -1), 11),
-        ]))
-    
-    elements.append(financial_table)
-    elements.append(Spacer(1, 30))
-
-    hari_dict = {
-        'Monday': 'Senin',
-        'Tuesday': 'Selasa',
-        'Wednesday': 'Rabu',
-        'Thursday': 'Kamis',
-        'Friday': 'Jumat',
-        'Saturday': 'Sabtu',
-        'Sunday': 'Minggu'
-    }
-    
-    # Detail Tables
-    if summary['orders']:
-        elements.append(Paragraph("Detail Pesanan", heading_style))
-        
-        order_details = [['Hari', 'Tanggal', 'Pagi', 'Siang', 'Sore', 'Total']]
-        for order in summary['orders']:
-            hari = order.date.strftime('%A')
-            hari = hari_dict.get(hari, hari)
-            order_details.append([
-                hari,
-                order.date.strftime('%d/%m/%Y'),
-                str(order.morning_portions),
-                str(order.afternoon_portions),
-                str(order.evening_portions),
-                str(order.total_portions)
-            ])
-        
-        detail_table = Table(order_details, colWidths=[1.5*inch, 1*inch, 1*inch, 1*inch, 1*inch])
-        detail_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 10),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-            ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black)
-        ]))
-        
-        elements.append(detail_table)
-        elements.append(Spacer(1, 20))
-    
-    if summary['kasbons']:
-        elements.append(Paragraph("Detail Kasbon", heading_style))
-        
-        kasbon_details = [['Hari', 'Tanggal', 'Item', 'Qty', 'Harga Satuan', 'Total']]
-        for kasbon in summary['kasbons']:
-            hari = kasbon.date.strftime('%A')
-            hari = hari_dict.get(hari, hari)
-            kasbon_details.append([
-                hari,
-                kasbon.date.strftime('%d/%m/%Y'),
-                kasbon.item_name,
-                str(kasbon.quantity),
-                format_currency(kasbon.unit_price),
-                format_currency(kasbon.total_amount)
-            ])
+    customer, data_version = CustomerRow._make(row[:-1]), row[-1]
+    key = _pdf_cache_key(customer, data_version, start_date, end_date)
+    pdf = pdf_cache.get(key)
+    if pdf is None:
+        from app.utils.pdf import create_pdf_summary
         
-        kasbon_table = Table(kasbon_details, colWidths=[1.2*inch, 1*inch, 1.7*inch, 0.8*inch, 1.2*inch, 1.2*inch])
-        kasbon_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 10),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-            ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black)
-        ]))
-        
-        elements.append(kasbon_table)
-        elements.append(Spacer(1, 20))
+        as_of = datetime.now()
+        summary = get_customer_summary(customer_id, start_date, end_date)
+        with instrumentation.timer('pdf'):
+            pdf = create_pdf_summary(summary, start_date, end_date, as_of).getvalue()
+        pdf_cache.set(key, pdf)
+    return customer, pdf
+
+
+async def render_customer_pdf_async(session, customer_id: int, start_date: date = None, end_date: date = None,
+                                    executor=None) -> Optional[tuple]:
+    """
+    render_customer_pdf over an AsyncSession
+
+    reportlab is CPU-bound and synchronous, so the PDF is built in
+    ``executor`` (the loop's default thread pool when None) while the event
+    loop keeps serving other requests.
+    """
+    row = (await session.execute(_pdf_version_statement(customer_id))).first()
+    if row is None:
+        return None
     
-    if summary['payments']:
-        elements.append(Paragraph("Detail Pembayaran", heading_style))
+    customer, data_version = CustomerRow._make(row[:-1]), row[-1]
+    key = _pdf_cache_key(customer, data_version, start_date, end_date)
+    pdf = pdf_cache.get(key)
+    if pdf is None:
+        from app.utils.pdf import create_pdf_summary
         
-        payment_details = [['Tanggal', 'Jumlah', 'Keterangan']]
-        for payment in summary['payments']:
-            payment_details.append([
-                payment.date.strftime('%d/%m/%Y'),
-                format_currency(payment.amount),
-                payment.description or '-'
-            ])
-        
-        payment_table = Table(payment_details, colWidths=[1.5*inch, 2*inch, 2.5*inch])
-        payment_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-            ('ALIGN', (1, 0), (1, -1), 'RIGHT'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 10),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-            ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black)
-        ]))
-        
-        elements.append(payment_table)
-    
-    # Footer
-    elements.append(Spacer(1, 30))
-    footer_text = f"Dicetak pada: {datetime.now().strftime('%d/%m/%Y %H:%M:%S')}"
-    footer = Paragraph(footer_text, normal_style)
-    elements.append(footer)
-    
-    # Build PDF
-    doc.build(elements)
-    
-    # FileResponse
-    buffer.seek(0)
-    return buffer
+        as_of = datetime.now()
+        summary = await get_customer_summary_async(session, customer_id, start_date, end_date)
+        loop = asyncio.get_running_loop()
+        with instrumentation.timer('pdf'):
+            pdf = await loop.run_in_executor(
+                executor, lambda: create_pdf_summary(summary, start_date, end_date, as_of).getvalue()
+            )
+        pdf_cache.set(key, pdf)
+    return customer, pdf
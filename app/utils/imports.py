@@ -0,0 +1,142 @@
+import csv
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from pydantic import ValidationError
+from sqlalchemy import select
+
+from app.models import db, Customer, DailyOrder
+from app.utils.balances import apply_balance_deltas, record_ledger_change
+from app.utils.periods import ClosedPeriodError, closed_through
+from app.utils.rollups import apply_rollup_deltas, customer_pricing, ledger_rollup_values, record_rollup_change
+from app.utils.validators import ORDER_IMPORT_HEADERS, OrderImportRow
+
+# Rows inserted per executemany/transaction
+IMPORT_BATCH_SIZE = 5000
+
+
+class ImportResult:
+    """Outcome of an import run"""
+
+    def __init__(self, dry_run: bool):
+        self.dry_run = dry_run
+        self.total = 0
+        self.imported = 0
+        self.errors: List[Tuple[int, str]] = []
+
+    @property
+    def valid(self) -> int:
+        return self.total - len(self.errors)
+
+
+def _customer_lookup() -> Tuple[Dict[str, Optional[int]], set]:
+    """
+    Map lower-cased customer names to ids with a single query
+
+    Names shared by several customers map to None so they can be reported
+    as ambiguous instead of silently picking one.
+    """
+    by_name = {}
+    ids = set()
+    for customer_id, name in db.session.execute(select(Customer.id, Customer.name)):
+        key = name.strip().casefold()
+        by_name[key] = None if key in by_name else customer_id
+        ids.add(customer_id)
+    return by_name, ids
+
+
+def _format_error(error: ValidationError) -> str:
+    messages = []
+    for detail in error.errors():
+        field = '.'.join(str(part) for part in detail['loc'])
+        message = detail['msg'].removeprefix('Value error, ')
+        messages.append(f'{field}: {message}' if field else message)
+    return '; '.join(messages)
+
+
+def _insert_batch(rows: List[dict]):
+    """Insert a batch of orders in one executemany and fold it into the balances and rollups"""
+    connection = db.session.connection()
+    connection.execute(DailyOrder.__table__.insert(), rows)
+
+    # Core inserts skip the flush listeners, so update balances and rollups here
+    deltas = {}
+    rollups = {}
+    pricing = customer_pricing(connection, {row['customer_id'] for row in rows})
+    for row in rows:
+        record_ledger_change(deltas, DailyOrder, row['customer_id'], row['date'], row['total_portions'])
+        record_rollup_change(rollups, row['date'],
+                             ledger_rollup_values(DailyOrder, row.get, pricing[row['customer_id']]))
+    apply_balance_deltas(connection, deltas)
+    apply_rollup_deltas(connection, rollups)
+    db.session.commit()
+
+
+def import_orders(lines: Iterable[str], dry_run: bool = False,
+                  batch_size: int = IMPORT_BATCH_SIZE) -> ImportResult:
+    """
+    Validate and insert daily orders from CSV text
+
+    Every row is checked with OrderImportRow and customers are resolved by
+    name (or id) through one lookup map. Valid rows are inserted with
+    executemany, one transaction per ``batch_size`` rows; invalid rows are
+    skipped and reported with their line number. With ``dry_run`` nothing is
+    written.
+    """
+    result = ImportResult(dry_run)
+    reader = csv.DictReader(lines)
+    if reader.fieldnames is None:
+        result.errors.append((1, 'file kosong'))
+        return result
+
+    columns = {name: ORDER_IMPORT_HEADERS.get(name.strip().casefold()) for name in reader.fieldnames}
+    if 'date' not in columns.values() or not {'customer', 'customer_id'} & set(columns.values()):
+        result.errors.append((1, 'kolom Tanggal dan Pelanggan wajib ada'))
+        return result
+
+    by_name, ids = _customer_lookup()
+    # Core inserts skip the closed-period flush guard, so check dates here
+    closed = closed_through()
+    batch = []
+    for row in reader:
+        result.total += 1
+        line = reader.line_num
+        try:
+            order = OrderImportRow(**{field: row[name] for name, field in columns.items() if field and row[name] is not None})
+        except ValidationError as e:
+            result.errors.append((line, _format_error(e)))
+            continue
+
+        if order.customer_id is not None:
+            customer_id = order.customer_id if order.customer_id in ids else None
+            missing = f'ID pelanggan {order.customer_id} tidak ditemukan'
+        else:
+            key = order.customer.casefold()
+            customer_id = by_name.get(key)
+            missing = (f'nama pelanggan "{order.customer}" tidak unik' if key in by_name
+                       else f'pelanggan "{order.customer}" tidak ditemukan')
+        if customer_id is None:
+            result.errors.append((line, missing))
+            continue
+        if closed is not None and order.date <= closed:
+            result.errors.append((line, str(ClosedPeriodError(closed))))
+            continue
+
+        if dry_run:
+            continue
+        batch.append({
+            'date': order.date,
+            'customer_id': customer_id,
+            'morning_portions': order.morning_portions,
+            'afternoon_portions': order.afternoon_portions,
+            'evening_portions': order.evening_portions,
+            'total_portions': order.total_portions,
+        })
+        if len(batch) >= batch_size:
+            _insert_batch(batch)
+            result.imported += len(batch)
+            batch = []
+
+    if batch:
+        _insert_batch(batch)
+        result.imported += len(batch)
+    return result
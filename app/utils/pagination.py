@@ -0,0 +1,95 @@
+from datetime import date, datetime
+from typing import Optional
+
+from flask import request, url_for
+from sqlalchemy import tuple_
+
+DEFAULT_PER_PAGE = 50
+MAX_PER_PAGE = 200
+
+
+def parse_date_arg(value: str) -> Optional[date]:
+    """Parse a YYYY-MM-DD query parameter, ignoring empty or malformed values"""
+    if not value:
+        return None
+    try:
+        return datetime.strptime(value, '%Y-%m-%d').date()
+    except ValueError:
+        return None
+
+
+def ledger_filter_args(args) -> dict:
+    """Read the customer/date-range list filters from request args"""
+    return {
+        'customer_id': args.get('customer_id', type=int),
+        'start_date': parse_date_arg(args.get('start_date')),
+        'end_date': parse_date_arg(args.get('end_date')),
+    }
+
+
+def encode_cursor(row_date: date, row_id: int) -> str:
+    return f"{row_date.isoformat()}.{row_id}"
+
+
+def decode_cursor(cursor: str) -> Optional[tuple]:
+    """Turn a ``YYYY-MM-DD.id`` cursor back into a (date, id) key"""
+    if not cursor:
+        return None
+    day, _, row_id = cursor.partition('.')
+    row_date = parse_date_arg(day)
+    if row_date is None or not row_id.isdigit():
+        return None
+    return row_date, int(row_id)
+
+
+class KeysetPage:
+    """One page of a list ordered newest first by (date, id)"""
+
+    def __init__(self, items: list, next_cursor: Optional[str], cursor: Optional[str]):
+        self.items = items
+        self.next_cursor = next_cursor
+        self.cursor = cursor
+
+    @property
+    def has_next(self) -> bool:
+        return self.next_cursor is not None
+
+    @property
+    def is_first(self) -> bool:
+        return not self.cursor
+
+    def _url(self, cursor: Optional[str]) -> str:
+        args = request.args.to_dict()
+        args.pop('cursor', None)
+        if cursor:
+            args['cursor'] = cursor
+        return url_for(request.endpoint, **(request.view_args or {}), **args)
+
+    @property
+    def next_url(self) -> str:
+        return self._url(self.next_cursor)
+
+    @property
+    def first_url(self) -> str:
+        return self._url(None)
+
+
+def keyset_paginate(query, model, cursor: str = None, per_page: int = DEFAULT_PER_PAGE) -> KeysetPage:
+    """
+    Seek-paginate a ledger query on (date, id) descending
+
+    Instead of OFFSET, each page continues strictly after the (date, id) of
+    the last row of the previous page, so every page costs the same no matter
+    how deep into history it is and can be served from the date indexes.
+    """
+    per_page = max(1, min(per_page or DEFAULT_PER_PAGE, MAX_PER_PAGE))
+    key = decode_cursor(cursor)
+    if key is not None:
+        query = query.filter(tuple_(model.date, model.id) < key)
+
+    rows = query.order_by(model.date.desc(), model.id.desc()).limit(per_page + 1).all()
+    next_cursor = None
+    if len(rows) > per_page:
+        rows = rows[:per_page]
+        next_cursor = encode_cursor(rows[-1].date, rows[-1].id)
+    return KeysetPage(rows, next_cursor, cursor if key is not None else None)
@@ -0,0 +1,272 @@
+import io
+from datetime import datetime
+from reportlab.lib.pagesizes import A4
+from reportlab.lib import colors
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.lib.units import inch
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
+from reportlab.lib.enums import TA_CENTER
+
+from app.utils.helpers import format_currency, get_customer_pricing_info
+
+# reportlab is heavy to import, so this module is only imported by the code
+# that actually renders a statement, never at app startup
+
+# PDF building blocks, built once at import time and shared by every render
+_SAMPLE_STYLES = getSampleStyleSheet()
+
+PDF_TITLE_STYLE = ParagraphStyle(
+    'CustomTitle',
+    parent=_SAMPLE_STYLES['Heading1'],
+    fontSize=18,
+    spaceAfter=30,
+    alignment=TA_CENTER,
+    textColor=colors.HexColor('#2E3440')
+)
+
+PDF_HEADING_STYLE = ParagraphStyle(
+    'CustomHeading',
+    parent=_SAMPLE_STYLES['Heading2'],
+    fontSize=14,
+    spaceAfter=12,
+    textColor=colors.HexColor('#3B4252')
+)
+
+PDF_NORMAL_STYLE = ParagraphStyle(
+    'CustomNormal',
+    parent=_SAMPLE_STYLES['Normal'],
+    fontSize=10,
+    spaceAfter=6
+)
+
+
+def _info_table_style(header_color, body_color=colors.HexColor('#ECEFF4'), body_rows_end=-1):
+    return TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), header_color),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, 0), 12),
+        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+        ('BACKGROUND', (0, 1), (-1, body_rows_end), body_color),
+        ('FONTNAME', (0, 1), (0, -1), 'Helvetica-Bold'),
+        ('GRID', (0, 0), (-1, -1), 1, colors.black)
+    ])
+
+
+def _detail_table_style(alignment=(('ALIGN', (0, 0), (-1, -1), 'CENTER'),)):
+    return TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+        *alignment,
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, 0), 10),
+        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+        ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+        ('GRID', (0, 0), (-1, -1), 1, colors.black)
+    ])
+
+
+PDF_CUSTOMER_TABLE_STYLE = _info_table_style(colors.HexColor('#5E81AC'), body_color=colors.beige)
+PDF_ORDER_TABLE_STYLE = _info_table_style(colors.HexColor('#81A1C1'))
+PDF_FINANCIAL_TABLE_STYLE = _info_table_style(colors.HexColor('#BF616A'), body_rows_end=-2)
+
+PDF_BALANCE_DUE_STYLE = TableStyle([
+    ('BACKGROUND', (0, -1), (-1, -1), colors.HexColor('#EBCB8B')),
+    ('FONTNAME', (0, -1), (-1, -1), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, -1), (-1, -1), 11),
+])
+PDF_OVERPAID_STYLE = TableStyle([
+    ('BACKGROUND', (0, -1), (-1, -1), colors.HexColor('#A3BE8C')),
+    ('FONTNAME', (0, -1), (-1, -1), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, -1), (-1, -1), 11),
+])
+
+PDF_ORDER_DETAIL_STYLE = _detail_table_style()
+PDF_KASBON_DETAIL_STYLE = _detail_table_style()
+PDF_PAYMENT_DETAIL_STYLE = _detail_table_style((
+    ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+    ('ALIGN', (1, 0), (1, -1), 'RIGHT'),
+))
+
+HARI = {
+    'Monday': 'Senin',
+    'Tuesday': 'Selasa',
+    'Wednesday': 'Rabu',
+    'Thursday': 'Kamis',
+    'Friday': 'Jumat',
+    'Saturday': 'Sabtu',
+    'Sunday': 'Minggu'
+}
+
+
+def create_pdf_summary(summary, start_date=None, end_date=None, as_of=None):
+    """
+    Create professional PDF summary report
+
+    ``as_of`` is when ``summary`` was read from the database (now by
+    default) and is printed in the footer, so a cached copy still states
+    the moment its figures are from.
+    """
+    buffer = io.BytesIO()
+    doc = SimpleDocTemplate(buffer, pagesize=A4,
+                          rightMargin=72, leftMargin=72,
+                          topMargin=72, bottomMargin=18)
+    
+    # Container for the 'Flowable' objects
+    elements = []
+    
+    # Title
+    title = Paragraph("RINGKASAN TAGIHAN CATERING", PDF_TITLE_STYLE)
+    elements.append(title)
+    
+    # Date range
+    if start_date and end_date:
+        date_range = f"Periode: {start_date.strftime('%d/%m/%Y')} - {end_date.strftime('%d/%m/%Y')}"
+    else:
+        date_range = "Periode: Keseluruhan Data"
+    
+    date_para = Paragraph(date_range, PDF_NORMAL_STYLE)
+    elements.append(date_para)
+    elements.append(Spacer(1, 20))
+    
+    # Customer Information
+    customer = summary['customer']
+    pricing_info = get_customer_pricing_info(customer)
+    
+    customer_info = [
+        ['Informasi Customer', ''],
+        ['Nama Customer:', customer.name],
+        ['Harga per Bundle:', format_currency(customer.price_per_bundle)],
+        ['Porsi per Bundle:', f"{customer.portions_per_bundle} porsi"],
+        ['Harga Efektif per Porsi:', format_currency(int(pricing_info['effective_price_per_portion']))],
+        ['', '']
+    ]
+    
+    customer_table = Table(customer_info, colWidths=[3*inch, 3*inch])
+    customer_table.setStyle(PDF_CUSTOMER_TABLE_STYLE)
+    
+    elements.append(customer_table)
+    elements.append(Spacer(1, 20))
+    
+    # Order Summary
+    order_summary = [
+        ['Ringkasan Pesanan', ''],
+        ['Total Porsi Dipesan:', f"{summary['total_portions']} porsi"],
+        ['Total Bundle Ditagih:', f"{summary['total_bundles']} bundle"],
+        ['Total Porsi Ditagih:', f"{summary['charged_portions']} porsi"],
+        ['Porsi Bonus/Sisa:', f"{summary['remaining_portions']} porsi"],
+        ['Biaya Catering:', format_currency(summary['catering_cost'])],
+        ['', '']
+    ]
+    
+    order_table = Table(order_summary, colWidths=[3*inch, 3*inch])
+    order_table.setStyle(PDF_ORDER_TABLE_STYLE)
+    
+    elements.append(order_table)
+    elements.append(Spacer(1, 20))
+    
+    # Financial Summary
+    financial_data = [
+        ['Ringkasan Keuangan', ''],
+        ['Biaya Catering:', format_currency(summary['catering_cost'])],
+        ['Total Kasbon:', format_currency(summary['total_kasbon'])],
+        ['Total Tagihan:', format_currency(summary['total_bill'])],
+        ['Total Pembayaran:', format_currency(summary['total_payments'])],
+        ['Sisa Saldo:', format_currency(summary['remaining_balance'])],
+    ]
+    
+    financial_table = Table(financial_data, colWidths=[3*inch, 3*inch])
+    financial_table.setStyle(PDF_FINANCIAL_TABLE_STYLE)
+    
+    # Highlight remaining balance
+    if summary['remaining_balance'] > 0:
+        financial_table.setStyle(PDF_BALANCE_DUE_STYLE)
+    elif summary['remaining_balance'] < 0:
+        financial_table.setStyle(PDF_OVERPAID_STYLE)
+    
+    elements.append(financial_table)
+    
+    opening = summary.get('opening')
+    if opening is not None:
+        elements.append(Spacer(1, 10))
+        elements.append(Paragraph(
+            f"Periode sampai {opening.closed_through.strftime('%d/%m/%Y')} sudah ditutup dengan saldo "
+            f"{format_currency(opening.balance)}. Rincian di bawah dimulai setelah tanggal tersebut.",
+            PDF_NORMAL_STYLE,
+        ))
+    elements.append(Spacer(1, 30))
+    
+    # Detail Tables
+    if summary['orders']:
+        elements.append(Paragraph("Detail Pesanan", PDF_HEADING_STYLE))
+        
+        order_details = [['Hari', 'Tanggal', 'Pagi', 'Siang', 'Sore', 'Total']]
+        for order in summary['orders']:
+            hari = order.date.strftime('%A')
+            hari = HARI.get(hari, hari)
+            order_details.append([
+                hari,
+                order.date.strftime('%d/%m/%Y'),
+                str(order.morning_portions),
+                str(order.afternoon_portions),
+                str(order.evening_portions),
+                str(order.total_portions)
+            ])
+        
+        detail_table = Table(order_details, colWidths=[1.5*inch, 1*inch, 1*inch, 1*inch, 1*inch])
+        detail_table.setStyle(PDF_ORDER_DETAIL_STYLE)
+        
+        elements.append(detail_table)
+        elements.append(Spacer(1, 20))
+    
+    if summary['kasbons']:
+        elements.append(Paragraph("Detail Kasbon", PDF_HEADING_STYLE))
+        
+        kasbon_details = [['Hari', 'Tanggal', 'Item', 'Qty', 'Harga Satuan', 'Total']]
+        for kasbon in summary['kasbons']:
+            hari = kasbon.date.strftime('%A')
+            hari = HARI.get(hari, hari)
+            kasbon_details.append([
+                hari,
+                kasbon.date.strftime('%d/%m/%Y'),
+                kasbon.item_name,
+                str(kasbon.quantity),
+                format_currency(kasbon.unit_price),
+                format_currency(kasbon.total_amount)
+            ])
+        
+        kasbon_table = Table(kasbon_details, colWidths=[1.2*inch, 1*inch, 1.7*inch, 0.8*inch, 1.2*inch, 1.2*inch])
+        kasbon_table.setStyle(PDF_KASBON_DETAIL_STYLE)
+        
+        elements.append(kasbon_table)
+        elements.append(Spacer(1, 20))
+    
+    if summary['payments']:
+        elements.append(Paragraph("Detail Pembayaran", PDF_HEADING_STYLE))
+        
+        payment_details = [['Tanggal', 'Jumlah', 'Keterangan']]
+        for payment in summary['payments']:
+            payment_details.append([
+                payment.date.strftime('%d/%m/%Y'),
+                format_currency(payment.amount),
+                payment.description or '-'
+            ])
+        
+        payment_table = Table(payment_details, colWidths=[1.5*inch, 2*inch, 2.5*inch])
+        payment_table.setStyle(PDF_PAYMENT_DETAIL_STYLE)
+        
+        elements.append(payment_table)
+    
+    # Footer
+    elements.append(Spacer(1, 30))
+    footer_text = f"Data per: {(as_of or datetime.now()).strftime('%d/%m/%Y %H:%M:%S')}"
+    footer = Paragraph(footer_text, PDF_NORMAL_STYLE)
+    elements.append(footer)
+    
+    # Build PDF
+    doc.build(elements)
+    
+    # FileResponse
+    buffer.seek(0)
+    return buffer
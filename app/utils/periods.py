@@ -0,0 +1,154 @@
+from calendar import monthrange
+from datetime import date
+from typing import Optional
+
+from sqlalchemy import and_, event, func, inspect, select, union_all
+
+from app.models import db, Customer, CustomerBalance, PeriodClose, ARCHIVES
+from app.utils.balances import BALANCE_COLUMNS, LEDGERS, month_key
+from app.utils.helpers import build_summaries
+from app.utils.readmodels import CustomerRow, OpeningRow, read_columns
+
+
+class ClosedPeriodError(ValueError):
+    """A ledger write dated inside a closed period"""
+
+    def __init__(self, closed_through: date):
+        super().__init__(f'periode sampai {closed_through:%d/%m/%Y} sudah ditutup')
+        self.closed_through = closed_through
+
+
+def closed_through(connection=None) -> Optional[date]:
+    """Last day of the most recently closed period, None before the first close"""
+    return (connection or db.session).execute(select(func.max(PeriodClose.closed_through))).scalar()
+
+
+def check_open(day: date, connection=None):
+    """Raise ClosedPeriodError when ``day`` falls in a closed period"""
+    limit = closed_through(connection)
+    if limit is not None and day is not None and day <= limit:
+        raise ClosedPeriodError(limit)
+
+
+# Closed-period rows -> their date column; archive rows and snapshots only
+# ever belong to closed periods, so any ORM write to them is refused
+CLOSED_DATES = {
+    **{model: 'date' for model in (*LEDGERS, *ARCHIVES.values())},
+    PeriodClose: 'closed_through',
+}
+
+
+def has_closed_history(customer_ids, connection=None) -> bool:
+    """Whether any of the customers has a period close snapshot or archived ledger rows"""
+    sources = [select(model.customer_id).where(model.customer_id.in_(customer_ids))
+               for model in (PeriodClose, *ARCHIVES.values())]
+    return (connection or db.session).execute(select(union_all(*sources).exists())).scalar()
+
+
+@event.listens_for(db.session, 'before_flush')
+def _guard_closed_periods(session, flush_context, instances):
+    """
+    Refuse ORM writes inside a closed period
+
+    That covers ledger rows dated inside one before or after the change,
+    archive rows and snapshots, and deleting a customer who has any of
+    them.
+    """
+    days = set()
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        field = CLOSED_DATES.get(type(obj))
+        if field is not None:
+            history = inspect(obj).attrs[field].history
+            days.update(day for day in (*history.deleted, getattr(obj, field)) if day is not None)
+    if days:
+        check_open(min(days), session.connection())
+
+    deleted = [obj.id for obj in session.deleted if isinstance(obj, Customer)]
+    if deleted and has_closed_history(deleted, session.connection()):
+        raise ClosedPeriodError(closed_through(session.connection()))
+
+
+def close_period(through: date) -> dict:
+    """
+    Close every ledger up to ``through``, the last day of a month
+
+    Each customer's cumulative totals, catering cost and balance through
+    that day are stored in period_closes, then the ledger rows up to it are
+    moved to the archive tables in the same transaction. customer_balances
+    and the rollups still cover the whole history, so they don't change;
+    the all-time balance versions are bumped so cached PDFs and ETags
+    pick up the shorter detail lists.
+
+    Returns:
+        dict: number of customers snapshotted and rows archived per table
+    """
+    if through.day != monthrange(through.year, through.month)[1]:
+        raise ValueError('a period must end on the last day of a month')
+    if through >= date.today():
+        raise ValueError('only past months can be closed')
+
+    connection = db.session.connection()
+    previous = closed_through(connection)
+    if previous is not None and through <= previous:
+        raise ValueError(f'already closed through {previous:%Y-%m-%d}')
+
+    balance = CustomerBalance.__table__
+    totals = (
+        select(balance.c.customer_id, *(func.sum(balance.c[column]).label(column) for column in BALANCE_COLUMNS))
+        .where(balance.c.period != CustomerBalance.ALL_TIME, balance.c.period <= month_key(through))
+        .group_by(balance.c.customer_id)
+        .subquery()
+    )
+    stmt = (
+        select(
+            *read_columns(CustomerRow, Customer),
+            *(func.coalesce(totals.c[column], 0) for column in BALANCE_COLUMNS),
+            *read_columns(OpeningRow, PeriodClose),
+        )
+        .outerjoin(totals, totals.c.customer_id == Customer.id)
+        .outerjoin(PeriodClose, and_(PeriodClose.customer_id == Customer.id, PeriodClose.closed_through == previous))
+    )
+    closes = []
+    for summary in build_summaries(db.session.execute(stmt)):
+        closes.append({
+            'customer_id': summary['customer'].id,
+            'closed_through': through,
+            'total_portions': summary['total_portions'],
+            'catering_cost': summary['catering_cost'],
+            'total_kasbon': summary['total_kasbon'],
+            'total_payments': summary['total_payments'],
+            'balance': summary['remaining_balance'],
+        })
+    if closes:
+        connection.execute(PeriodClose.__table__.insert(), closes)
+
+    # Core statements on purpose: the balance and rollup listeners must not
+    # count the moved rows as removed
+    result = {'customers': len(closes)}
+    for model, archive in ARCHIVES.items():
+        live = model.__table__
+        columns = [column.name for column in archive.__table__.columns if column.name != 'id']
+        connection.execute(archive.__table__.insert().from_select(
+            columns, select(*(live.c[name] for name in columns)).where(live.c.date <= through).order_by(live.c.id)
+        ))
+        result[live.name] = connection.execute(live.delete().where(live.c.date <= through)).rowcount
+
+    connection.execute(
+        balance.update().where(balance.c.period == CustomerBalance.ALL_TIME).values(version=balance.c.version + 1)
+    )
+    db.session.commit()
+    return result
+
+
+def period_close_history() -> list:
+    """
+    Every close so far, newest first
+
+    Returns:
+        list: (closed_through, customers, total balance) rows
+    """
+    return db.session.execute(
+        select(PeriodClose.closed_through, func.count(PeriodClose.id), func.sum(PeriodClose.balance))
+        .group_by(PeriodClose.closed_through)
+        .order_by(PeriodClose.closed_through.desc())
+    ).all()
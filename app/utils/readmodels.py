@@ -0,0 +1,30 @@
+from collections import namedtuple
+
+from app.models import DailyOrder, Kasbon, Payment
+
+# Read models: the columns the summary page, PDF statements and exports show,
+# selected into plain named tuples. Unlike ORM instances they carry no
+# identity map entry, instance state or lazy loaders, and they pickle as-is
+# for the statement worker processes.
+
+CustomerRow = namedtuple('CustomerRow', ['id', 'name', 'price_per_bundle', 'portions_per_bundle'])
+OpeningRow = namedtuple('OpeningRow', [
+    'closed_through', 'total_portions', 'catering_cost', 'total_kasbon', 'total_payments', 'balance',
+])
+OrderRow = namedtuple('OrderRow', [
+    'date', 'morning_portions', 'afternoon_portions', 'evening_portions', 'total_portions',
+])
+KasbonRow = namedtuple('KasbonRow', ['date', 'item_name', 'quantity', 'unit_price', 'total_amount'])
+PaymentRow = namedtuple('PaymentRow', ['date', 'amount', 'description'])
+
+# Ledger model -> read model of its rows (archive tables share the columns)
+LEDGER_ROWS = {
+    DailyOrder: OrderRow,
+    Kasbon: KasbonRow,
+    Payment: PaymentRow,
+}
+
+
+def read_columns(read_model, source) -> list:
+    """Columns of ``source`` (a model or archive model) for ``read_model``'s fields, in field order"""
+    return [getattr(source, field) for field in read_model._fields]
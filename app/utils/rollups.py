@@ -0,0 +1,289 @@
+from collections import defaultdict
+from datetime import date
+from typing import Dict
+
+from sqlalchemy import case, event, func, inspect, select
+
+from app.models import db, Customer, DailyOrder, Kasbon, Payment, DailyRollup, MonthlyRollup, ARCHIVES
+from app.utils.balances import track_previous
+from app.utils.engine import upsert_insert
+
+ROLLUP_COLUMNS = (
+    'order_count', 'morning_portions', 'afternoon_portions', 'evening_portions', 'total_portions',
+    'catering_revenue', 'kasbon_total', 'payment_total',
+)
+ORDER_PORTIONS = ('morning_portions', 'afternoon_portions', 'evening_portions', 'total_portions')
+LEDGER_MODELS = (DailyOrder, Kasbon, Payment)
+# Live tables and the archives of closed periods, each as (orders, kasbons, payments)
+LEDGER_SOURCES = (LEDGER_MODELS, tuple(ARCHIVES[model] for model in LEDGER_MODELS))
+ORDER_MODELS = (DailyOrder, ARCHIVES[DailyOrder])
+KASBON_MODELS = (Kasbon, ARCHIVES[Kasbon])
+LEDGER_TYPES = (*LEDGER_MODELS, *ARCHIVES.values())
+# Customer fields that change the catering revenue of all their orders
+PRICE_FIELDS = ('price_per_bundle', 'portions_per_bundle')
+
+
+def month_start(day: date) -> date:
+    return day.replace(day=1)
+
+
+def order_revenue(total_portions: int, price_per_bundle: int, portions_per_bundle: int) -> int:
+    """An order's portions valued at its customer's per-portion price, rounded half up to whole rupiah"""
+    if not portions_per_bundle or portions_per_bundle <= 0:
+        return 0
+    return (2 * (total_portions or 0) * price_per_bundle + portions_per_bundle) // (2 * portions_per_bundle)
+
+
+def _order_revenue_expr(total_portions, price_per_bundle, portions_per_bundle):
+    """order_revenue() as a SQL expression, in integer arithmetic so it matches exactly"""
+    return case(
+        (portions_per_bundle > 0,
+         (2 * func.coalesce(total_portions, 0) * price_per_bundle + portions_per_bundle) // (2 * portions_per_bundle)),
+        else_=0,
+    )
+
+
+def _catering_revenue(orders=DailyOrder):
+    """Sum of order_revenue() over the orders, priced by the ordering customer"""
+    return func.coalesce(func.sum(
+        _order_revenue_expr(orders.total_portions, Customer.price_per_bundle, Customer.portions_per_bundle)
+    ), 0)
+
+
+def _daily_statements(orders=DailyOrder, kasbons=Kasbon, payments=Payment) -> list:
+    """Grouped per-day statements for each ledger, as (statement, rollup columns) pairs"""
+    def total(column):
+        return func.coalesce(func.sum(column), 0)
+
+    order_totals = (
+        select(
+            orders.date,
+            func.count(orders.id),
+            total(orders.morning_portions),
+            total(orders.afternoon_portions),
+            total(orders.evening_portions),
+            total(orders.total_portions),
+            _catering_revenue(orders),
+        )
+        .join(Customer, Customer.id == orders.customer_id)
+        .group_by(orders.date)
+    )
+    kasbon_totals = (
+        select(kasbons.date, total(kasbons.total_amount)).group_by(kasbons.date)
+    )
+    payment_totals = (
+        select(payments.date, total(payments.amount)).group_by(payments.date)
+    )
+    return [(order_totals, ROLLUP_COLUMNS[:6]), (kasbon_totals, ('kasbon_total',)),
+            (payment_totals, ('payment_total',))]
+
+
+def compute_daily_rollups(connection) -> Dict[date, dict]:
+    """Aggregate the live and archived ledgers per day over the whole history"""
+    rollups = {}
+    for sources in LEDGER_SOURCES:
+        for stmt, columns in _daily_statements(*sources):
+            for day, *values in connection.execute(stmt):
+                row = rollups.setdefault(day, dict.fromkeys(ROLLUP_COLUMNS, 0))
+                for column, value in zip(columns, values):
+                    row[column] += value
+    return rollups
+
+
+def _monthly_totals(daily: Dict[date, dict]) -> Dict[date, dict]:
+    """Add daily rollups up into months"""
+    monthly = defaultdict(lambda: dict.fromkeys(ROLLUP_COLUMNS, 0))
+    for day, values in daily.items():
+        for column, value in values.items():
+            monthly[month_start(day)][column] += value
+    return monthly
+
+
+def ledger_rollup_values(model, get, pricing: tuple) -> dict:
+    """
+    Rollup columns contributed by one ledger row
+
+    ``get(attr)`` reads the row's fields and ``pricing`` is the ordering
+    customer's (price_per_bundle, portions_per_bundle), used for orders only.
+    """
+    if model in ORDER_MODELS:
+        values = {column: get(column) or 0 for column in ORDER_PORTIONS}
+        return {'order_count': 1, **values, 'catering_revenue': order_revenue(values['total_portions'], *pricing)}
+    if model in KASBON_MODELS:
+        return {'kasbon_total': get('total_amount') or 0}
+    return {'payment_total': get('amount') or 0}
+
+
+def record_rollup_change(deltas: Dict[date, Dict[str, int]], day: date, values: dict, sign: int = 1):
+    """Add one ledger row's rollup values (sign=1) or take them away (sign=-1) in ``deltas``"""
+    row = deltas.setdefault(day, defaultdict(int))
+    for column, value in values.items():
+        row[column] += sign * value
+
+
+def customer_pricing(connection, customer_ids) -> Dict[int, tuple]:
+    """(price_per_bundle, portions_per_bundle) of the given customers"""
+    if not customer_ids:
+        return {}
+    rows = connection.execute(
+        select(Customer.id, Customer.price_per_bundle, Customer.portions_per_bundle)
+        .where(Customer.id.in_(customer_ids))
+    )
+    return {customer_id: (price, per_bundle) for customer_id, price, per_bundle in rows}
+
+
+# Old values _previous() needs, also for rows expired by a commit
+track_previous(
+    *(getattr(Customer, field) for field in PRICE_FIELDS),
+    *(getattr(model, attr) for model in LEDGER_TYPES for attr in ('customer_id', 'date')),
+    *(getattr(model, attr) for model in ORDER_MODELS for attr in ORDER_PORTIONS),
+    *(model.total_amount for model in KASBON_MODELS),
+    *(model.amount for model in (Payment, ARCHIVES[Payment])),
+)
+
+
+def _previous(obj, attr: str):
+    """Value of ``attr`` before the pending changes were flushed"""
+    history = inspect(obj).attrs[attr].history
+    if history.deleted:
+        return history.deleted[0]
+    return getattr(obj, attr)
+
+
+def _repriced(obj) -> bool:
+    return any(inspect(obj).attrs[field].history.has_changes() for field in PRICE_FIELDS)
+
+
+def collect_rollup_deltas(session) -> Dict[date, Dict[str, int]]:
+    """
+    Work out signed per-day rollup changes for the rows in a flush
+
+    Orders are valued at their customer's price from before the flush; a
+    customer repriced in the same flush then has the difference between the
+    new and old price applied to every day they ordered on, so the result
+    is the current orders at the current prices either way.
+    """
+    deltas = {}
+    changed = [obj for obj in (*session.new, *session.dirty, *session.deleted) if type(obj) in LEDGER_TYPES]
+    customers = {obj.id: obj for obj in (*session.dirty, *session.deleted) if isinstance(obj, Customer)}
+    repriced = {customer_id: obj for customer_id, obj in customers.items()
+                if obj in session.dirty and _repriced(obj)}
+    if not changed and not repriced:
+        return deltas
+
+    # Prices before the flush: the session's old values for changed and
+    # deleted customers, the database (not yet changed) for the others
+    pricing = {
+        customer_id: tuple(_previous(obj, field) for field in PRICE_FIELDS)
+        for customer_id, obj in customers.items()
+    }
+    pricing.update({
+        obj.id: tuple(getattr(obj, field) for field in PRICE_FIELDS)
+        for obj in session.new if isinstance(obj, Customer)
+    })
+    wanted = {_previous(obj, 'customer_id') for obj in changed} | {obj.customer_id for obj in changed}
+    pricing.update(customer_pricing(session.connection(), wanted - pricing.keys()))
+
+    def old_values(obj):
+        return ledger_rollup_values(type(obj), lambda attr: _previous(obj, attr),
+                                    pricing.get(_previous(obj, 'customer_id'), (0, 0)))
+
+    def new_values(obj):
+        return ledger_rollup_values(type(obj), lambda attr: getattr(obj, attr), pricing.get(obj.customer_id, (0, 0)))
+
+    for obj in session.new:
+        if type(obj) in LEDGER_TYPES:
+            record_rollup_change(deltas, obj.date, new_values(obj))
+    for obj in session.dirty:
+        if type(obj) in LEDGER_TYPES and session.is_modified(obj, include_collections=False):
+            record_rollup_change(deltas, _previous(obj, 'date'), old_values(obj), sign=-1)
+            record_rollup_change(deltas, obj.date, new_values(obj))
+    for obj in session.deleted:
+        if type(obj) in LEDGER_TYPES:
+            record_rollup_change(deltas, _previous(obj, 'date'), old_values(obj), sign=-1)
+
+    for customer_id, obj in repriced.items():
+        for orders in ORDER_MODELS:
+            old = _order_revenue_expr(orders.total_portions, *pricing[customer_id])
+            new = _order_revenue_expr(orders.total_portions, obj.price_per_bundle, obj.portions_per_bundle)
+            stmt = (
+                select(orders.date, func.sum(new) - func.sum(old))
+                .where(orders.customer_id == customer_id)
+                .group_by(orders.date)
+            )
+            for day, difference in session.connection().execute(stmt):
+                record_rollup_change(deltas, day, {'catering_revenue': difference})
+    return deltas
+
+
+def apply_rollup_deltas(connection, deltas: Dict[date, Dict[str, int]]):
+    """
+    Add per-day deltas to daily_rollups and their months to monthly_rollups
+
+    Each table gets one executemany INSERT ... ON CONFLICT DO UPDATE SET
+    col = col + excluded.col, so concurrent writers to the same day both
+    land and nothing is re-aggregated from the ledgers.
+    """
+    daily = {
+        day: {column: values.get(column, 0) for column in ROLLUP_COLUMNS}
+        for day, values in deltas.items() if any(values.values())
+    }
+    for model, key, rollups in ((DailyRollup, 'date', daily), (MonthlyRollup, 'month', _monthly_totals(daily))):
+        if not rollups:
+            continue
+        table = model.__table__
+        stmt = upsert_insert(connection.dialect, table)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c[key]],
+            set_={column: table.c[column] + stmt.excluded[column] for column in ROLLUP_COLUMNS},
+        )
+        connection.execute(stmt, [{key: day, **values} for day, values in sorted(rollups.items())])
+
+
+@event.listens_for(db.session, 'after_flush')
+def _update_rollups(session, flush_context):
+    deltas = collect_rollup_deltas(session)
+    if deltas:
+        apply_rollup_deltas(session.connection(), deltas)
+
+
+def rebuild_rollups() -> int:
+    """Recompute both rollup tables from the raw ledgers, returning the day count"""
+    connection = db.session.connection()
+    daily = compute_daily_rollups(connection)
+    for model, key, rollups in ((DailyRollup, 'date', daily), (MonthlyRollup, 'month', _monthly_totals(daily))):
+        table = model.__table__
+        connection.execute(table.delete())
+        if rollups:
+            connection.execute(table.insert(), [{key: day, **values} for day, values in rollups.items()])
+    db.session.commit()
+    return len(daily)
+
+
+def check_rollups() -> list:
+    """
+    Compare the rollup tables against the raw ledgers
+
+    Returns:
+        list: (table, key, column, expected, stored) for every mismatch
+    """
+    connection = db.session.connection()
+    expected_daily = compute_daily_rollups(connection)
+    expected_monthly = _monthly_totals(expected_daily)
+
+    mismatches = []
+    empty = dict.fromkeys(ROLLUP_COLUMNS, 0)
+    for model, key, expected in ((DailyRollup, 'date', expected_daily),
+                                 (MonthlyRollup, 'month', expected_monthly)):
+        table = model.__table__
+        stored = {
+            row[key]: {column: row[column] for column in ROLLUP_COLUMNS}
+            for row in connection.execute(select(table)).mappings()
+        }
+        for day in sorted(expected.keys() | stored.keys()):
+            want = expected.get(day, empty)
+            have = stored.get(day, empty)
+            for column in ROLLUP_COLUMNS:
+                if want[column] != have[column]:
+                    mismatches.append((table.name, day, column, want[column], have[column]))
+    return mismatches
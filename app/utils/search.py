@@ -0,0 +1,246 @@
+import sqlite3
+from collections import namedtuple
+
+from sqlalchemy import column, event, literal_column, select, table
+from sqlalchemy.exc import DatabaseError
+from sqlalchemy.orm import joinedload
+
+from app.models import db, Customer, Kasbon, Payment
+
+# Model -> the text column searched for it
+SEARCHABLE = {
+    Customer: 'name',
+    Kasbon: 'item_name',
+    Payment: 'description',
+}
+
+# Terms shorter than one trigram can't be looked up in a trigram index and
+# fall back to a scan
+TRIGRAM_LENGTH = 3
+
+SearchResults = namedtuple('SearchResults', ['customers', 'kasbons', 'payments'])
+
+
+def _contains_pattern(term: str) -> str:
+    escaped = term.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+    return f'%{escaped}%'
+
+
+class LikeSearch:
+    """
+    Case-insensitive substring search with ILIKE
+
+    Without an index every search scans the table; databases with trigram
+    support use one of the subclasses below.
+    """
+
+    name = 'like'
+
+    def ddl(self, model) -> list:
+        """Statements creating the search index of ``model`` (filling it from existing rows)"""
+        return []
+
+    def drop_ddl(self, model) -> list:
+        return []
+
+    def condition(self, model, term: str):
+        """WHERE clause for ``model`` rows whose searchable column contains ``term``"""
+        return getattr(model, SEARCHABLE[model]).ilike(_contains_pattern(term), escape='\\')
+
+    def matching_ids(self, model, term: str, limit: int = None):
+        """Select the ids of matching ``model`` rows, newest first"""
+        stmt = select(model.id).where(self.condition(model, term)).order_by(model.id.desc())
+        return stmt.limit(limit) if limit else stmt
+
+    def rebuild(self, connection) -> int:
+        """Refill every search index from its table, returning the number of indexes"""
+        return 0
+
+    def check(self, connection) -> list:
+        """Names of the search indexes that don't match their table"""
+        return []
+
+
+class PostgresTrigramSearch(LikeSearch):
+    """
+    pg_trgm GIN indexes on the searchable columns
+
+    PostgreSQL keeps the indexes current on every write and uses them for
+    ``ILIKE '%term%'``, so the queries are LikeSearch's. Creating the
+    pg_trgm extension needs the CREATE privilege on the database.
+    """
+
+    name = 'pg_trgm'
+
+    def _index(self, model) -> str:
+        return f'ix_{model.__tablename__}_{SEARCHABLE[model]}_trgm'
+
+    def ddl(self, model) -> list:
+        return [
+            'CREATE EXTENSION IF NOT EXISTS pg_trgm',
+            f'CREATE INDEX IF NOT EXISTS {self._index(model)} ON {model.__tablename__} '
+            f'USING gin ({SEARCHABLE[model]} gin_trgm_ops)',
+        ]
+
+    def drop_ddl(self, model) -> list:
+        return [f'DROP INDEX IF EXISTS {self._index(model)}']
+
+
+class SqliteTrigramSearch(LikeSearch):
+    """
+    FTS5 external-content indexes with the trigram tokenizer (SQLite 3.34+)
+
+    Each searchable table gets a ``<table>_search`` virtual table keyed by
+    the row id. Triggers update it on every insert, update and delete, so
+    Core statements that bypass the ORM (imports, period closes) keep it in
+    sync as well. Lookups run newest first inside the index and stop at the
+    limit, however many rows match.
+    """
+
+    name = 'fts5'
+
+    def index(self, model) -> str:
+        return f'{model.__tablename__}_search'
+
+    def ddl(self, model) -> list:
+        source, text, index = model.__tablename__, SEARCHABLE[model], self.index(model)
+        delete = f"INSERT INTO {index}({index}, rowid, {text}) VALUES ('delete', old.id, old.{text});"
+        insert = f'INSERT INTO {index}(rowid, {text}) VALUES (new.id, new.{text});'
+        return [
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {index} USING fts5("
+            f"{text}, content='{source}', content_rowid='id', tokenize='trigram')",
+            f'CREATE TRIGGER IF NOT EXISTS {index}_insert AFTER INSERT ON {source} BEGIN {insert} END',
+            f'CREATE TRIGGER IF NOT EXISTS {index}_delete AFTER DELETE ON {source} BEGIN {delete} END',
+            f'CREATE TRIGGER IF NOT EXISTS {index}_update AFTER UPDATE OF {text} ON {source} '
+            f'BEGIN {delete} {insert} END',
+            f"INSERT INTO {index}({index}) VALUES ('rebuild')",
+        ]
+
+    def drop_ddl(self, model) -> list:
+        index = self.index(model)
+        return [*(f'DROP TRIGGER IF EXISTS {index}_{action}' for action in ('insert', 'delete', 'update')),
+                f'DROP TABLE IF EXISTS {index}']
+
+    def matching_ids(self, model, term: str, limit: int = None):
+        if len(term) < TRIGRAM_LENGTH:
+            return super().matching_ids(model, term, limit)
+        index = table(self.index(model), column('rowid'))
+        phrase = '"' + term.replace('"', '""') + '"'
+        stmt = (
+            select(index.c.rowid)
+            .where(literal_column(self.index(model)).op('MATCH')(phrase))
+            .order_by(index.c.rowid.desc())
+        )
+        return stmt.limit(limit) if limit else stmt
+
+    def condition(self, model, term: str):
+        if len(term) < TRIGRAM_LENGTH:
+            return super().condition(model, term)
+        return model.id.in_(self.matching_ids(model, term))
+
+    def rebuild(self, connection) -> int:
+        for model in SEARCHABLE:
+            index = self.index(model)
+            connection.exec_driver_sql(f"INSERT INTO {index}({index}) VALUES ('rebuild')")
+        return len(SEARCHABLE)
+
+    def check(self, connection) -> list:
+        broken = []
+        for model in SEARCHABLE:
+            index = self.index(model)
+            try:
+                with connection.begin_nested():
+                    connection.exec_driver_sql(f"INSERT INTO {index}({index}, rank) VALUES ('integrity-check', 1)")
+            except DatabaseError:
+                broken.append(index)
+        return broken
+
+    def is_index_table(self, name: str) -> bool:
+        """Whether ``name`` is one of the virtual tables or their FTS5 shadow tables"""
+        return any(name == self.index(model) or name.startswith(self.index(model) + '_') for model in SEARCHABLE)
+
+
+_LIKE = LikeSearch()
+_POSTGRES = PostgresTrigramSearch()
+_SQLITE = SqliteTrigramSearch()
+
+
+def search_backend(dialect) -> LikeSearch:
+    """Search implementation for a database dialect"""
+    if dialect.name == 'sqlite' and sqlite3.sqlite_version_info >= (3, 34, 0):
+        return _SQLITE
+    if dialect.name == 'postgresql':
+        return _POSTGRES
+    return _LIKE
+
+
+def search_condition(model, term: str):
+    """WHERE clause for ``model`` rows containing ``term``, served by the search index"""
+    return search_backend(db.session.get_bind().dialect).condition(model, term)
+
+
+def global_search(term: str, limit: int = 10) -> SearchResults:
+    """
+    Customers, kasbon (by item name) and payments (by description) containing ``term``
+
+    Every kind is looked up in its own index, at most ``limit`` rows each:
+    customers by name, kasbon and payments latest entry first. Only the open
+    period is searched; archived ledger rows are not indexed.
+    """
+    term = term.strip()
+    if not term:
+        return SearchResults([], [], [])
+    backend = search_backend(db.session.get_bind().dialect)
+
+    def found(model, *order_by):
+        ids = backend.matching_ids(model, term, limit)
+        stmt = select(model).where(model.id.in_(ids)).order_by(*order_by)
+        if model is not Customer:
+            stmt = stmt.options(joinedload(model.customer))
+        return db.session.scalars(stmt).all()
+
+    return SearchResults(
+        customers=found(Customer, Customer.name),
+        kasbons=found(Kasbon, Kasbon.id.desc()),
+        payments=found(Payment, Payment.id.desc()),
+    )
+
+
+def rebuild_search_index() -> int:
+    """Refill the search indexes from their tables, returning the number of indexes rebuilt"""
+    connection = db.session.connection()
+    count = search_backend(connection.dialect).rebuild(connection)
+    db.session.commit()
+    return count
+
+
+def check_search_index() -> list:
+    """Names of the search indexes that are out of sync with their tables"""
+    connection = db.session.connection()
+    return search_backend(connection.dialect).check(connection)
+
+
+def include_object(obj, name, type_, reflected, compare_to) -> bool:
+    """Alembic autogenerate filter leaving the FTS5 index tables alone"""
+    return not (type_ == 'table' and reflected and compare_to is None and _SQLITE.is_index_table(name))
+
+
+def _create_index(model):
+    def create(target, connection, **kw):
+        for statement in search_backend(connection.dialect).ddl(model):
+            connection.exec_driver_sql(statement)
+    return create
+
+
+def _drop_index(model):
+    def drop(target, connection, **kw):
+        for statement in search_backend(connection.dialect).drop_ddl(model):
+            connection.exec_driver_sql(statement)
+    return drop
+
+
+# db.create_all()/drop_all() build and remove the indexes with their tables;
+# migrated databases get them from the search index migration
+for _model in SEARCHABLE:
+    event.listen(_model.__table__, 'after_create', _create_index(_model))
+    event.listen(_model.__table__, 'before_drop', _drop_index(_model))
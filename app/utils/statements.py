@@ -0,0 +1,84 @@
+import multiprocessing
+import os
+import re
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+from typing import Callable, Iterable, Iterator, Optional, Tuple
+
+from app.models import db, Customer
+from app.utils.helpers import build_summaries, customer_totals_query, load_ledger_details
+
+# Customers whose totals are queried and billed together
+SUMMARY_BATCH_SIZE = 200
+
+
+def statement_filename(customer, start_date: date = None, end_date: date = None) -> str:
+    name = re.sub(r'[^A-Za-z0-9]+', '_', customer.name).strip('_') or 'customer'
+    period = f"_{start_date:%Y%m%d}-{end_date:%Y%m%d}" if start_date and end_date else ''
+    return f"ringkasan_{customer.id}_{name}{period}.pdf"
+
+
+def _render_statement(filename: str, summary: dict, start_date: date, end_date: date) -> Tuple[str, bytes]:
+    from app.utils.pdf import create_pdf_summary
+
+    return filename, create_pdf_summary(summary, start_date, end_date).getvalue()
+
+
+def _summaries(customer_ids: list, start_date: date = None, end_date: date = None) -> Iterator[dict]:
+    """Full summaries of the customers in ``customer_ids`` order, totals loaded and billed a batch at a time"""
+    for start in range(0, len(customer_ids), SUMMARY_BATCH_SIZE):
+        batch = customer_ids[start:start + SUMMARY_BATCH_SIZE]
+        stmt = customer_totals_query(batch, start_date, end_date)
+        summaries = {summary['customer'].id: summary for summary in build_summaries(db.session.execute(stmt))}
+        for customer_id in batch:
+            summary = summaries.get(customer_id)
+            if summary is not None:
+                load_ledger_details(summary, start_date, end_date)
+            yield summary
+
+
+def generate_statements(customer_ids: Optional[Iterable[int]] = None, start_date: date = None,
+                        end_date: date = None, workers: int = None,
+                        progress: Callable[[int, int], None] = None) -> Iterator[Tuple[str, bytes]]:
+    """
+    Render PDF statements for many customers across a process pool
+
+    Summaries are queried in this process and handed to the workers as they
+    are, being made of picklable read models; reportlab does the CPU-bound
+    rendering on every core. Only a small window of jobs is kept in flight,
+    so results can be streamed out as they finish without holding every PDF
+    in memory.
+
+    Yields:
+        tuple: (filename, pdf_bytes) in customer order
+    """
+    if customer_ids is None:
+        customer_ids = [c.id for c in Customer.query.with_entities(Customer.id).order_by(Customer.name)]
+    customer_ids = list(customer_ids)
+    workers = workers or os.cpu_count() or 1
+    total = len(customer_ids)
+    done = 0
+
+    # spawn keeps workers independent of the web server's threads and DB connections
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+        pending = deque()
+        for summary in _summaries(customer_ids, start_date, end_date):
+            if summary is None:
+                total -= 1
+                continue
+            filename = statement_filename(summary['customer'], start_date, end_date)
+            pending.append(pool.submit(_render_statement, filename, summary, start_date, end_date))
+
+            while len(pending) >= workers * 2:
+                done += 1
+                yield pending.popleft().result()
+                if progress:
+                    progress(done, total)
+
+        while pending:
+            done += 1
+            yield pending.popleft().result()
+            if progress:
+                progress(done, total)
@@ -0,0 +1,52 @@
+import io
+import zipfile
+from typing import Iterable, Iterator, Tuple, Union
+
+
+class _ChunkBuffer(io.RawIOBase):
+    """Write-only, non-seekable sink that hands back whatever was written so far"""
+
+    def __init__(self):
+        self._chunks = []
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self) -> bytes:
+        data = b''.join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def stream_zip(entries: Iterable[Tuple[str, Union[bytes, Iterable[bytes]]]],
+               compression=zipfile.ZIP_DEFLATED) -> Iterator[bytes]:
+    """
+    Yield a ZIP archive chunk by chunk as ``(filename, data)`` entries arrive
+
+    ``data`` is either bytes or an iterable of byte chunks; the latter is
+    compressed as it is produced. Only the chunk at hand is held in memory,
+    so archives of any size can be sent straight into a streaming response
+    or a file.
+    """
+    buffer = _ChunkBuffer()
+    with zipfile.ZipFile(buffer, 'w', compression=compression) as archive:
+        for name, data in entries:
+            if isinstance(data, (bytes, bytearray)):
+                archive.writestr(name, data)
+            else:
+                with archive.open(name, 'w', force_zip64=True) as entry:
+                    for piece in data:
+                        entry.write(piece)
+                        chunk = buffer.drain()
+                        if chunk:
+                            yield chunk
+            chunk = buffer.drain()
+            if chunk:
+                yield chunk
+    chunk = buffer.drain()
+    if chunk:
+        yield chunk
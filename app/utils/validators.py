@@ -0,0 +1,67 @@
+from datetime import date, datetime
+from typing import Optional
+
+from pydantic import BaseModel, ConfigDict, Field, field_validator, model_validator
+
+# Accepted date formats for imported spreadsheets
+IMPORT_DATE_FORMATS = ('%Y-%m-%d', '%d/%m/%Y', '%d-%m-%Y')
+
+# CSV header (lower-cased) -> OrderImportRow field; the Indonesian headers
+# match the orders export so an exported file can be imported back
+ORDER_IMPORT_HEADERS = {
+    'tanggal': 'date',
+    'date': 'date',
+    'pelanggan': 'customer',
+    'customer': 'customer',
+    'id pelanggan': 'customer_id',
+    'customer_id': 'customer_id',
+    'pagi': 'morning_portions',
+    'morning_portions': 'morning_portions',
+    'siang': 'afternoon_portions',
+    'afternoon_portions': 'afternoon_portions',
+    'sore': 'evening_portions',
+    'evening_portions': 'evening_portions',
+}
+
+
+class OrderImportRow(BaseModel):
+    """One daily order row read from an import file"""
+
+    model_config = ConfigDict(str_strip_whitespace=True)
+
+    date: date
+    customer: Optional[str] = None
+    customer_id: Optional[int] = None
+    morning_portions: int = Field(0, ge=0)
+    afternoon_portions: int = Field(0, ge=0)
+    evening_portions: int = Field(0, ge=0)
+
+    @field_validator('date', mode='before')
+    @classmethod
+    def parse_date(cls, value):
+        if isinstance(value, str):
+            for fmt in IMPORT_DATE_FORMATS:
+                try:
+                    return datetime.strptime(value.strip(), fmt).date()
+                except ValueError:
+                    continue
+            raise ValueError('tanggal harus berformat YYYY-MM-DD atau DD/MM/YYYY')
+        return value
+
+    @field_validator('customer', 'customer_id', 'morning_portions', 'afternoon_portions', 'evening_portions',
+                     mode='before')
+    @classmethod
+    def empty_to_default(cls, value, info):
+        if isinstance(value, str) and not value.strip():
+            return 0 if info.field_name.endswith('_portions') else None
+        return value
+
+    @model_validator(mode='after')
+    def require_customer(self):
+        if not self.customer and self.customer_id is None:
+            raise ValueError('pelanggan wajib diisi')
+        return self
+
+    @property
+    def total_portions(self) -> int:
+        return self.morning_portions + self.afternoon_portions + self.evening_portions
@@ -0,0 +1,75 @@
+"""
+Receivables aging report against the per-customer summary loop
+
+aging_report() ages every customer in one windowed statement. The naive
+way is one get_customer_summary() per customer, which is timed on a sample
+and extrapolated to the whole customer table. The sample's outstanding
+balances must match between the two.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_aging [--customers 5000] [--days 120] [--sample 200]
+"""
+import argparse
+import os
+import tempfile
+import time
+from datetime import date
+
+from sqlalchemy import event
+
+from benchmarks.data import generate, make_app
+
+
+def bench(customers: int, days: int, sample: int) -> dict:
+    from app.models import db
+    from app.utils.aging import aging_report
+    from app.utils.helpers import get_customer_summary
+
+    with tempfile.TemporaryDirectory() as tmp:
+        app = make_app(f"sqlite:///{os.path.join(tmp, 'aging.db')}")
+        with app.app_context():
+            generate(customers, days)
+            as_of = date.today()
+
+            statements = []
+            listener = lambda *args: statements.append(1)
+            event.listen(db.engine, 'before_cursor_execute', listener)
+            started = time.perf_counter()
+            rows = aging_report(as_of)
+            report_seconds = time.perf_counter() - started
+            report_statements = len(statements)
+
+            by_id = {row.customer_id: row for row in rows}
+            sample_ids = sorted(by_id)[:sample]
+            mismatches = 0
+            started = time.perf_counter()
+            for customer_id in sample_ids:
+                summary = get_customer_summary(customer_id, include_details=False)
+                mismatches += summary['remaining_balance'] != by_id[customer_id].outstanding
+            loop_seconds = (time.perf_counter() - started) * len(rows) / len(sample_ids)
+            loop_statements = (len(statements) - report_statements) * len(rows) // len(sample_ids)
+            event.remove(db.engine, 'before_cursor_execute', listener)
+            db.engine.dispose()
+
+    return {'customers': len(rows), 'report_seconds': report_seconds, 'report_statements': report_statements,
+            'loop_seconds': loop_seconds, 'loop_statements': loop_statements, 'mismatches': mismatches}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--customers', type=int, default=5000)
+    parser.add_argument('--days', type=int, default=120, help='days of history per customer')
+    parser.add_argument('--sample', type=int, default=200, help='customers timed with the summary loop')
+    args = parser.parse_args()
+
+    result = bench(args.customers, args.days, args.sample)
+    print(f"{'path':<16} {'seconds':>10} {'queries':>10}")
+    print(f"{'aging_report':<16} {result['report_seconds']:>10.3f} {result['report_statements']:>10}")
+    print(f"{'summary loop':<16} {result['loop_seconds']:>10.3f} {result['loop_statements']:>10}")
+    print(f"speedup {result['loop_seconds'] / result['report_seconds']:.1f}x over {result['customers']} customers, "
+          f"{result['mismatches']} outstanding mismatches in the sample")
+
+
+if __name__ == '__main__':
+    main()
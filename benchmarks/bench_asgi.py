@@ -0,0 +1,135 @@
+"""
+Compare the ASGI entry point with the plain WSGI app under concurrent load
+
+Both are served by a single uvicorn process over the same seeded SQLite
+database; the ASGI run needs greenlet and aiosqlite installed.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_asgi [--seconds 5] [--concurrency 32]
+"""
+import argparse
+import http.client
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import date, timedelta
+
+from benchmarks.data import generate, make_app
+from benchmarks.load import summarize
+
+SERVERS = {
+    'wsgi': ['--interface', 'wsgi', '--factory', 'app:create_app'],
+    'asgi': ['--factory', 'app.asgi:create_asgi_app'],
+}
+CUSTOMERS = 200
+DAYS = 90
+
+
+def seed(database_url: str):
+    from app.extensions import db
+
+    app = make_app(database_url)
+    with app.app_context():
+        generate(CUSTOMERS, DAYS)
+        db.engine.dispose()
+
+
+def scenarios() -> dict:
+    """Path generators per scenario; PDFs use varying ranges so most renders miss the cache"""
+    start = date.today() - timedelta(days=DAYS)
+    return {
+        'api': lambda rnd: f'/api/customer_summary/{rnd.randint(1, CUSTOMERS)}',
+        'dashboard': lambda rnd: '/',
+        'pdf': lambda rnd: (f'/summary/{rnd.randint(1, CUSTOMERS)}/pdf'
+                            f'?start_date={start + timedelta(days=rnd.randrange(DAYS))}'),
+    }
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def start_server(mode: str, database_url: str) -> tuple:
+    port = free_port()
+    env = dict(os.environ, DATABASE_URL=database_url)
+    process = subprocess.Popen(
+        [sys.executable, '-m', 'uvicorn', *SERVERS[mode], '--port', str(port), '--log-level', 'warning',
+         '--no-access-log'],
+        env=env,
+    )
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=0.2).close()
+            return process, port
+        except OSError:
+            time.sleep(0.1)
+    process.kill()
+    raise RuntimeError(f'{mode} server did not start')
+
+
+def load(port: int, make_path, seconds: float, concurrency: int) -> dict:
+    """Keep ``concurrency`` keep-alive clients busy for ``seconds``"""
+    latencies = []
+    errors = []
+    stop = time.perf_counter() + seconds
+
+    def client(worker: int):
+        rnd = random.Random(worker)
+        connection = http.client.HTTPConnection('127.0.0.1', port, timeout=60)
+        while time.perf_counter() < stop:
+            started = time.perf_counter()
+            connection.request('GET', make_path(rnd))
+            response = connection.getresponse()
+            response.read()
+            latencies.append(time.perf_counter() - started)
+            if response.status != 200:
+                errors.append(response.status)
+        connection.close()
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(concurrency)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    return summarize(latencies, elapsed, len(errors))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--seconds', type=float, default=5.0, help='load duration per scenario')
+    parser.add_argument('--concurrency', type=int, default=32, help='parallel clients')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database_url = f'sqlite:///{os.path.join(tmp, "bench.db")}'
+        seed(database_url)
+
+        print(f"{'server':>6} {'scenario':>10} {'req/s':>10} {'p50 ms':>10} {'p95 ms':>10} {'p99 ms':>10} {'errors':>7}")
+        for mode in SERVERS:
+            process, port = start_server(mode, database_url)
+            try:
+                for name, make_path in scenarios().items():
+                    load(port, make_path, min(args.seconds, 1.0), args.concurrency)  # warm-up
+                    result = load(port, make_path, args.seconds, args.concurrency)
+                    print(f"{mode:>6} {name:>10} {result['requests_per_second']:>10.1f} "
+                          f"{result['p50_ms']:>10.1f} {result['p95_ms']:>10.1f} {result['p99_ms']:>10.1f} "
+                          f"{result['errors']:>7}")
+            finally:
+                process.terminate()
+                process.wait()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+"""
+Compare scalar calculate_catering_cost with the batched bill_many paths
+
+Run from the repository root:
+
+    python -m benchmarks.bench_billing [--seconds 3] [--rows 100000]
+"""
+import argparse
+import random
+import time
+from types import SimpleNamespace
+
+from app.utils.billing import HAS_NUMPY, bill_many
+from app.utils.helpers import calculate_catering_cost
+
+
+def make_rows(count: int, seed: int = 0) -> tuple:
+    """Random (portions, portions_per_bundle, price_per_bundle) columns, including unpriced customers"""
+    rnd = random.Random(seed)
+    portions = [rnd.randrange(0, 2000) for _ in range(count)]
+    per_bundle = [rnd.choice((0, 1, 2, 3, 3, 3, 5)) for _ in range(count)]
+    price = [rnd.randrange(10, 60) * 1000 for _ in range(count)]
+    return portions, per_bundle, price
+
+
+def scalar(portions, per_bundle, price) -> tuple:
+    rows = [calculate_catering_cost(SimpleNamespace(portions_per_bundle=b, price_per_bundle=p), n)
+            for n, b, p in zip(portions, per_bundle, price)]
+    bundles, charged, cost = (list(column) for column in zip(*rows))
+    return bundles, charged, cost
+
+
+def bench(name: str, func, columns: tuple, seconds: float) -> dict:
+    func(*columns)  # warm-up
+
+    runs = 0
+    started = time.perf_counter()
+    while time.perf_counter() - started < seconds:
+        func(*columns)
+        runs += 1
+    elapsed = time.perf_counter() - started
+    return {'path': name, 'runs': runs, 'seconds': elapsed,
+            'rows_per_second': runs * len(columns[0]) / elapsed}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--seconds', type=float, default=3.0, help='time budget per path')
+    parser.add_argument('--rows', type=int, default=100_000, help='rows billed per call')
+    args = parser.parse_args()
+
+    columns = make_rows(args.rows)
+    expected = scalar(*columns)
+
+    paths = [('scalar', scalar), ('python', lambda *c: bill_many(*c, use_numpy=False))]
+    if HAS_NUMPY:
+        paths.append(('numpy', lambda *c: bill_many(*c, use_numpy=True)))
+    else:
+        print('NumPy not installed, skipping the numpy path')
+
+    for name, func in paths[1:]:
+        result = func(*columns)
+        got = [list(map(int, column)) for column in (result.total_bundles, result.charged_portions,
+                                                      result.catering_cost)]
+        if got != [list(column) for column in expected]:
+            raise SystemExit(f'{name} results differ from calculate_catering_cost')
+
+    print(f"{'path':>8} {'rows/s':>14} {'ms/call':>10} {'speedup':>8}")
+    baseline = None
+    for name, func in paths:
+        result = bench(name, func, columns, args.seconds)
+        baseline = baseline or result['rows_per_second']
+        print(f"{name:>8} {result['rows_per_second']:>14,.0f} "
+              f"{1000 * args.rows / result['rows_per_second']:>10.1f} "
+              f"{result['rows_per_second'] / baseline:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
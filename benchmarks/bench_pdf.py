@@ -0,0 +1,74 @@
+"""
+Measure create_pdf_summary throughput for customers of different history sizes
+
+Run from the repository root:
+
+    python -m benchmarks.bench_pdf [--seconds 3]
+"""
+import argparse
+import time
+from datetime import date, timedelta
+from app.utils.helpers import build_summary
+from app.utils.pdf import create_pdf_summary
+from app.utils.readmodels import CustomerRow, KasbonRow, OrderRow, PaymentRow
+
+ORDER_ROWS = (30, 365, 3000)
+
+
+def make_summary(order_rows: int) -> dict:
+    """Build an in-memory summary shaped like get_customer_summary's result"""
+    customer = CustomerRow(id=1, name='Customer Benchmark', price_per_bundle=25000, portions_per_bundle=3)
+    start = date(2020, 1, 1)
+    orders = [
+        OrderRow(date=start + timedelta(days=i), morning_portions=2, afternoon_portions=3,
+                 evening_portions=1, total_portions=6)
+        for i in range(order_rows)
+    ]
+    kasbons = [
+        KasbonRow(date=start + timedelta(days=i), item_name='Kopi susu', quantity=2,
+                  unit_price=5000, total_amount=10000)
+        for i in range(0, order_rows, 7)
+    ]
+    payments = [
+        PaymentRow(date=start + timedelta(days=i), amount=150000, description='Transfer')
+        for i in range(0, order_rows, 30)
+    ]
+    summary = build_summary(
+        customer,
+        sum(o.total_portions for o in orders),
+        sum(k.total_amount for k in kasbons),
+        sum(p.amount for p in payments),
+    )
+    summary.update(orders=orders, kasbons=kasbons, payments=payments)
+    return summary
+
+
+def bench(order_rows: int, seconds: float) -> dict:
+    summary = make_summary(order_rows)
+    create_pdf_summary(summary)  # warm-up
+
+    rendered = 0
+    size = 0
+    started = time.perf_counter()
+    while time.perf_counter() - started < seconds:
+        size = len(create_pdf_summary(summary).getvalue())
+        rendered += 1
+    elapsed = time.perf_counter() - started
+    return {'order_rows': order_rows, 'pdfs': rendered, 'seconds': elapsed,
+            'pdfs_per_second': rendered / elapsed, 'pdf_bytes': size}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--seconds', type=float, default=3.0, help='time budget per history size')
+    args = parser.parse_args()
+
+    print(f"{'rows':>6} {'pdfs/s':>10} {'ms/pdf':>10} {'size':>10}")
+    for rows in ORDER_ROWS:
+        result = bench(rows, args.seconds)
+        print(f"{rows:>6} {result['pdfs_per_second']:>10.2f} "
+              f"{1000 / result['pdfs_per_second']:>10.1f} {result['pdf_bytes']:>10}")
+
+
+if __name__ == '__main__':
+    main()
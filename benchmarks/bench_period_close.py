@@ -0,0 +1,90 @@
+"""
+Customer summaries before and after closing old periods
+
+A long history is generated, a sample of full customer summaries (totals
+plus the order, kasbon and payment lists) is timed, then every month up to
+three months ago is closed into the archive tables and the same summaries
+are timed again. Remaining balances must not change across the close.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_period_close [--customers 300] [--days 730] [--sample 100]
+"""
+import argparse
+import os
+import tempfile
+import time
+from datetime import date, timedelta
+
+from benchmarks.data import generate, make_app
+
+
+def month_end_before(day: date, months: int) -> date:
+    """Last day of the month ``months`` months before ``day``'s month"""
+    first = day.replace(day=1)
+    for _ in range(months - 1):
+        first = (first - timedelta(days=1)).replace(day=1)
+    return first - timedelta(days=1)
+
+
+def _time_summaries(customer_ids: list) -> tuple:
+    from app.utils.helpers import get_customer_summary
+
+    balances = {}
+    rows = 0
+    started = time.perf_counter()
+    for customer_id in customer_ids:
+        summary = get_customer_summary(customer_id)
+        balances[customer_id] = summary['remaining_balance']
+        rows += len(summary['orders']) + len(summary['kasbons']) + len(summary['payments'])
+    return time.perf_counter() - started, rows, balances
+
+
+def bench(customers: int, days: int, sample: int) -> dict:
+    from app.models import db, DailyOrder
+    from app.utils.periods import close_period
+
+    with tempfile.TemporaryDirectory() as tmp:
+        app = make_app(f"sqlite:///{os.path.join(tmp, 'periods.db')}")
+        with app.app_context():
+            generate(customers, days)
+            customer_ids = list(range(1, min(sample, customers) + 1))
+            live_before = db.session.query(DailyOrder).count()
+            open_seconds, open_rows, open_balances = _time_summaries(customer_ids)
+
+            through = month_end_before(date.today(), 3)
+            started = time.perf_counter()
+            archived = close_period(through)
+            close_seconds = time.perf_counter() - started
+
+            live_after = db.session.query(DailyOrder).count()
+            closed_seconds, closed_rows, closed_balances = _time_summaries(customer_ids)
+            mismatches = sum(open_balances[i] != closed_balances[i] for i in customer_ids)
+            db.engine.dispose()
+
+    return {'through': through, 'close_seconds': close_seconds, 'archived': archived,
+            'live_before': live_before, 'live_after': live_after, 'sample': len(customer_ids),
+            'open_seconds': open_seconds, 'open_rows': open_rows,
+            'closed_seconds': closed_seconds, 'closed_rows': closed_rows, 'mismatches': mismatches}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--customers', type=int, default=300)
+    parser.add_argument('--days', type=int, default=730, help='days of history per customer')
+    parser.add_argument('--sample', type=int, default=100, help='customers whose summaries are timed')
+    args = parser.parse_args()
+
+    result = bench(args.customers, args.days, args.sample)
+    print(f"closed through {result['through']} in {result['close_seconds']:.2f} s: "
+          f"{result['live_before']} -> {result['live_after']} live order rows")
+    print(f"{'history':<10} {'ms/summary':>12} {'rows/summary':>14}")
+    for label in ('open', 'closed'):
+        print(f"{label:<10} {result[f'{label}_seconds'] * 1000 / result['sample']:>12.2f} "
+              f"{result[f'{label}_rows'] // result['sample']:>14}")
+    print(f"speedup {result['open_seconds'] / result['closed_seconds']:.1f}x, "
+          f"{result['mismatches']} balance mismatches in {result['sample']} customers")
+
+
+if __name__ == '__main__':
+    main()
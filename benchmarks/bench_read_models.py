@@ -0,0 +1,102 @@
+"""
+Memory and time of a customer summary's rows as read models against ORM instances
+
+get_customer_summary() loads the order, kasbon and payment rows as named
+tuples (app.utils.readmodels). The ORM path it replaced loaded whole
+DailyOrder/Kasbon/Payment instances. Both are measured for customers of
+growing history: load time, and memory held by the rows and at peak
+(tracemalloc).
+
+Run from the repository root:
+
+    python -m benchmarks.bench_read_models [--repeat 5]
+"""
+import argparse
+import gc
+import os
+import tempfile
+import time
+import tracemalloc
+
+from sqlalchemy import select
+
+from benchmarks.data import generate, make_app
+
+# Days of history of each benchmarked customer
+HISTORY_DAYS = (365, 3650, 18250)
+
+
+def orm_summary(customer_id: int) -> dict:
+    """The ORM path: totals as usual, then whole ledger instances"""
+    from app.models import db
+    from app.utils.helpers import LEDGER_DETAILS, get_customer_summary
+
+    summary = get_customer_summary(customer_id, include_details=False)
+    for key, model in LEDGER_DETAILS:
+        summary[key] = db.session.scalars(
+            select(model).where(model.customer_id == customer_id).order_by(model.date, model.id)
+        ).all()
+    return summary
+
+
+def read_model_summary(customer_id: int) -> dict:
+    from app.utils.helpers import get_customer_summary
+
+    return get_customer_summary(customer_id)
+
+
+def _measure(load, customer_id: int, repeat: int) -> dict:
+    from app.models import db
+
+    seconds = []
+    for _ in range(repeat):
+        db.session.expunge_all()
+        started = time.perf_counter()
+        load(customer_id)
+        seconds.append(time.perf_counter() - started)
+
+    db.session.expunge_all()
+    gc.collect()
+    tracemalloc.start()
+    summary = load(customer_id)
+    held, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    rows = len(summary['orders']) + len(summary['kasbons']) + len(summary['payments'])
+    return {'rows': rows, 'seconds': min(seconds), 'held': held, 'peak': peak}
+
+
+def bench(repeat: int) -> list:
+    from app.models import db
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        app = make_app(f"sqlite:///{os.path.join(tmp, 'readmodels.db')}")
+        with app.app_context():
+            for customer_id, days in enumerate(HISTORY_DAYS, start=1):
+                generate(1, days, seed=customer_id)
+            for customer_id, days in enumerate(HISTORY_DAYS, start=1):
+                orm = _measure(orm_summary, customer_id, repeat)
+                read = _measure(read_model_summary, customer_id, repeat)
+                results.append({'days': days, 'orm': orm, 'read': read})
+            db.engine.dispose()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=5, help='timed loads per customer and path (best is kept)')
+    args = parser.parse_args()
+
+    print(f"{'days':>6} {'rows':>7} {'path':<6} {'ms':>9} {'held KiB':>10} {'peak KiB':>10} {'B/row':>7}")
+    for result in bench(args.repeat):
+        for path in ('orm', 'read'):
+            r = result[path]
+            print(f"{result['days']:>6} {r['rows']:>7} {path:<6} {r['seconds'] * 1000:>9.1f} "
+                  f"{r['held'] / 1024:>10.0f} {r['peak'] / 1024:>10.0f} {r['held'] / max(r['rows'], 1):>7.0f}")
+        orm, read = result['orm'], result['read']
+        print(f"{'':>6} {'':>7} {'gain':<6} {orm['seconds'] / read['seconds']:>8.1f}x "
+              f"{orm['held'] / read['held']:>9.1f}x {orm['peak'] / read['peak']:>9.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,108 @@
+"""
+Global search through the text search index against ILIKE scans
+
+A kasbon table of ``--kasbons`` rows is filled with item names drawn from
+a few thousand words, then every query term is searched twice: through
+this database's search index (FTS5 trigram on SQLite, pg_trgm on
+PostgreSQL) and with the unindexed LikeSearch. Both must return the same
+rows.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_search [--kasbons 1000000] [--repeat 20]
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+from datetime import date, timedelta
+
+from benchmarks.data import INSERT_BATCH, make_app
+
+SYLLABLES = ('ba', 'ko', 'pi', 'su', 'ma', 'nis', 'te', 'ga', 'ren', 'lo', 'tak', 'ru', 'jo', 'si', 'mie', 'dang')
+LIMIT = 10
+
+
+def _words(rnd, count: int) -> list:
+    words = set()
+    while len(words) < count:
+        words.add(''.join(rnd.choice(SYLLABLES) for _ in range(rnd.randint(2, 4))))
+    return sorted(words)
+
+
+def fill(kasbons: int, customers: int, seed: int = 0) -> list:
+    """Insert customers and ``kasbons`` rows, returning query terms from common to absent"""
+    from app.models import db, Customer, Kasbon
+
+    rnd = random.Random(seed)
+    words = _words(rnd, 3000)
+    connection = db.session.connection()
+    connection.execute(Customer.__table__.insert(),
+                       [{'name': f'Pelanggan {i:05d}'} for i in range(1, customers + 1)])
+    today = date.today()
+    first_name = None
+    for start in range(0, kasbons, INSERT_BATCH):
+        connection.execute(Kasbon.__table__.insert(), [
+            {'date': today - timedelta(days=rnd.randrange(365)), 'customer_id': rnd.randint(1, customers),
+             'item_name': f'{rnd.choice(words).capitalize()} {rnd.choice(words)}', 'quantity': 1,
+             'unit_price': 1000, 'total_amount': 1000}
+            for _ in range(min(INSERT_BATCH, kasbons - start))
+        ])
+        first_name = first_name or db.session.scalar(db.select(Kasbon.item_name).order_by(Kasbon.id).limit(1))
+    db.session.commit()
+    return ['ko', 'kopi', words[len(words) // 2], first_name, 'qqqzzz']
+
+
+def _time(run, repeat: int) -> tuple:
+    result = run()
+    started = time.perf_counter()
+    for _ in range(repeat):
+        run()
+    return (time.perf_counter() - started) / repeat, result
+
+
+def bench(kasbons: int, customers: int, repeat: int) -> list:
+    from app.models import db, Kasbon
+    from app.utils.search import LikeSearch, search_backend
+
+    with tempfile.TemporaryDirectory() as tmp:
+        app = make_app(f"sqlite:///{os.path.join(tmp, 'search.db')}")
+        results = []
+        with app.app_context():
+            terms = fill(kasbons, customers)
+            indexed = search_backend(db.engine.dialect)
+            scan = LikeSearch()
+            for term in terms:
+                def lookup(backend):
+                    return lambda: db.session.scalars(backend.matching_ids(Kasbon, term, LIMIT)).all()
+
+                def count():
+                    return db.session.scalar(db.select(db.func.count()).where(indexed.condition(Kasbon, term)))
+
+                index_seconds, index_ids = _time(lookup(indexed), repeat)
+                scan_seconds, scan_ids = _time(lookup(scan), max(repeat // 10, 1))
+                results.append({'term': term, 'matches': count(), 'backend': indexed.name,
+                                'index_seconds': index_seconds, 'scan_seconds': scan_seconds,
+                                'same': index_ids == scan_ids})
+            db.engine.dispose()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--kasbons', type=int, default=1_000_000)
+    parser.add_argument('--customers', type=int, default=5000)
+    parser.add_argument('--repeat', type=int, default=20, help='timed lookups per term')
+    args = parser.parse_args()
+
+    results = bench(args.kasbons, args.customers, args.repeat)
+    print(f"{args.kasbons} kasbon rows, first {LIMIT} matches, {results[0]['backend']} index vs ILIKE scan")
+    print(f"{'term':<22} {'matches':>9} {'index ms':>10} {'scan ms':>10} {'same':>6}")
+    for result in results:
+        print(f"{result['term']:<22} {result['matches']:>9} {result['index_seconds'] * 1000:>10.2f} "
+              f"{result['scan_seconds'] * 1000:>10.2f} {str(result['same']):>6}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,157 @@
+"""
+Concurrent ledger writers and readers against one SQLite file
+
+Each process plays one counter: it records kasbon entries (updating
+customer_balances and the rollups in the same transaction, as the app does)
+and reads customer summaries in between. One more process keeps streaming
+the kasbon CSV export to a slow client, holding a read transaction open the
+whole time. The run is repeated with SQLite's defaults and with the
+configured SQLITE_PRAGMAS; writes failing with "database is locked" are
+counted.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_sqlite_writes [--seconds 10] [--processes 8]
+"""
+import argparse
+import multiprocessing
+import os
+import random
+import tempfile
+import time
+from datetime import date, timedelta
+
+from sqlalchemy.exc import OperationalError
+
+from app.config import Config
+from benchmarks.data import make_app
+
+CUSTOMERS = 50
+SEED_KASBONS = 20_000
+# The export client reads this many rows, then stalls this long
+EXPORT_CHUNK_ROWS = 500
+EXPORT_STALL = 0.25
+PROFILES = {
+    'default': {},
+    'tuned': Config.SQLITE_PRAGMAS,
+}
+
+
+def seed(database_url: str, pragmas: dict):
+    from app.models import db, Customer, Kasbon
+    from app.utils.balances import rebuild_balances
+
+    app = make_app(database_url, SQLITE_PRAGMAS=pragmas)
+    rnd = random.Random(0)
+    with app.app_context():
+        db.session.add_all(
+            Customer(name=f'Customer {i}', price_per_bundle=25000, portions_per_bundle=3) for i in range(CUSTOMERS)
+        )
+        db.session.flush()
+        db.session.execute(Kasbon.__table__.insert(), [
+            {'date': date.today() - timedelta(days=rnd.randrange(365)), 'customer_id': rnd.randint(1, CUSTOMERS),
+             'item_name': 'Kopi susu', 'quantity': 2, 'unit_price': 5000, 'total_amount': 10000}
+            for _ in range(SEED_KASBONS)
+        ])
+        db.session.commit()
+        rebuild_balances()
+        db.engine.dispose()
+
+
+def exporter(database_url: str, pragmas: dict, seconds: float):
+    """Stream the kasbon export over and over, stalling like a slow download"""
+    from app.models import db
+    from app.utils.exports import export_rows
+
+    app = make_app(database_url, SQLITE_PRAGMAS=pragmas)
+    with app.app_context():
+        stop = time.perf_counter() + seconds
+        while time.perf_counter() < stop:
+            _, rows = export_rows('kasbons')
+            for i, _ in enumerate(rows, 1):
+                if i % EXPORT_CHUNK_ROWS == 0:
+                    time.sleep(EXPORT_STALL)
+                    if time.perf_counter() >= stop:
+                        break
+            db.session.rollback()
+        db.engine.dispose()
+
+
+def counter(worker: int, database_url: str, pragmas: dict, seconds: float, results):
+    from app.models import db, Kasbon
+    from app.utils.helpers import get_customer_summary
+
+    app = make_app(database_url, SQLITE_PRAGMAS=pragmas)
+    rnd = random.Random(worker)
+    writes = reads = locked = 0
+    latencies = []
+    with app.app_context():
+        stop = time.perf_counter() + seconds
+        while time.perf_counter() < stop:
+            customer_id = rnd.randint(1, CUSTOMERS)
+            get_customer_summary(customer_id, include_details=False)
+            reads += 1
+
+            started = time.perf_counter()
+            try:
+                db.session.add(Kasbon(date=date.today() - timedelta(days=rnd.randrange(60)), customer_id=customer_id,
+                                      item_name='Es teh', quantity=1, unit_price=4000, total_amount=4000))
+                db.session.commit()
+                writes += 1
+                latencies.append(time.perf_counter() - started)
+            except OperationalError as e:
+                db.session.rollback()
+                if 'locked' not in str(e):
+                    raise
+                locked += 1
+        db.engine.dispose()
+    results.put((writes, reads, locked, latencies))
+
+
+def bench(profile: str, processes: int, seconds: float) -> dict:
+    pragmas = PROFILES[profile]
+    with tempfile.TemporaryDirectory() as tmp:
+        database_url = f'sqlite:///{os.path.join(tmp, "bench.db")}'
+        seed(database_url, pragmas)
+
+        results = multiprocessing.Queue()
+        workers = [
+            multiprocessing.Process(target=counter, args=(i, database_url, pragmas, seconds, results))
+            for i in range(processes)
+        ]
+        export_worker = multiprocessing.Process(target=exporter, args=(database_url, pragmas, seconds))
+        export_worker.start()
+        for worker in workers:
+            worker.start()
+        totals = [results.get() for _ in workers]
+        for worker in workers:
+            worker.join()
+        export_worker.join()
+
+    latencies = sorted(latency for *_, worker_latencies in totals for latency in worker_latencies)
+    writes = sum(t[0] for t in totals)
+    return {
+        'profile': profile,
+        'writes_per_second': writes / seconds,
+        'reads_per_second': sum(t[1] for t in totals) / seconds,
+        'locked_errors': sum(t[2] for t in totals),
+        'p95_write_ms': 1000 * latencies[int(len(latencies) * 0.95) - 1] if latencies else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--seconds', type=float, default=10.0, help='run time per profile')
+    parser.add_argument('--processes', type=int, default=8, help='concurrent counters')
+    args = parser.parse_args()
+
+    print(f"{'profile':>8} {'writes/s':>10} {'reads/s':>10} {'p95 write ms':>13} {'locked':>7}")
+    for profile in PROFILES:
+        result = bench(profile, args.processes, args.seconds)
+        p95 = f"{result['p95_write_ms']:.1f}" if result['p95_write_ms'] is not None else '-'
+        print(f"{profile:>8} {result['writes_per_second']:>10.1f} {result['reads_per_second']:>10.1f} "
+              f"{p95:>13} {result['locked_errors']:>7}")
+
+
+if __name__ == '__main__':
+    main()
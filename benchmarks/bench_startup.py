@@ -0,0 +1,90 @@
+"""
+Cold-start time of create_app() and the modules it imports
+
+Every run is a fresh interpreter that imports the app package and calls
+create_app(), so nothing is cached in sys.modules. One extra run with
+``python -X importtime`` breaks the import time down by top-level package.
+Exits with status 1 when a module that must stay lazy (reportlab,
+pydantic) gets imported at startup, or when the median cold start is
+above ``--max-ms``.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_startup [--runs 10] [--top 10] [--max-ms 1500]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+
+# Only needed by one view or command each, imported on first use
+LAZY_MODULES = ('reportlab', 'pydantic')
+
+STARTUP_SCRIPT = '''
+import time
+started = time.perf_counter()
+from app import create_app
+create_app()
+print((time.perf_counter() - started) * 1000)
+'''
+
+
+def run_startup(importtime: bool = False) -> subprocess.CompletedProcess:
+    command = [sys.executable, *(['-X', 'importtime'] if importtime else []), '-c', STARTUP_SCRIPT]
+    # In-memory database: create_app() doesn't connect, but shouldn't touch app.db either
+    env = dict(os.environ, DATABASE_URL='sqlite://')
+    return subprocess.run(command, capture_output=True, text=True, check=True, env=env)
+
+
+def import_times(stderr: str) -> dict:
+    """Import time in ms per top-level package from -X importtime output, summing each module's self time"""
+    packages = defaultdict(float)
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        self_us, _, name = line[len('import time:'):].split('|')
+        packages[name.strip().split('.')[0]] += int(self_us) / 1000
+    return dict(packages)
+
+
+def bench(runs: int) -> dict:
+    run_startup()  # warm the OS file cache and __pycache__
+    startup_ms = [float(run_startup().stdout.strip().splitlines()[-1]) for _ in range(runs)]
+    imports = import_times(run_startup(importtime=True).stderr)
+    return {
+        'median_ms': statistics.median(startup_ms),
+        'min_ms': min(startup_ms),
+        'max_ms': max(startup_ms),
+        'imports': imports,
+        'lazy_violations': sorted(name for name in LAZY_MODULES if name in imports),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--runs', type=int, default=10, help='fresh interpreters to time')
+    parser.add_argument('--top', type=int, default=10, help='heaviest packages to list')
+    parser.add_argument('--max-ms', type=float, help='fail when the median cold start is slower')
+    args = parser.parse_args()
+
+    result = bench(args.runs)
+    print(f"create_app() cold start: median {result['median_ms']:.1f} ms "
+          f"(min {result['min_ms']:.1f}, max {result['max_ms']:.1f}) over {args.runs} runs")
+    print(f"\n{'package':<24} {'import ms':>10}")
+    for name, ms in sorted(result['imports'].items(), key=lambda item: -item[1])[:args.top]:
+        print(f"{name:<24} {ms:>10.1f}")
+
+    failed = False
+    if result['lazy_violations']:
+        print(f"\nFAIL: imported at startup: {', '.join(result['lazy_violations'])}")
+        failed = True
+    if args.max_ms is not None and result['median_ms'] > args.max_ms:
+        print(f"\nFAIL: median cold start {result['median_ms']:.1f} ms is above {args.max_ms:.1f} ms")
+        failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+"""
+Synthetic warung data for the benchmarks
+
+generate() fills the current app's database with ``customers`` x ``days``
+of orders plus kasbon and payments, using bulk Core inserts, then rebuilds
+customer_balances and the rollups so every read path sees consistent data.
+"""
+import random
+from datetime import date, timedelta
+
+from app.config import Config
+
+INSERT_BATCH = 10_000
+ITEMS = (('Kopi susu', 5000), ('Es teh', 4000), ('Rokok', 2000), ('Gorengan', 1000), ('Nasi bungkus', 12000))
+PRICING = ((8500, 1), (25000, 3), (40000, 5))
+
+
+def make_app(database_url: str, **config):
+    """Application on ``database_url`` with its schema created"""
+    from app import create_app
+    from app.models import db
+
+    bench_config = type('BenchConfig', (Config,), {'SQLALCHEMY_DATABASE_URI': database_url, **config})
+    app = create_app(bench_config)
+    with app.app_context():
+        db.create_all()
+    return app
+
+
+def _insert(connection, table, rows):
+    for start in range(0, len(rows), INSERT_BATCH):
+        connection.execute(table.insert(), rows[start:start + INSERT_BATCH])
+
+
+def generate(customers: int, days: int, seed: int = 0, end: date = None) -> dict:
+    """
+    Fill the database of the current app context with synthetic history
+
+    Each customer orders on most days up to ``end`` (today by default),
+    takes kasbon about twice a week and pays about every two weeks.
+
+    Returns:
+        dict: row counts per table
+    """
+    from app.models import db, Customer, DailyOrder, Kasbon, Payment
+    from app.utils.balances import rebuild_balances
+    from app.utils.rollups import rebuild_rollups
+
+    rnd = random.Random(seed)
+    end = end or date.today()
+    first_id = (db.session.scalar(db.select(db.func.max(Customer.id))) or 0) + 1
+    connection = db.session.connection()
+
+    customer_rows = []
+    for i in range(customers):
+        price, per_bundle = rnd.choice(PRICING)
+        customer_rows.append({'name': f'Pelanggan {first_id + i:05d}', 'price_per_bundle': price,
+                              'portions_per_bundle': per_bundle})
+    _insert(connection, Customer.__table__, customer_rows)
+
+    orders, kasbons, payments = [], [], []
+    for customer_id in range(first_id, first_id + customers):
+        for offset in range(days):
+            day = end - timedelta(days=offset)
+            if rnd.random() < 0.8:
+                portions = [rnd.randint(0, 3) for _ in range(3)]
+                orders.append({'date': day, 'customer_id': customer_id, 'morning_portions': portions[0],
+                               'afternoon_portions': portions[1], 'evening_portions': portions[2],
+                               'total_portions': sum(portions)})
+            if rnd.random() < 0.3:
+                item, unit_price = rnd.choice(ITEMS)
+                quantity = rnd.randint(1, 3)
+                kasbons.append({'date': day, 'customer_id': customer_id, 'item_name': item, 'quantity': quantity,
+                                'unit_price': unit_price, 'total_amount': quantity * unit_price})
+            if rnd.random() < 0.07:
+                payments.append({'date': day, 'customer_id': customer_id, 'amount': rnd.randrange(5, 50) * 10000,
+                                 'description': rnd.choice(('Tunai', 'Transfer', 'QRIS'))})
+    _insert(connection, DailyOrder.__table__, orders)
+    _insert(connection, Kasbon.__table__, kasbons)
+    _insert(connection, Payment.__table__, payments)
+    db.session.commit()
+
+    rebuild_balances()
+    rebuild_rollups()
+    return {'customers': customers, 'orders': len(orders), 'kasbons': len(kasbons), 'payments': len(payments)}
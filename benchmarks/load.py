@@ -0,0 +1,79 @@
+"""
+Flask test-client load driver
+
+run_load() keeps ``concurrency`` threads, each with its own test client,
+sending requests for a fixed time and reports latency percentiles and
+throughput. Requests come from a callable so every client can vary ids and
+date ranges.
+"""
+import random
+import threading
+import time
+from typing import Callable, Optional, Tuple
+
+# (method, path, JSON body or None)
+RequestSpec = Tuple[str, str, Optional[dict]]
+
+
+def percentile(sorted_values: list, fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    index = max(0, min(len(sorted_values) - 1, int(round(fraction * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+def summarize(latencies: list, elapsed: float, errors: int = 0) -> dict:
+    """Throughput and p50/p95/p99 (milliseconds) of a run"""
+    latencies = sorted(latencies)
+    return {
+        'requests': len(latencies),
+        'errors': errors,
+        'seconds': round(elapsed, 3),
+        'requests_per_second': round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+        'p50_ms': round(1000 * percentile(latencies, 0.50), 3),
+        'p95_ms': round(1000 * percentile(latencies, 0.95), 3),
+        'p99_ms': round(1000 * percentile(latencies, 0.99), 3),
+    }
+
+
+def run_load(app, make_request: Callable[[random.Random], RequestSpec], seconds: float,
+             concurrency: int = 4, seed: int = 0) -> dict:
+    """Drive ``app`` with requests from ``make_request`` for ``seconds``"""
+    latencies = []
+    errors = []
+    stop = time.perf_counter() + seconds
+
+    def client(worker: int):
+        rnd = random.Random(seed + worker)
+        test_client = app.test_client()
+        while time.perf_counter() < stop:
+            method, path, body = make_request(rnd)
+            started = time.perf_counter()
+            response = test_client.open(path, method=method, json=body)
+            response.get_data()
+            latencies.append(time.perf_counter() - started)
+            if response.status_code >= 400:
+                errors.append(response.status_code)
+            response.close()
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(concurrency)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return summarize(latencies, time.perf_counter() - started, len(errors))
+
+
+def time_calls(func: Callable[[random.Random], object], seconds: float, seed: int = 0) -> dict:
+    """Call ``func`` back to back for ``seconds`` and summarize it like a load run"""
+    rnd = random.Random(seed)
+    latencies = []
+    stop = time.perf_counter() + seconds
+    started = time.perf_counter()
+    while time.perf_counter() < stop:
+        call_started = time.perf_counter()
+        func(rnd)
+        latencies.append(time.perf_counter() - call_started)
+    return summarize(latencies, time.perf_counter() - started)
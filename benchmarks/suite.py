@@ -0,0 +1,173 @@
+"""
+Benchmark suite for the read paths at several data scales
+
+For each scale (customers x days) a fresh SQLite database is generated,
+then get_customer_summary and create_pdf_summary are timed directly and the
+dashboard, list pages, summary page and API endpoints are driven through
+the Flask test client. The dashboard is measured twice: as served from its
+block cache, and with the cache dropped before every request. Results are
+written as JSON tagged with the git commit so runs can be compared.
+
+Run from the repository root:
+
+    python -m benchmarks.suite [--scales 50x30,500x90] [--seconds 2] [--output FILE]
+    python -m benchmarks.suite --compare BASE.json NEW.json [--threshold 0.10]
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+from datetime import datetime
+
+from benchmarks.data import generate, make_app
+from benchmarks.load import run_load, time_calls
+
+DEFAULT_SCALES = '50x30,500x90,2000x180'
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), 'results')
+
+
+def routes(customers: int) -> dict:
+    """Request generators keyed by endpoint"""
+    from app.utils.dashboard import invalidate_dashboard
+
+    def customer_id(rnd):
+        return rnd.randint(1, customers)
+
+    def cold_index(rnd):
+        # Every dashboard block is reloaded, as after writes to all ledgers
+        invalidate_dashboard()
+        return ('GET', '/', None)
+
+    return {
+        'main.index': lambda rnd: ('GET', '/', None),
+        'main.index (cold cache)': cold_index,
+        'main.customer_summary': lambda rnd: ('GET', f'/summary/{customer_id(rnd)}', None),
+        'customers.list_customers': lambda rnd: ('GET', '/customers/', None),
+        'orders.list_orders': lambda rnd: ('GET', '/orders/', None),
+        'kasbons.list_kasbons': lambda rnd: ('GET', '/kasbons/', None),
+        'payments.list_payments': lambda rnd: ('GET', '/payments/', None),
+        'api.api_customer_summary': lambda rnd: ('GET', f'/api/customer_summary/{customer_id(rnd)}', None),
+        'api.api_customer_summaries': lambda rnd: (
+            'POST', '/api/customer_summaries',
+            {'customer_ids': rnd.sample(range(1, customers + 1), min(50, customers))},
+        ),
+        'api.api_pricing_info': lambda rnd: ('GET', f'/api/pricing_info/{customer_id(rnd)}', None),
+        'api.api_cost_breakdown': lambda rnd: (
+            'GET', f'/api/cost_breakdown/{customer_id(rnd)}?portions={rnd.randint(0, 500)}', None,
+        ),
+    }
+
+
+def bench_scale(customers: int, days: int, seconds: float, concurrency: int) -> list:
+    from app.utils.helpers import get_customer_summary
+    from app.utils.pdf import create_pdf_summary
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        app = make_app(f'sqlite:///{os.path.join(tmp, "bench.db")}', WTF_CSRF_ENABLED=False)
+        with app.app_context():
+            counts = generate(customers, days)
+            print(f'{customers}x{days}: ' + ', '.join(f'{count} {name}' for name, count in counts.items()),
+                  file=sys.stderr)
+
+            results.append(('function', 'get_customer_summary', time_calls(
+                lambda rnd: get_customer_summary(rnd.randint(1, customers)), seconds,
+            )))
+            summary = get_customer_summary(1)
+            results.append(('function', 'create_pdf_summary', time_calls(
+                lambda rnd: create_pdf_summary(summary), seconds,
+            )))
+
+        for endpoint, make_request in routes(customers).items():
+            run_load(app, make_request, min(seconds, 0.5), concurrency)  # warm-up
+            results.append(('route', endpoint, run_load(app, make_request, seconds, concurrency)))
+
+        with app.app_context():
+            from app.extensions import db
+            db.engine.dispose()
+
+    return [{'scale': f'{customers}x{days}', 'kind': kind, 'name': name, **stats} for kind, name, stats in results]
+
+
+def git_revision() -> dict:
+    def git(*args):
+        return subprocess.run(['git', *args], capture_output=True, text=True).stdout.strip()
+
+    return {'commit': git('rev-parse', '--short', 'HEAD') or None,
+            'dirty': bool(git('status', '--porcelain', '--untracked-files=no'))}
+
+
+def run(args) -> dict:
+    scales = [tuple(int(n) for n in scale.split('x')) for scale in args.scales.split(',')]
+    report = {
+        **git_revision(),
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'settings': {'seconds': args.seconds, 'concurrency': args.concurrency, 'scales': args.scales},
+        'results': [],
+    }
+
+    print(f"{'scale':>10} {'name':<28} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'err':>4}")
+    for customers, days in scales:
+        for result in bench_scale(customers, days, args.seconds, args.concurrency):
+            report['results'].append(result)
+            print(f"{result['scale']:>10} {result['name']:<28} {result['requests_per_second']:>9.1f} "
+                  f"{result['p50_ms']:>9.2f} {result['p95_ms']:>9.2f} {result['p99_ms']:>9.2f} "
+                  f"{result['errors']:>4}")
+
+    output = args.output
+    if output is None:
+        suffix = '-dirty' if report['dirty'] else ''
+        output = os.path.join(RESULTS_DIR, f"{report['commit'] or 'results'}{suffix}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f'Results written to {output}', file=sys.stderr)
+    return report
+
+
+def compare(base_path: str, new_path: str, threshold: float) -> int:
+    """Print p95 and throughput changes between two result files; returns the number of regressions"""
+    with open(base_path) as f:
+        base = json.load(f)
+    with open(new_path) as f:
+        new = json.load(f)
+    base_results = {(r['scale'], r['name']): r for r in base['results']}
+
+    regressions = 0
+    print(f"{base.get('commit')} -> {new.get('commit')}")
+    print(f"{'scale':>10} {'name':<28} {'p95 ms':>18} {'change':>8} {'req/s change':>13}")
+    for result in new['results']:
+        before = base_results.get((result['scale'], result['name']))
+        if before is None or not before['p95_ms'] or not before['requests_per_second']:
+            continue
+        p95_change = result['p95_ms'] / before['p95_ms'] - 1
+        rps_change = result['requests_per_second'] / before['requests_per_second'] - 1
+        regressed = p95_change > threshold
+        regressions += regressed
+        print(f"{result['scale']:>10} {result['name']:<28} "
+              f"{before['p95_ms']:>8.2f} -> {result['p95_ms']:<8.2f}{p95_change:>+8.1%} {rps_change:>+13.1%}"
+              f"{'  REGRESSION' if regressed else ''}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--scales', default=DEFAULT_SCALES, help='comma separated CUSTOMERSxDAYS')
+    parser.add_argument('--seconds', type=float, default=2.0, help='time budget per benchmark')
+    parser.add_argument('--concurrency', type=int, default=4, help='test clients per route')
+    parser.add_argument('--output', help='results file (default: benchmarks/results/<commit>.json)')
+    parser.add_argument('--compare', nargs=2, metavar=('BASE', 'NEW'), help='compare two results files')
+    parser.add_argument('--threshold', type=float, default=0.10, help='p95 increase reported as a regression')
+    args = parser.parse_args()
+
+    if args.compare:
+        sys.exit(1 if compare(*args.compare, args.threshold) else 0)
+    run(args)
+
+
+if __name__ == '__main__':
+    main()
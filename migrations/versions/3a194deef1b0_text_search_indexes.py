@@ -0,0 +1,60 @@
+"""text search indexes
+
+Revision ID: 3a194deef1b0
+Revises: 3b608e2dd85a
+Create Date: 2026-10-18 13:05:12.402117
+
+"""
+import sqlite3
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '3a194deef1b0'
+down_revision = '3b608e2dd85a'
+branch_labels = None
+depends_on = None
+
+# (table, searched column), as in app.utils.search.SEARCHABLE
+SEARCHABLE = (
+    ('customers', 'name'),
+    ('kasbons', 'item_name'),
+    ('payments', 'description'),
+)
+
+
+def _sqlite_trigram():
+    return op.get_bind().dialect.name == 'sqlite' and sqlite3.sqlite_version_info >= (3, 34, 0)
+
+
+def upgrade():
+    dialect = op.get_bind().dialect.name
+    if dialect == 'postgresql':
+        op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+        for table, column in SEARCHABLE:
+            op.execute(f'CREATE INDEX ix_{table}_{column}_trgm ON {table} USING gin ({column} gin_trgm_ops)')
+    elif _sqlite_trigram():
+        for table, column in SEARCHABLE:
+            index = f'{table}_search'
+            delete = f"INSERT INTO {index}({index}, rowid, {column}) VALUES ('delete', old.id, old.{column});"
+            insert = f'INSERT INTO {index}(rowid, {column}) VALUES (new.id, new.{column});'
+            op.execute(f"CREATE VIRTUAL TABLE {index} USING fts5("
+                       f"{column}, content='{table}', content_rowid='id', tokenize='trigram')")
+            op.execute(f'CREATE TRIGGER {index}_insert AFTER INSERT ON {table} BEGIN {insert} END')
+            op.execute(f'CREATE TRIGGER {index}_delete AFTER DELETE ON {table} BEGIN {delete} END')
+            op.execute(f'CREATE TRIGGER {index}_update AFTER UPDATE OF {column} ON {table} BEGIN {delete} {insert} END')
+            op.execute(f"INSERT INTO {index}({index}) VALUES ('rebuild')")
+
+
+def downgrade():
+    dialect = op.get_bind().dialect.name
+    if dialect == 'postgresql':
+        for table, column in SEARCHABLE:
+            op.execute(f'DROP INDEX IF EXISTS ix_{table}_{column}_trgm')
+    elif dialect == 'sqlite':
+        for table, column in SEARCHABLE:
+            index = f'{table}_search'
+            for action in ('insert', 'delete', 'update'):
+                op.execute(f'DROP TRIGGER IF EXISTS {index}_{action}')
+            op.execute(f'DROP TABLE IF EXISTS {index}')
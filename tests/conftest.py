@@ -0,0 +1,75 @@
+import os
+
+import pytest
+from sqlalchemy import event
+
+from app import create_app
+from app.config import TestingConfig
+from app.extensions import cache
+from app.models import db
+from app.utils.customers import customer_choices
+from app.utils.helpers import pdf_cache
+from benchmarks.data import generate
+
+
+def _clear_process_caches():
+    # Module-level caches keyed by customer id would otherwise carry over
+    # from the previous test's database
+    cache.clear()
+    customer_choices.invalidate()
+    pdf_cache.clear()
+
+
+@pytest.fixture
+def app(tmp_path):
+    """
+    Application with the schema created, inside an app context
+
+    Runs on a throwaway SQLite file, or on TEST_DATABASE_URL when set (an
+    empty PostgreSQL database: every table is dropped afterwards).
+    """
+    database_url = os.environ.get('TEST_DATABASE_URL') or f"sqlite:///{tmp_path / 'test.db'}"
+    config = type('Config', (TestingConfig,), {
+        'SQLALCHEMY_DATABASE_URI': database_url,
+        'WTF_CSRF_ENABLED': False,
+        'INSTRUMENTATION_ENABLED': False,
+    })
+    app = create_app(config)
+    _clear_process_caches()
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        if os.environ.get('TEST_DATABASE_URL'):
+            db.drop_all()
+        _clear_process_caches()
+        db.engine.dispose()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def ledger(app):
+    """A few months of synthetic orders, kasbon and payments for 20 customers"""
+    return generate(20, 120, seed=1)
+
+
+@pytest.fixture
+def statements(app):
+    """
+    SQL statements the engine runs during the test
+
+    A list of (statement, parameters) pairs, appended to by a
+    before_cursor_execute listener; clear() it to start counting afresh.
+    """
+    executed = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        executed.append((statement, parameters))
+
+    event.listen(db.engine, 'before_cursor_execute', record)
+    yield executed
+    event.remove(db.engine, 'before_cursor_execute', record)
@@ -0,0 +1,66 @@
+from datetime import date, timedelta
+
+from app.models import db, Customer, Kasbon
+from app.utils.aging import AGING_BUCKETS, _aging_row, _cutoffs, aging_report
+
+AS_OF = date(2026, 6, 30)
+BUCKETS = [key for key, _, _ in AGING_BUCKETS]
+
+
+def _row(kasbon: list, payments: int, portions: list = None, per_bundle: int = 1, price: int = 8500):
+    """
+    An aging_query row for a customer without a period close
+
+    ``kasbon`` and ``portions`` are the totals up to AS_OF, then before
+    each bucket cutoff, newest cutoff first.
+    """
+    portions = portions or [0] * len(kasbon)
+    return (1, 'Budi', price, per_bundle, None, None, None, *portions, *kasbon, payments)
+
+
+def _buckets(row) -> dict:
+    return {key: getattr(row, key) for key in BUCKETS}
+
+
+def test_partial_payment_settles_oldest_bucket_first():
+    # 10000 over 60 days old, 5000 between 8 and 30 days, 3000 this week
+    row = _aging_row(_row([18000, 15000, 10000, 10000], payments=12000), AS_OF, _cutoffs(AS_OF))
+
+    assert row.outstanding == 6000
+    assert _buckets(row) == {'days_0_7': 3000, 'days_8_30': 3000, 'days_31_60': 0, 'days_over_60': 0}
+
+
+def test_catering_is_aged_by_bundle():
+    # Bundles of 3 at 25000: 4 portions before the 60 day cutoff open two
+    # bundles there, 2 more portions this week fill the second one
+    row = _aging_row(_row([0] * 4, payments=0, portions=[6, 4, 4, 4], per_bundle=3, price=25000),
+                     AS_OF, _cutoffs(AS_OF))
+
+    assert row.catering_cost == 50000
+    assert _buckets(row) == {'days_0_7': 0, 'days_8_30': 0, 'days_31_60': 0, 'days_over_60': 50000}
+
+
+def test_overpayment_leaves_no_negative_bucket():
+    row = _aging_row(_row([18000, 15000, 10000, 10000], payments=25000), AS_OF, _cutoffs(AS_OF))
+
+    assert row.outstanding == -7000
+    assert _buckets(row) == dict.fromkeys(BUCKETS, 0)
+
+
+def test_kasbon_on_bucket_boundaries(app):
+    """A charge exactly as old as a bucket's limit still belongs to that bucket"""
+    customer = Customer(name='Budi')
+    db.session.add(customer)
+    db.session.flush()
+    ages = {7: 1, 8: 2, 30: 4, 31: 8, 60: 16, 61: 32}
+    db.session.add_all(
+        Kasbon(date=AS_OF - timedelta(days=age), customer_id=customer.id, item_name='Kopi', quantity=1,
+               unit_price=amount * 1000, total_amount=amount * 1000)
+        for age, amount in ages.items()
+    )
+    db.session.commit()
+
+    row, = aging_report(AS_OF)
+
+    assert row.outstanding == 63000
+    assert _buckets(row) == {'days_0_7': 1000, 'days_8_30': 6000, 'days_31_60': 24000, 'days_over_60': 32000}
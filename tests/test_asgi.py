@@ -0,0 +1,79 @@
+import asyncio
+import json
+
+import pytest
+
+pytest.importorskip('greenlet')
+httpx = pytest.importorskip('httpx')
+
+from app.asgi import AsgiApp
+from app.models import db
+from app.routes import api, main
+from app.utils.async_db import ASYNC_DRIVERS, AsyncDatabase
+
+
+@pytest.fixture
+def serve(app, ledger):
+    """
+    Run ``test(client)`` against the app's native ASGI views
+
+    The httpx client talks to AsgiApp in-process; everything runs in one
+    event loop so the async engine is disposed on the loop that opened it.
+    """
+    pytest.importorskip(ASYNC_DRIVERS[db.engine.url.get_backend_name()])
+    asgi_app = AsgiApp(app, {**main.async_views, **api.async_views}, AsyncDatabase(app))
+
+    def run(test):
+        async def session():
+            transport = httpx.ASGITransport(app=asgi_app)
+            try:
+                async with httpx.AsyncClient(transport=transport, base_url='http://localhost') as client:
+                    return await test(client)
+            finally:
+                await asgi_app.database.dispose()
+        return asyncio.run(session())
+
+    return run
+
+
+def test_summary_matches_wsgi(serve, client):
+    """The native summary view answers exactly like the Flask one"""
+    async def fetch(http):
+        return await http.get('/api/customer_summary/1', params={'start_date': '2020-01-01'})
+
+    response = serve(fetch)
+
+    assert response.status_code == 200
+    assert response.json() == client.get('/api/customer_summary/1?start_date=2020-01-01').get_json()
+
+
+def test_summary_revalidates_with_etag(serve):
+    async def fetch(http):
+        first = await http.get('/api/customer_summary/1')
+        second = await http.get('/api/customer_summary/1', headers={'If-None-Match': first.headers['ETag']})
+        return first, second
+
+    first, second = serve(fetch)
+
+    assert first.status_code == 200
+    assert second.status_code == 304
+    assert second.content == b''
+    assert second.headers['ETag'] == first.headers['ETag']
+
+
+def test_batch_streams_ndjson(serve):
+    """NDJSON lines carry the same summaries and missing ids as the JSON batch response"""
+    body = {'customer_ids': [1, 2, 999, 3]}
+
+    async def fetch(http):
+        ndjson = await http.post('/api/customer_summaries', params={'format': 'ndjson'}, json=body)
+        batch = await http.post('/api/customer_summaries', json=body)
+        return ndjson, batch
+
+    ndjson, batch = serve(fetch)
+
+    assert ndjson.status_code == 200
+    assert ndjson.headers['Content-Type'] == 'application/x-ndjson'
+    lines = [json.loads(line) for line in ndjson.text.splitlines()]
+    assert lines == batch.json()['summaries'] + [{'customer_id': 999, 'missing': True}]
+    assert [line['customer_id'] for line in lines] == [1, 2, 3, 999]
@@ -0,0 +1,42 @@
+from datetime import date, timedelta
+
+from app.models import db, Customer, CustomerBalance, DailyOrder, Kasbon, Payment
+from app.utils.balances import check_balances
+
+
+def test_orm_writes_keep_balances_in_step(app):
+    """customer_balances follows ORM creates, edits, deletes and customer deletes"""
+    today = date.today()
+    last_month = today.replace(day=1) - timedelta(days=3)
+    budi, siti = Customer(name='Budi'), Customer(name='Siti', price_per_bundle=20000, portions_per_bundle=3)
+    db.session.add_all([budi, siti])
+    db.session.flush()
+    order = DailyOrder(date=today, customer_id=budi.id, morning_portions=2, total_portions=2)
+    kasbon = Kasbon(date=today, customer_id=budi.id, item_name='Kopi', quantity=2, unit_price=5000,
+                    total_amount=10000)
+    payment = Payment(date=last_month, customer_id=budi.id, amount=7000)
+    db.session.add_all([
+        order, kasbon, payment,
+        DailyOrder(date=last_month, customer_id=siti.id, evening_portions=4, total_portions=4),
+        Kasbon(date=today, customer_id=siti.id, item_name='Teh', quantity=1, unit_price=3000, total_amount=3000),
+    ])
+    db.session.commit()
+    assert check_balances() == []
+
+    # Edit amounts, move rows across months and to the other customer
+    order.date = last_month
+    order.total_portions = 5
+    kasbon.customer_id = siti.id
+    payment.date = today
+    payment.amount = 9000
+    db.session.commit()
+    assert check_balances() == []
+
+    db.session.delete(kasbon)
+    db.session.commit()
+    assert check_balances() == []
+
+    db.session.delete(siti)
+    db.session.commit()
+    assert check_balances() == []
+    assert db.session.scalar(db.select(db.func.count()).where(CustomerBalance.customer_id == siti.id)) == 0
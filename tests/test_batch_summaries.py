@@ -0,0 +1,43 @@
+import json
+
+import pytest
+
+BATCH = '/api/customer_summaries'
+DATES = {'start_date': '2026-08-01', 'end_date': '2026-09-15'}
+
+
+def _batch(client, body: dict, ndjson: bool = False):
+    return client.post(BATCH + ('?format=ndjson' if ndjson else ''), json=body)
+
+
+@pytest.mark.parametrize('dates', [{}, DATES], ids=['all time', 'date range'])
+def test_batch_matches_single_endpoint(client, ledger, dates):
+    summaries = _batch(client, {'customer_ids': [3, 1, 2], **dates}).get_json()['summaries']
+
+    assert [item['customer_id'] for item in summaries] == [1, 2, 3]
+    for item in summaries:
+        single = client.get(f"/api/customer_summary/{item.pop('customer_id')}", query_string=dates).get_json()
+        assert item == single
+
+
+def test_ndjson_reports_missing_ids_like_json(client, ledger):
+    body = {'customer_ids': [2, 999, 1, 998, 2]}
+
+    batch = _batch(client, body).get_json()
+    response = _batch(client, body, ndjson=True)
+    lines = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+
+    assert response.mimetype == 'application/x-ndjson'
+    assert batch['missing'] == [999, 998]
+    assert lines == batch['summaries'] + [{'customer_id': i, 'missing': True} for i in batch['missing']]
+
+
+@pytest.mark.parametrize('ndjson', [False, True], ids=['json', 'ndjson'])
+def test_statement_count_does_not_grow_with_ids(client, ledger, statements, ndjson):
+    counts = []
+    for customer_ids in ([1, 2], list(range(1, 21)), 'all'):
+        statements.clear()
+        assert _batch(client, {'customer_ids': customer_ids}, ndjson).status_code == 200
+        counts.append(len(statements))
+
+    assert counts[0] == counts[1] == counts[2]
@@ -0,0 +1,62 @@
+import pytest
+
+from app.models import Customer
+from app.utils import billing
+from app.utils.billing import bill_many
+from app.utils.helpers import calculate_catering_cost
+
+# (portions_per_bundle, price_per_bundle); a zero bundle size bills nothing
+PRICINGS = [(1, 8500), (2, 15000), (3, 25000), (7, 50000), (0, 9000)]
+# Zero, and each side of every bundle boundary
+PORTIONS = sorted({0, 1} | {n * size + offset for size, _ in PRICINGS if size
+                            for n in (1, 2, 10) for offset in (-1, 0, 1)})
+
+
+@pytest.fixture(params=['python', 'numpy'])
+def use_numpy(request, monkeypatch):
+    if request.param == 'numpy':
+        pytest.importorskip('numpy')
+        return True
+    # The default path without NumPy installed
+    monkeypatch.setattr(billing, 'HAS_NUMPY', False)
+    return None
+
+
+def _expected(portions: list, per_bundle: list, price: list) -> list:
+    rows = []
+    for total_portions, size, row_price in zip(portions, per_bundle, price):
+        bundles, charged, cost = calculate_catering_cost(
+            Customer(portions_per_bundle=size, price_per_bundle=row_price), total_portions
+        )
+        rows.append((bundles, charged, charged - total_portions if size > 0 else 0, cost))
+    return rows
+
+
+def _rows(result) -> list:
+    return [tuple(int(value) for value in row) for row in zip(*result)]
+
+
+def test_matches_calculate_catering_cost(use_numpy):
+    portions = [p for _ in PRICINGS for p in PORTIONS]
+    per_bundle = [size for size, _ in PRICINGS for _ in PORTIONS]
+    price = [row_price for _, row_price in PRICINGS for _ in PORTIONS]
+
+    result = bill_many(portions, per_bundle, price, use_numpy=use_numpy)
+
+    assert _rows(result) == _expected(portions, per_bundle, price)
+
+
+def test_scalar_arguments_apply_to_every_row(use_numpy):
+    result = bill_many(PORTIONS, 3, 25000, use_numpy=use_numpy)
+
+    assert _rows(result) == _expected(PORTIONS, [3] * len(PORTIONS), [25000] * len(PORTIONS))
+
+
+def test_python_path_without_numpy(monkeypatch):
+    monkeypatch.setattr(billing, 'HAS_NUMPY', False)
+
+    assert bill_many([0, 4], 3, 25000) == ([0, 2], [0, 6], [0, 2], [0, 50000])
+    with pytest.raises(RuntimeError):
+        bill_many([1], 1, 1, use_numpy=True)
+    with pytest.raises(ValueError):
+        bill_many([1, 2], [1], 1)
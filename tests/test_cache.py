@@ -0,0 +1,154 @@
+import fnmatch
+import pickle
+from datetime import date
+
+import pytest
+
+from app.extensions import cache
+from app.models import db, Customer, DailyOrder, Kasbon, Payment
+from app.utils.cache import MISSING, Cache, MemoryBackend, RedisBackend
+from app.utils.dashboard import RECENT_KEYS, STATS_KEY, dashboard_context
+
+
+class FakeRedis:
+    """The slice of redis-py's client RedisBackend uses, over a dict"""
+
+    def __init__(self):
+        self.data = {}
+        self.expiry = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def set(self, key, value, ex=None):
+        self.data[key] = value
+        self.expiry[key] = ex
+
+    def delete(self, *keys):
+        for key in keys:
+            self.data.pop(key, None)
+
+    def scan_iter(self, match):
+        return [key for key in self.data if fnmatch.fnmatchcase(key, match)]
+
+
+def test_memory_backend_evicts_least_recently_used():
+    backend = MemoryBackend(maxsize=2)
+    backend.set('a', 1)
+    backend.set('b', 2)
+    backend.get('a')
+    backend.set('c', 3)
+
+    assert backend.get('b') is MISSING
+    assert backend.get('a') == 1
+    assert backend.get('c') == 3
+
+
+def test_memory_backend_expires_entries(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr('app.utils.cache.time.monotonic', lambda: now[0])
+    backend = MemoryBackend()
+    backend.set('short', 1, ttl=10)
+    backend.set('forever', 2)
+
+    now[0] = 109.9
+    assert backend.get('short') == 1
+    now[0] = 110.0
+    assert backend.get('short') is MISSING
+    assert backend.get('forever') == 2
+
+
+def test_redis_backend_round_trip():
+    client = FakeRedis()
+    backend = RedisBackend(client, prefix='test:')
+    client.set('other:key', b'untouched')
+
+    backend.set('stats', {'hits': 1}, ttl=30)
+    backend.set('none', None)
+
+    assert pickle.loads(client.data['test:stats']) == {'hits': 1}
+    assert client.expiry['test:stats'] == 30
+    assert client.expiry['test:none'] is None
+    assert backend.get('stats') == {'hits': 1}
+    assert backend.get('none') is None
+    assert backend.get('absent') is MISSING
+
+    backend.delete('stats')
+    assert backend.get('stats') is MISSING
+    backend.clear()
+    assert client.data == {'other:key': b'untouched'}
+
+
+def test_hit_and_miss_counters():
+    local = Cache()
+    calls = []
+
+    def factory():
+        calls.append(1)
+        return 'value'
+
+    assert local.get('key', 'default') == 'default'
+    assert local.get_or_set('key', factory) == 'value'
+    assert local.get_or_set('key', factory) == 'value'
+    local.set('none', None)
+    assert local.get('none', 'default') is None
+
+    assert len(calls) == 1
+    assert local.stats() == {'backend': 'MemoryBackend', 'hits': 2, 'misses': 2, 'hit_ratio': 0.5}
+
+
+@pytest.fixture
+def rows(app):
+    """A customer with one order, kasbon and payment today"""
+    customer = Customer(name='Budi')
+    db.session.add(customer)
+    db.session.flush()
+    db.session.add_all([
+        DailyOrder(date=date.today(), customer_id=customer.id, morning_portions=2, afternoon_portions=1,
+                   evening_portions=0, total_portions=3),
+        Kasbon(date=date.today(), customer_id=customer.id, item_name='Kopi', quantity=2, unit_price=5000,
+               total_amount=10000),
+        Payment(date=date.today(), customer_id=customer.id, amount=7000),
+    ])
+    db.session.commit()
+    return customer.id
+
+
+def _forms(customer_id: int) -> dict:
+    today = date.today().isoformat()
+    return {
+        DailyOrder: {'date': today, 'customer_id': customer_id, 'morning_portions': 4,
+                     'afternoon_portions': 0, 'evening_portions': 1},
+        Kasbon: {'date': today, 'customer_id': customer_id, 'item_name': 'Teh', 'quantity': 3,
+                 'unit_price': 4000},
+        Payment: {'date': today, 'customer_id': customer_id, 'amount': 2500, 'description': ''},
+    }
+
+
+PREFIXES = {DailyOrder: '/orders', Kasbon: '/kasbons', Payment: '/payments'}
+
+
+@pytest.mark.parametrize('model', [DailyOrder, Kasbon, Payment], ids=lambda model: model.__name__)
+@pytest.mark.parametrize('action', ['create', 'edit', 'delete'])
+def test_ledger_writes_invalidate_dashboard(client, rows, model, action):
+    """Each write drops the stats block and its own recent block, so the dashboard matches a cold one"""
+    client.get('/')
+    assert all(cache.backend.get(key) is not MISSING for key in (STATS_KEY, *RECENT_KEYS.values()))
+
+    row_id = db.session.scalar(db.select(model.id))
+    prefix = PREFIXES[model]
+    if action == 'create':
+        response = client.post(f'{prefix}/new', data=_forms(rows)[model])
+    elif action == 'edit':
+        response = client.post(f'{prefix}/{row_id}/edit', data=_forms(rows)[model])
+    else:
+        response = client.post(f'{prefix}/{row_id}/delete')
+    assert response.status_code == 302
+
+    assert cache.backend.get(STATS_KEY) is MISSING
+    assert cache.backend.get(RECENT_KEYS[model]) is MISSING
+    assert all(cache.backend.get(key) is not MISSING for other, key in RECENT_KEYS.items() if other is not model)
+
+    served = dashboard_context()
+    cache.clear()
+    assert served == dashboard_context()
@@ -0,0 +1,109 @@
+import threading
+import time
+from datetime import date, timedelta
+
+from sqlalchemy.exc import OperationalError
+
+from app import create_app
+from app.config import TestingConfig
+from app.models import db, Customer, Kasbon, Payment
+from app.utils.balances import check_balances
+from app.utils.rollups import check_rollups
+
+WRITERS = 8
+WRITES = 25
+# How long one writer keeps the write lock while the others try to commit
+HOLD_SECONDS = 0.5
+
+
+def _write_concurrently(app) -> list:
+    """
+    Commit WRITERS x WRITES kasbon and payment pairs from parallel threads
+
+    One extra writer first takes the write lock with an uncommitted kasbon
+    and keeps it for HOLD_SECONDS, so every other writer meets a locked
+    database at least once. Returns the exceptions the writers raised.
+    """
+    db.session.add_all(Customer(name=f'Pelanggan {i}') for i in range(WRITERS))
+    db.session.commit()
+    customer_ids = db.session.scalars(db.select(Customer.id)).all()
+
+    errors = []
+    locked = threading.Event()
+
+    def hold():
+        with app.app_context():
+            try:
+                db.session.add(Kasbon(date=date.today(), customer_id=customer_ids[0], item_name='Kopi',
+                                      quantity=1, unit_price=5000, total_amount=5000))
+                db.session.flush()
+                locked.set()
+                time.sleep(HOLD_SECONDS)
+                db.session.commit()
+            finally:
+                locked.set()
+                db.session.remove()
+
+    def write(writer: int):
+        with app.app_context():
+            try:
+                locked.wait()
+                for i in range(WRITES):
+                    day = date.today() - timedelta(days=i % 5)
+                    customer_id = customer_ids[(writer + i) % WRITERS]
+                    db.session.add(Kasbon(date=day, customer_id=customer_id, item_name='Kopi',
+                                          quantity=1, unit_price=5000, total_amount=5000))
+                    db.session.add(Payment(date=day, customer_id=customer_id, amount=1000))
+                    db.session.commit()
+            except Exception as error:
+                errors.append(error)
+            finally:
+                db.session.remove()
+
+    threads = [threading.Thread(target=hold)]
+    threads += [threading.Thread(target=write, args=(writer,)) for writer in range(WRITERS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return errors
+
+
+def test_untuned_writers_hit_locked_database(tmp_path):
+    """Without the pragmas and with no busy timeout, writers fail on the held lock"""
+    config = type('Config', (TestingConfig,), {
+        'SQLALCHEMY_DATABASE_URI': f"sqlite:///{tmp_path / 'untuned.db'}",
+        'SQLALCHEMY_ENGINE_OPTIONS': {'connect_args': {'timeout': 0}},
+        'SQLITE_PRAGMAS': {},
+    })
+    app = create_app(config)
+    with app.app_context():
+        db.create_all()
+        errors = _write_concurrently(app)
+        db.session.remove()
+        db.engine.dispose()
+
+    assert errors
+    assert all(isinstance(error, OperationalError) and 'database is locked' in str(error) for error in errors)
+
+
+def test_parallel_writers_all_commit(app):
+    """
+    Several counters writing at once to one SQLite file all get through
+
+    With WAL and busy_timeout a writer waits for the lock instead of
+    failing with "database is locked". Every write also updates
+    customer_balances and the rollups, so they must still add up.
+    """
+    with db.engine.connect() as connection:
+        assert connection.exec_driver_sql('PRAGMA journal_mode').scalar() == 'wal'
+        assert connection.exec_driver_sql('PRAGMA busy_timeout').scalar() == app.config['SQLITE_PRAGMAS']['busy_timeout']
+    assert app.config['SQLITE_PRAGMAS']['busy_timeout'] > HOLD_SECONDS * 1000
+
+    errors = _write_concurrently(app)
+
+    assert errors == []
+    assert db.session.scalar(db.select(db.func.count(Kasbon.id))) == WRITERS * WRITES + 1
+    assert db.session.scalar(db.select(db.func.count(Payment.id))) == WRITERS * WRITES
+    assert check_balances() == []
+    assert check_rollups() == []
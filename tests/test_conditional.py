@@ -0,0 +1,76 @@
+from datetime import date
+
+import pytest
+
+from app.models import db, Customer, Kasbon
+
+SUMMARY = '/api/customer_summary/{}'
+PRICING = '/api/pricing_info/{}'
+
+
+@pytest.fixture
+def customers(app):
+    db.session.add_all([Customer(name='Budi'), Customer(name='Siti')])
+    db.session.commit()
+    return db.session.scalars(db.select(Customer.id).order_by(Customer.id)).all()
+
+
+def _add_kasbon(customer_id: int):
+    db.session.add(Kasbon(date=date.today(), customer_id=customer_id, item_name='Kopi', quantity=1,
+                          unit_price=5000, total_amount=5000))
+    db.session.commit()
+
+
+@pytest.mark.parametrize('url, cache_control', [(SUMMARY, 'private, no-cache'), (PRICING, 'private, max-age=300')])
+def test_ok_response_carries_validators(client, customers, url, cache_control):
+    response = client.get(url.format(customers[0]))
+
+    assert response.status_code == 200
+    assert response.headers['ETag']
+    assert response.headers['Cache-Control'] == cache_control
+
+
+def test_matching_etag_gets_empty_304(client, customers):
+    etag = client.get(SUMMARY.format(customers[0])).headers['ETag']
+
+    response = client.get(SUMMARY.format(customers[0]), headers={'If-None-Match': etag})
+
+    assert response.status_code == 304
+    assert response.data == b''
+    assert response.headers['ETag'] == etag
+    assert response.headers['Cache-Control'] == 'private, no-cache'
+
+
+def test_query_arguments_get_their_own_etag(client, customers):
+    plain = client.get(SUMMARY.format(customers[0])).headers['ETag']
+
+    assert client.get(SUMMARY.format(customers[0]) + '?start_date=2026-01-01').headers['ETag'] != plain
+
+
+def test_ledger_write_changes_only_that_customers_etag(client, customers):
+    budi, siti = customers
+    before = {customer_id: client.get(SUMMARY.format(customer_id)).headers['ETag'] for customer_id in customers}
+    pricing = client.get(PRICING.format(budi)).headers['ETag']
+
+    _add_kasbon(budi)
+
+    assert client.get(SUMMARY.format(budi), headers={'If-None-Match': before[budi]}).status_code == 200
+    assert client.get(SUMMARY.format(siti), headers={'If-None-Match': before[siti]}).status_code == 304
+    # Pricing only reads the customer's own fields
+    assert client.get(PRICING.format(budi)).headers['ETag'] == pricing
+
+
+def test_customer_edit_changes_pricing_etag(client, customers):
+    pricing = client.get(PRICING.format(customers[0])).headers['ETag']
+
+    client.post(f'/customers/{customers[0]}/edit',
+                data={'name': 'Budi', 'price_per_bundle': 9000, 'portions_per_bundle': 1})
+
+    assert client.get(PRICING.format(customers[0])).headers['ETag'] != pricing
+
+
+def test_unknown_customer_has_no_etag(client, customers):
+    response = client.get(SUMMARY.format(999))
+
+    assert response.status_code == 404
+    assert 'ETag' not in response.headers
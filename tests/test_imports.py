@@ -0,0 +1,97 @@
+import io
+from datetime import date, timedelta
+
+import pytest
+
+from app.models import db, Customer, DailyOrder
+from app.utils.balances import check_balances
+from app.utils.imports import import_orders
+from app.utils.periods import close_period
+from app.utils.rollups import check_rollups
+
+WRITES = ('INSERT', 'UPDATE', 'DELETE')
+
+
+@pytest.fixture
+def customers(app):
+    db.session.add_all([Customer(name='Budi'), Customer(name='Siti', price_per_bundle=25000, portions_per_bundle=3),
+                        Customer(name='Andi'), Customer(name='andi ')])
+    db.session.commit()
+
+
+def _csv(*rows: str) -> list:
+    return ['Tanggal,Pelanggan,Pagi,Siang,Sore\n', *(row + '\n' for row in rows)]
+
+
+def _valid_rows() -> list:
+    today = date.today()
+    return [f'{today - timedelta(days=n):%Y-%m-%d},{name},{n % 3},1,{n % 2}'
+            for n in range(40) for name in ('Budi', 'Siti')]
+
+
+def _order_count() -> int:
+    return db.session.scalar(db.select(db.func.count(DailyOrder.id)))
+
+
+def test_dry_run_writes_nothing(customers, statements):
+    statements.clear()
+
+    result = import_orders(_csv(*_valid_rows()), dry_run=True)
+
+    assert (result.total, result.valid, result.imported, result.errors) == (80, 80, 0, [])
+    assert not [statement for statement, _ in statements if statement.lstrip().upper().startswith(WRITES)]
+    assert _order_count() == 0
+
+
+def test_invalid_rows_are_reported_by_line(customers):
+    result = import_orders(_csv(
+        '2026-03-01,Budi,1,0,0',
+        '31-02-2026,Budi,1,0,0',
+        '2026-03-02,Budi,-1,0,0',
+        '2026-03-03,,1,0,0',
+        '2026-03-04,Joko,1,0,0',
+        '2026-03-05,Andi,1,0,0',
+        '02/03/2026,siti,0,2,2',
+    ))
+
+    assert result.imported == 2
+    assert [line for line, _ in result.errors] == [3, 4, 5, 6, 7]
+    messages = dict(result.errors)
+    assert 'date' in messages[3]
+    assert 'morning_portions' in messages[4]
+    assert 'pelanggan wajib diisi' in messages[5]
+    assert 'tidak ditemukan' in messages[6]
+    assert 'tidak unik' in messages[7]
+
+
+def test_closed_period_rows_are_rejected(customers):
+    through = date.today().replace(day=1) - timedelta(days=1)
+    close_period(through)
+
+    result = import_orders(_csv(f'{through:%Y-%m-%d},Budi,1,0,0', f'{through + timedelta(days=1):%Y-%m-%d},Budi,1,0,0'))
+
+    assert result.imported == 1
+    assert result.errors == [(2, f'periode sampai {through:%d/%m/%Y} sudah ditutup')]
+    assert db.session.scalar(db.select(DailyOrder.date)) == through + timedelta(days=1)
+
+
+def test_import_keeps_balances_and_rollups(customers):
+    # Existing orders on the same days, written through the ORM listeners
+    db.session.add(DailyOrder(date=date.today(), customer_id=1, morning_portions=2, total_portions=2))
+    db.session.commit()
+
+    result = import_orders(_csv(*_valid_rows()), batch_size=7)
+
+    assert result.imported == 80
+    assert _order_count() == 81
+    assert check_balances() == []
+    assert check_rollups() == []
+
+
+def test_import_page_dry_run(client, customers):
+    data = {'file': (io.BytesIO(''.join(_csv(*_valid_rows()[:4])).encode()), 'pesanan.csv'), 'dry_run': 'y'}
+
+    response = client.post('/orders/import', data=data, content_type='multipart/form-data')
+
+    assert response.status_code == 200
+    assert _order_count() == 0
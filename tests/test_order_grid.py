@@ -0,0 +1,80 @@
+from datetime import date
+
+import pytest
+
+from app.models import db, Customer, CustomerBalance, DailyOrder
+from app.utils.balances import check_balances
+from app.utils.rollups import check_rollups
+
+DAY = date(2026, 3, 10)
+
+
+@pytest.fixture
+def customers(app):
+    db.session.add_all(Customer(name=name) for name in ('Andi', 'Budi', 'Siti'))
+    db.session.commit()
+    return db.session.scalars(db.select(Customer.id).order_by(Customer.id)).all()
+
+
+def _post(client, rows: dict):
+    data = {f'{field}-{customer_id}': portions
+            for customer_id, row in rows.items() for field, portions in row.items()}
+    return client.post(f'/orders/grid?date={DAY.isoformat()}', data=data)
+
+
+def _orders() -> dict:
+    return {order.customer_id: order.total_portions
+            for order in db.session.scalars(db.select(DailyOrder).where(DailyOrder.date == DAY))}
+
+
+def _balance(customer_id: int) -> int:
+    return db.session.scalar(
+        db.select(CustomerBalance.total_portions)
+        .where(CustomerBalance.customer_id == customer_id, CustomerBalance.period == CustomerBalance.ALL_TIME)
+    ) or 0
+
+
+def test_saving_grid_twice_keeps_one_order_per_customer(client, customers):
+    andi, budi, siti = customers
+    rows = {
+        andi: {'morning_portions': 2, 'afternoon_portions': 1, 'evening_portions': 0},
+        budi: {'morning_portions': 0, 'afternoon_portions': 3, 'evening_portions': 1},
+        siti: {'morning_portions': '', 'afternoon_portions': '', 'evening_portions': ''},
+    }
+
+    assert _post(client, rows).status_code == 302
+    assert _post(client, rows).status_code == 302
+
+    assert db.session.scalar(db.select(db.func.count(DailyOrder.id))) == 2
+    assert _orders() == {andi: 3, budi: 4}
+    assert [_balance(customer_id) for customer_id in customers] == [3, 4, 0]
+    assert check_balances() == []
+    assert check_rollups() == []
+
+
+def test_zero_rows_delete_the_days_orders(client, customers):
+    andi, budi, siti = customers
+    # A duplicate and an all-zero order entered through the single order form
+    db.session.add_all([
+        DailyOrder(date=DAY, customer_id=andi, morning_portions=1, total_portions=1),
+        DailyOrder(date=DAY, customer_id=andi, evening_portions=2, total_portions=2),
+        DailyOrder(date=DAY, customer_id=siti, morning_portions=0, total_portions=0),
+    ])
+    db.session.commit()
+
+    _post(client, {
+        andi: {'morning_portions': 1, 'afternoon_portions': 0, 'evening_portions': 3},
+        budi: {'morning_portions': 2, 'afternoon_portions': 0, 'evening_portions': 0},
+        siti: {'morning_portions': 0, 'afternoon_portions': 0, 'evening_portions': 0},
+    })
+    assert _orders() == {andi: 4, budi: 2}
+
+    _post(client, {
+        andi: {'morning_portions': 0, 'afternoon_portions': 0, 'evening_portions': 0},
+        budi: {'morning_portions': 2, 'afternoon_portions': 0, 'evening_portions': 0},
+    })
+
+    assert _orders() == {budi: 2}
+    assert [_balance(customer_id) for customer_id in customers] == [0, 2, 0]
+    assert check_balances() == []
+    assert check_rollups() == []
@@ -0,0 +1,52 @@
+import base64
+import re
+import zlib
+from datetime import date, datetime
+
+import pytest
+
+pytest.importorskip('reportlab')
+
+from app.models import db, Customer, Kasbon
+from app.utils import helpers
+from app.utils.helpers import render_customer_pdf
+
+
+def _footer(pdf: bytes) -> str:
+    """The 'Data per' line of a rendered statement"""
+    # reportlab writes page content ASCII85-encoded and deflated
+    for stream in re.findall(rb'stream\r?\n(.*?~>)', pdf, re.S):
+        text = zlib.decompress(base64.a85decode(stream, adobe=True))
+        match = re.search(rb'\((Data per: [^)]*)\)', text)
+        if match:
+            return match.group(1).decode()
+    raise AssertionError('no footer found')
+
+
+class _Clock:
+    moment = datetime(2026, 3, 1, 8, 0, 0)
+
+    @classmethod
+    def now(cls):
+        return cls.moment
+
+
+def test_cached_pdf_footer_gives_data_time(app, monkeypatch):
+    monkeypatch.setattr(helpers, 'datetime', _Clock)
+    customer = Customer(name='Budi')
+    db.session.add(customer)
+    db.session.commit()
+
+    _, first = render_customer_pdf(customer.id)
+    monkeypatch.setattr(_Clock, 'moment', datetime(2026, 3, 2, 9, 30, 0))
+    _, cached = render_customer_pdf(customer.id)
+
+    assert cached == first
+    assert _footer(cached) == 'Data per: 01/03/2026 08:00:00'
+
+    db.session.add(Kasbon(date=date(2026, 3, 2), customer_id=customer.id, item_name='Kopi', quantity=1,
+                          unit_price=5000, total_amount=5000))
+    db.session.commit()
+    _, fresh = render_customer_pdf(customer.id)
+
+    assert _footer(fresh) == 'Data per: 02/03/2026 09:30:00'
@@ -0,0 +1,80 @@
+from datetime import date, timedelta
+
+import pytest
+
+from app.models import db, Customer, Kasbon, KasbonArchive
+from app.utils.periods import ClosedPeriodError, close_period
+
+
+def _last_closable_month() -> date:
+    """Last day of the month before last, well inside the generated history"""
+    return (date.today().replace(day=1) - timedelta(days=1)).replace(day=1) - timedelta(days=1)
+
+
+@pytest.fixture
+def closed(ledger) -> date:
+    through = _last_closable_month()
+    close_period(through)
+    return through
+
+
+def _summary(client, customer_id: int) -> dict:
+    return client.get(f'/api/customer_summary/{customer_id}').get_json()
+
+
+def test_close_keeps_summary_totals(client, ledger):
+    through = _last_closable_month()
+    before = {customer_id: _summary(client, customer_id) for customer_id in range(1, 6)}
+
+    result = close_period(through)
+
+    assert result['customers'] == 20
+    assert result[Kasbon.__tablename__] > 0
+    for customer_id, summary in before.items():
+        after = _summary(client, customer_id)
+        assert after.pop('opening')['closed_through'] == through.isoformat()
+        assert summary.pop('opening') is None
+        assert after == summary
+
+
+def test_closed_period_refuses_ledger_writes(closed):
+    customer_id = db.session.scalar(db.select(Customer.id))
+
+    db.session.add(Kasbon(date=closed, customer_id=customer_id, item_name='Kopi', quantity=1,
+                          unit_price=5000, total_amount=5000))
+    with pytest.raises(ClosedPeriodError):
+        db.session.flush()
+    db.session.rollback()
+
+    kasbon = db.session.scalar(db.select(Kasbon).where(Kasbon.date > closed).limit(1))
+    kasbon.date = closed
+    with pytest.raises(ClosedPeriodError):
+        db.session.flush()
+    db.session.rollback()
+
+    archived = db.session.scalar(db.select(KasbonArchive).limit(1))
+    archived.quantity += 1
+    with pytest.raises(ClosedPeriodError):
+        db.session.flush()
+    db.session.rollback()
+
+    db.session.delete(archived)
+    with pytest.raises(ClosedPeriodError):
+        db.session.flush()
+    db.session.rollback()
+
+
+def test_customer_with_closed_history_is_kept(client, closed):
+    response = client.post('/customers/1/delete', follow_redirects=True)
+
+    assert 'Customer tidak dihapus' in response.get_data(as_text=True)
+    assert db.session.get(Customer, 1) is not None
+
+
+def test_close_changes_etag(client, ledger):
+    before = client.get('/api/customer_summary/1').headers['ETag']
+
+    close_period(_last_closable_month())
+
+    assert client.get('/api/customer_summary/1').headers['ETag'] != before
+    assert client.get('/api/customer_summary/1', headers={'If-None-Match': before}).status_code == 200
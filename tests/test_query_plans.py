@@ -0,0 +1,84 @@
+import re
+from datetime import date, timedelta
+
+import pytest
+
+from app.extensions import cache
+from app.models import db, DailyOrder, Kasbon, Payment, ARCHIVES
+from app.utils.dashboard import dashboard_context
+from app.utils.helpers import get_customer_summary
+
+LEDGER_TABLES = tuple(model.__tablename__ for model in (DailyOrder, Kasbon, Payment, *ARCHIVES.values()))
+
+
+def query_plans(executed) -> list:
+    """
+    Plans of the executed statements that read a ledger table, as (statement, plan lines)
+
+    PostgreSQL would sequentially scan the small test tables whatever the
+    indexes, so sequential scans are disabled while explaining there.
+    """
+    connection = db.session.connection()
+    postgresql = connection.dialect.name == 'postgresql'
+    if postgresql:
+        connection.exec_driver_sql('SET LOCAL enable_seqscan = off')
+    plans = []
+    for statement, parameters in executed:
+        if not statement.lstrip().upper().startswith('SELECT'):
+            continue
+        if not any(re.search(rf'\b{table}\b', statement) for table in LEDGER_TABLES):
+            continue
+        if postgresql:
+            lines = [row[0] for row in connection.exec_driver_sql(f'EXPLAIN {statement}', parameters)]
+        else:
+            lines = [row[-1] for row in connection.exec_driver_sql(f'EXPLAIN QUERY PLAN {statement}', parameters)]
+        plans.append((statement, lines))
+    return plans
+
+
+def full_scans(plans) -> list:
+    """
+    Plan lines reading a whole ledger table
+
+    Walks along an index (SQLite's ``SCAN t USING [COVERING] INDEX ix``)
+    are not counted: ORDER BY date LIMIT n stops at the limit, and the
+    dashboard's per-customer counts only read the (customer_id, date) index.
+    """
+    tables = '|'.join(LEDGER_TABLES)
+    pattern = re.compile(rf'^(SCAN ({tables})$|SCAN ({tables}) (?!USING (COVERING )?INDEX)|.*Seq Scan on ({tables})\b)')
+    return [line for _, lines in plans for line in lines if pattern.match(line.strip())]
+
+
+def indexes_used(plans) -> set:
+    return {name for _, lines in plans for line in lines for name in re.findall(r'\bix_\w+', line)}
+
+
+@pytest.mark.parametrize('period', [
+    {},
+    {'start_date': date.today() - timedelta(days=45), 'end_date': date.today() - timedelta(days=10)},
+], ids=['all-time', 'date-range'])
+def test_customer_summary_uses_customer_date_indexes(ledger, statements, period):
+    statements.clear()
+    summary = get_customer_summary(3, **period)
+    assert summary['orders']
+
+    plans = query_plans(statements)
+    assert plans
+    assert full_scans(plans) == []
+    assert {'ix_daily_orders_customer_id_date', 'ix_kasbons_customer_id_date',
+            'ix_payments_customer_id_date'} <= indexes_used(plans)
+    if period:
+        assert {'ix_daily_orders_archive_customer_id_date', 'ix_kasbons_archive_customer_id_date',
+                'ix_payments_archive_customer_id_date'} <= indexes_used(plans)
+
+
+def test_dashboard_uses_date_indexes(ledger, statements):
+    cache.clear()
+    statements.clear()
+    context = dashboard_context()
+    assert context['recent_orders'] and context['recent_kasbons'] and context['recent_payments']
+
+    plans = query_plans(statements)
+    assert plans
+    assert full_scans(plans) == []
+    assert {'ix_daily_orders_date', 'ix_kasbons_date', 'ix_payments_date'} <= indexes_used(plans)
@@ -0,0 +1,75 @@
+from collections import defaultdict
+from datetime import date, timedelta
+
+from app.extensions import cache
+from app.models import db, Customer, DailyOrder, Kasbon, Payment
+from app.utils.dashboard import dashboard_context
+from app.utils.rollups import check_rollups, month_start, order_revenue
+
+
+def _naive_totals() -> dict:
+    """Dashboard figures recomputed row by row from the ledgers"""
+    today = date.today()
+    revenue = defaultdict(int)
+    payments = defaultdict(int)
+    today_portions = 0
+    for order in db.session.scalars(db.select(DailyOrder)):
+        customer = db.session.get(Customer, order.customer_id)
+        revenue[month_start(order.date)] += order_revenue(order.total_portions, customer.price_per_bundle,
+                                                          customer.portions_per_bundle)
+        if order.date == today:
+            today_portions += order.total_portions
+    for payment in db.session.scalars(db.select(Payment)):
+        payments[month_start(payment.date)] += payment.amount
+    return {
+        'revenue': dict(revenue),
+        'monthly_revenue': payments[month_start(today)],
+        'today_total_portions': today_portions,
+        'total_kasbon': sum(db.session.scalars(db.select(Kasbon.total_amount))),
+    }
+
+
+def _dashboard_totals() -> dict:
+    cache.clear()
+    context = dashboard_context()
+    return {
+        'revenue': {month['month']: month['catering_revenue']
+                    for month in context['revenue_trend'] if month['catering_revenue']},
+        'monthly_revenue': context['monthly_revenue'],
+        'today_total_portions': context['today_total_portions'],
+        'total_kasbon': context['total_kasbon'],
+    }
+
+
+def test_rollups_follow_orders_and_repricing(app):
+    today = date.today()
+    last_month = today.replace(day=1) - timedelta(days=2)
+    budi, siti = Customer(name='Budi', price_per_bundle=8500), Customer(name='Siti', price_per_bundle=25000,
+                                                                       portions_per_bundle=3)
+    db.session.add_all([budi, siti])
+    db.session.flush()
+    orders = [
+        DailyOrder(date=day, customer_id=customer.id, morning_portions=portions, total_portions=portions)
+        for day in (last_month, today) for customer, portions in ((budi, 2), (siti, 5))
+    ]
+    db.session.add_all([
+        *orders,
+        Kasbon(date=today, customer_id=budi.id, item_name='Kopi', quantity=3, unit_price=4000, total_amount=12000),
+        Payment(date=today, customer_id=siti.id, amount=30000),
+    ])
+    db.session.commit()
+    assert check_rollups() == []
+
+    # Every row and customer below was expired by the commit above
+    siti.price_per_bundle = 26000
+    siti.portions_per_bundle = 4
+    db.session.commit()
+    assert check_rollups() == []
+
+    orders[3].total_portions = 7
+    orders[3].morning_portions = 7
+    db.session.delete(orders[0])
+    db.session.commit()
+
+    assert check_rollups() == []
+    assert _dashboard_totals() == _naive_totals()
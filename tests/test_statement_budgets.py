@@ -0,0 +1,36 @@
+import pytest
+
+from benchmarks.data import generate
+
+# Page -> most SQL statements one request may run, with cold application
+# caches. The counts must not grow with the number of rows listed.
+BUDGETS = {
+    '/customers/': 1,
+    '/orders/': 3,
+    '/kasbons/': 3,
+    '/payments/': 3,
+    '/': 8,
+}
+
+
+@pytest.mark.parametrize('url', BUDGETS)
+def test_page_within_statement_budget(client, ledger, statements, url):
+    statements.clear()
+    response = client.get(url)
+
+    assert response.status_code == 200
+    assert len(statements) <= BUDGETS[url], [statement for statement, _ in statements]
+
+
+@pytest.mark.parametrize('url', [url for url in BUDGETS if url != '/'])
+def test_list_statements_independent_of_rows(app, client, ledger, statements, url):
+    client.get(url)
+    statements.clear()
+    client.get(url)
+    before = len(statements)
+
+    generate(30, 30, seed=2)
+    statements.clear()
+    client.get(url)
+
+    assert len(statements) == before